@@ -6,6 +6,8 @@ LLM Chatbot Main Application
 
 import os
 import sys
+import json
+import time
 import logging
 from pathlib import Path
 
@@ -15,7 +17,9 @@ sys.path.append(str(Path(__file__).parent / "src"))
 from src.loader import DocumentLoader
 from src.embedding import DocumentEmbedder
 from src.search import ChatbotSearch
-from src.config import UPLOAD_FOLDER
+from src.summarizer import ConversationSummarizer
+from src.answer_cache import SemanticAnswerCache
+from src.config import UPLOAD_FOLDER, TOP_K_RESULTS, QUERY_BATCH_SIZE, ANSWER_CACHE_ENABLED
 
 # 로깅 설정
 logging.basicConfig(
@@ -31,29 +35,57 @@ class LLMChatbot:
         self.loader = DocumentLoader()
         self.embedder = DocumentEmbedder()
         self.search = ChatbotSearch(self.embedder)
-        self.conversation_history = []
+        # 최근 대화는 그대로, 오래된 대화는 요약으로 유지해 프롬프트 크기를 일정하게 함
+        self.memory = ConversationSummarizer(self.search.llm)
     
     def load_and_embed_documents(self, file_paths: list = None):
-        """문서를 로드하고 벡터 DB에 저장"""
+        """문서를 로드하고 벡터 DB에 저장 (변경된 문서만 다시 임베딩)"""
         logger.info("문서 로딩 시작...")
         
-        # 문서 로드
-        documents = self.loader.load_documents(file_paths)
+        scan_all = file_paths is None
+        if scan_all:
+            file_paths = self.loader.get_all_files()
+            
+            # 삭제된 문서의 청크 제거
+            deleted_files = self.embedder.get_deleted_files(file_paths)
+            if deleted_files:
+                logger.info(f"{len(deleted_files)}개의 삭제된 문서를 벡터 DB에서 제거합니다.")
+                self.embedder.remove_documents(deleted_files)
         
-        if not documents:
-            logger.warning("로드할 문서가 없습니다.")
-            return False
+        # 변경되지 않은 문서는 건너뛰기
+        changed_files = self.embedder.get_changed_files(file_paths)
+        skipped_count = len(file_paths) - len(changed_files)
+        if skipped_count:
+            logger.info(f"변경되지 않은 {skipped_count}개의 문서를 건너뜁니다.")
+        
+        if not changed_files:
+            info = self.embedder.get_collection_info()
+            if info['document_count'] == 0:
+                logger.warning("로드할 문서가 없습니다.")
+                return False
+            logger.info(f"벡터 DB가 최신 상태입니다: {info}")
+            return True
         
-        logger.info(f"{len(documents)}개의 문서를 로드했습니다.")
+        logger.info(f"{len(changed_files)}개의 문서를 로드합니다.")
         
-        # 벡터 DB에 저장
+        # 문서를 세그먼트 단위로 읽으면서 벡터 DB에 저장
         logger.info("벡터 DB에 임베딩 시작...")
-        self.embedder.embed_documents(documents)
+        self.embedder.embed_documents(self.loader.iter_documents(changed_files))
+        
+        # 파일별 로딩 오류 보고
+        if self.loader.errors:
+            logger.warning(f"{len(self.loader.errors)}개의 문서를 로드하지 못했습니다:")
+            for error in self.loader.errors:
+                logger.warning(f"  - {error['file_path']}: {error['error']}")
         
         # 컬렉션 정보 출력
         info = self.embedder.get_collection_info()
         logger.info(f"벡터 DB 정보: {info}")
         
+        if info['document_count'] == 0:
+            logger.warning("로드할 문서가 없습니다.")
+            return False
+        
         return True
     
     def chat(self, query: str) -> str:
@@ -63,19 +95,26 @@ class LLMChatbot:
         
         logger.info(f"사용자 질문: {query}")
         
-        # 응답 생성
-        response = self.search.search_and_respond(query)
-        
-        # 대화 히스토리에 추가
-        self.conversation_history.append({"role": "user", "content": query})
-        self.conversation_history.append({"role": "assistant", "content": response})
+        # 응답 생성 (첫 질문은 응답 캐시를 사용하는 단일 질문 경로)
+        history = self.memory.history()
+        if history:
+            response = self.search.chat_with_history(query, history)
+        else:
+            response = self.search.search_and_respond(query)
         
-        # 히스토리가 너무 길어지면 앞부분 제거
-        if len(self.conversation_history) > 10:
-            self.conversation_history = self.conversation_history[-10:]
+        # 대화 히스토리에 추가 (요약은 백그라운드에서 진행)
+        self.memory.add([
+            {"role": "user", "content": query},
+            {"role": "assistant", "content": response}
+        ])
         
         return response
     
+    @property
+    def conversation_history(self):
+        """프롬프트에 넣는 대화 히스토리 (요약 메시지 + 최근 메시지)"""
+        return self.memory.history()
+    
     def get_relevant_docs(self, query: str):
         """쿼리와 관련된 문서들 반환 (디버깅용)"""
         return self.search.get_relevant_documents(query)
@@ -170,6 +209,93 @@ def interactive_mode():
             logger.error(f"오류 발생: {e}")
             print("오류가 발생했습니다. 다시 시도해주세요.")
 
+def read_queries(query_file: str):
+    """질문 파일을 한 줄씩 읽기 (일반 텍스트 또는 {"query": ...} 형식의 JSONL)"""
+    with open(query_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                yield json.loads(line)['query']
+            else:
+                yield line
+
+def batch_mode(query_file: str, output_file: str = None, retrieve_only: bool = False,
+               top_k: int = TOP_K_RESULTS):
+    """질문 파일의 모든 질문을 일괄 검색하고 결과를 JSONL로 저장 (평가/응답 캐시 예열용)"""
+    chatbot = LLMChatbot()
+    
+    info = chatbot.embedder.get_collection_info()
+    if info['document_count'] == 0:
+        print("벡터 DB에 문서가 없습니다. 먼저 문서를 로드해주세요.")
+        return
+    
+    output = open(output_file, 'w', encoding='utf-8') if output_file else sys.stdout
+    count = 0
+    try:
+        queries = []
+        for query in read_queries(query_file):
+            queries.append(query)
+            if len(queries) >= QUERY_BATCH_SIZE:
+                count += _run_query_batch(chatbot, queries, output, retrieve_only, top_k)
+                queries = []
+        if queries:
+            count += _run_query_batch(chatbot, queries, output, retrieve_only, top_k)
+    finally:
+        if output_file:
+            output.close()
+    
+    logger.info(f"{count}개의 질문을 처리했습니다: {chatbot.search.get_stats()}")
+
+def _run_query_batch(chatbot: LLMChatbot, queries: list, output, retrieve_only: bool, top_k: int) -> int:
+    """질문 묶음을 처리하고 질문별 결과를 한 줄씩 기록"""
+    batch_docs = chatbot.search.retrieve_batch(queries, top_k)
+    for query, docs in zip(queries, batch_docs):
+        record = {
+            'query': query,
+            'documents': [
+                {
+                    'id': doc['id'],
+                    'file_path': doc['metadata'].get('file_path'),
+                    'similarity': doc.get('similarity'),
+                    'rerank_score': doc.get('rerank_score')
+                }
+                for doc in docs
+            ]
+        }
+        if not retrieve_only:
+            record['response'] = chatbot.search.respond(query, docs)
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+    return len(queries)
+
+def watch_drive_mode(folder_id: str):
+    """Google Drive 폴더의 변경 사항을 감시하며 바뀐 파일만 다시 인덱싱
+    
+    웹 서버 프로세스는 INDEX_REFRESH_INTERVAL초마다 인덱스 변경을 확인해 다시 로드한다.
+    """
+    # Google API 라이브러리는 Drive 연동을 사용할 때만 필요
+    from src.gdrive_sync import GoogleDriveSync
+    from src.gdrive_watcher import DriveChangeWatcher
+    
+    loader = DocumentLoader()
+    embedder = DocumentEmbedder()
+    if ANSWER_CACHE_ENABLED:
+        # 웹 서버와 같은 응답 캐시 파일에서 바뀐 청크를 참조하는 응답을 지움
+        embedder.add_change_listener(SemanticAnswerCache().invalidate_chunks)
+    watcher = DriveChangeWatcher(GoogleDriveSync(), folder_id, loader, embedder)
+    watcher.start()
+    print(f"Google Drive 폴더 {folder_id}의 변경 사항을 감시합니다. 종료하려면 Ctrl+C를 누르세요.")
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"Drive 감시 상태: {watcher.get_stats()}")
+    except KeyboardInterrupt:
+        print("\n감시를 종료합니다.")
+    finally:
+        watcher.stop()
+
 if __name__ == "__main__":
     import argparse
     
@@ -178,6 +304,16 @@ if __name__ == "__main__":
                        help="대화형 모드 (문서 로딩 없이 바로 대화)")
     parser.add_argument("--clear-db", action="store_true",
                        help="벡터 DB 초기화")
+    parser.add_argument("--query-file",
+                       help="질문 파일(한 줄에 하나, 또는 JSONL)을 일괄 처리")
+    parser.add_argument("--output",
+                       help="--query-file 결과 JSONL 파일 경로 (기본값: 표준 출력)")
+    parser.add_argument("--retrieve-only", action="store_true",
+                       help="--query-file에서 LLM 응답 없이 검색 결과만 기록")
+    parser.add_argument("--top-k", type=int, default=TOP_K_RESULTS,
+                       help="--query-file에서 질문당 검색할 문서 수")
+    parser.add_argument("--watch-drive", metavar="FOLDER_ID",
+                       help="Google Drive 폴더의 변경 사항을 감시하며 바뀐 파일만 다시 인덱싱")
     
     args = parser.parse_args()
     
@@ -185,6 +321,10 @@ if __name__ == "__main__":
         chatbot = LLMChatbot()
         chatbot.clear_database()
         print("벡터 DB가 초기화되었습니다.")
+    elif args.watch_drive:
+        watch_drive_mode(args.watch_drive)
+    elif args.query_file:
+        batch_mode(args.query_file, args.output, args.retrieve_only, args.top_k)
     elif args.interactive:
         interactive_mode()
     else:
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+LLM Chatbot Async Web Application
+asyncio 기반 ASGI 서빙 모드 - 한 프로세스에서 수백 개의 동시 대화를 처리
+
+실행 방법:
+    uvicorn async_web_app:app --host 0.0.0.0 --port 5000
+
+LLM 호출은 비동기 클라이언트로 대기하고, CPU 작업인 임베딩/벡터 검색은
+스레드 풀에서 실행되므로 응답을 기다리는 동안 이벤트 루프가 막히지 않는다.
+부하 테스트 시에는 OPENAI_API_BASE를 benchmarks/stub_llm_server.py 주소로 지정한다.
+"""
+
+import sys
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, AsyncIterator
+
+# src 모듈 import를 위한 경로 추가
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.search import ChatbotSearch
+from src.embedding import DocumentEmbedder, build_where
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 챗봇 초기화
+embedder = DocumentEmbedder()
+chatbot = ChatbotSearch(embedder)
+
+TEMPLATE_PATH = Path(__file__).parent / 'templates' / 'index.html'
+
+
+async def _read_json(receive) -> Dict[str, Any]:
+    """요청 본문을 JSON으로 읽기"""
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b"")
+        more_body = message.get('more_body', False)
+    try:
+        return json.loads(body or b"{}")
+    except ValueError:
+        return {}
+
+
+async def _send_response(send, body: bytes, status: int = 200,
+                         content_type: str = 'application/json; charset=utf-8') -> None:
+    """단일 응답 전송"""
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type.encode()),
+            (b'content-length', str(len(body)).encode())
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_json(send, payload: Dict[str, Any], status: int = 200) -> None:
+    await _send_response(send, json.dumps(payload, ensure_ascii=False).encode('utf-8'), status)
+
+
+async def _send_event_stream(send, events: AsyncIterator[str]) -> None:
+    """Server-Sent Events 스트림 전송"""
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no')
+        ]
+    })
+    async for event in events:
+        await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b""})
+
+
+async def index(scope, receive, send) -> None:
+    """메인 페이지"""
+    if not TEMPLATE_PATH.exists():
+        await _send_response(send, "templates/index.html 이 없습니다. python web_app.py 를 한 번 실행해 생성해주세요.".encode('utf-8'),
+                             status=404, content_type='text/plain; charset=utf-8')
+        return
+    await _send_response(send, TEMPLATE_PATH.read_bytes(), content_type='text/html; charset=utf-8')
+
+
+async def chat(scope, receive, send) -> None:
+    """챗봇 대화 API"""
+    try:
+        data = await _read_json(receive)
+        user_message = str(data.get('message', '')).strip()
+        
+        if not user_message:
+            await _send_json(send, {
+                'success': False,
+                'message': '메시지를 입력해주세요.'
+            })
+            return
+        
+        filters = data.get('filters') or None
+        try:
+            build_where(filters)
+        except ValueError as e:
+            await _send_json(send, {'success': False, 'message': str(e)}, status=400)
+            return
+        
+        response = await chatbot.asearch_and_respond(user_message, filters=filters)
+        
+        await _send_json(send, {
+            'success': True,
+            'message': response,
+            'user_message': user_message
+        })
+    
+    except Exception as e:
+        logger.error(f"Chat API error: {e}")
+        await _send_json(send, {
+            'success': False,
+            'message': '죄송합니다. 일시적인 오류가 발생했습니다.'
+        })
+
+
+async def chat_stream(scope, receive, send) -> None:
+    """챗봇 대화 스트리밍 API (Server-Sent Events)"""
+    try:
+        data = await _read_json(receive)
+        user_message = str(data.get('message', '')).strip()
+        filters = data.get('filters') or None
+    except (AttributeError, TypeError) as e:
+        # 본문이 JSON 객체가 아닌 경우
+        logger.warning(f"Invalid chat stream request: {e}")
+        await _send_json(send, {'success': False, 'message': '잘못된 요청 형식입니다.'}, status=400)
+        return
+    
+    if not user_message:
+        await _send_json(send, {
+            'success': False,
+            'message': '메시지를 입력해주세요.'
+        })
+        return
+    
+    try:
+        build_where(filters)
+    except ValueError as e:
+        await _send_json(send, {'success': False, 'message': str(e)}, status=400)
+        return
+    
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for token in chatbot.astream_search_and_respond(user_message, filters=filters):
+                yield f"data: {json.dumps({'token': token}, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.error(f"Chat stream API error: {e}")
+            yield f"event: error\ndata: {json.dumps({'message': '죄송합니다. 일시적인 오류가 발생했습니다.'}, ensure_ascii=False)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    
+    await _send_event_stream(send, events())
+
+
+async def health_check(scope, receive, send) -> None:
+    """헬스 체크 API"""
+    try:
+        info = await chatbot.run_in_executor(embedder.get_collection_info)
+        await _send_json(send, {
+            'status': 'healthy',
+            'document_count': info['document_count'],
+            'collection_name': info['collection_name'],
+            'cache': dict(
+                embedder.get_cache_stats(),
+                answers=chatbot.answer_cache.stats() if chatbot.answer_cache else None
+            ),
+            'retrieval': chatbot.get_stats()
+        })
+    except Exception as e:
+        await _send_json(send, {
+            'status': 'unhealthy',
+            'error': str(e)
+        }, status=500)
+
+
+ROUTES = {
+    ('GET', '/'): index,
+    ('POST', '/chat'): chat,
+    ('POST', '/chat/stream'): chat_stream,
+    ('GET', '/health'): health_check,
+}
+
+
+async def app(scope, receive, send) -> None:
+    """ASGI 애플리케이션 진입점"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    if scope['type'] != 'http':
+        return
+    
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        await _send_json(send, {'success': False, 'message': 'Not Found'}, status=404)
+        return
+    await handler(scope, receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    
+    print("=" * 50)
+    print("LLM Chatbot Async Web Application")
+    print("=" * 50)
+    print("브라우저에서 http://localhost:5000 으로 접속하세요.")
+    print("=" * 50)
+    
+    uvicorn.run(app, host='0.0.0.0', port=5000)
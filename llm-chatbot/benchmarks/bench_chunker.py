@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+청크 분할 벤치마크: TextChunker vs 이전 문자 기반 분할기
+
+수 MB 크기의 텍스트에서 분할 시간과 청크 수, 그리고 임베딩 모델 토큰 기준으로
+최대 입력 길이를 넘어 임베딩 시 잘리는 청크의 비율을 비교한다.
+
+실행 방법:
+    python benchmarks/bench_chunker.py --sizes 1000000 4000000
+    python benchmarks/bench_chunker.py --no-model   # 모델 없이 근사 토큰으로 측정
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+# src 모듈 import를 위한 경로 추가
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from synthetic import generate_text
+from src.chunker import TextChunker
+from src.config import EMBEDDING_MODEL_NAME, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS
+
+
+def legacy_split_text(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+    """이전 DocumentEmbedder._split_text 구현 (비교용)"""
+    if len(text) <= chunk_size:
+        return [text]
+    
+    chunks = []
+    start = 0
+    
+    while start < len(text):
+        end = start + chunk_size
+        
+        # 문장 경계에서 분할
+        if end < len(text):
+            # 마지막 마침표나 줄바꿈을 찾아서 분할
+            last_period = text.rfind('.', start, end)
+            last_newline = text.rfind('\n', start, end)
+            split_point = max(last_period, last_newline)
+            
+            if split_point > start:
+                end = split_point + 1
+        
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        
+        start = end - overlap
+        if start >= len(text):
+            break
+    
+    return chunks
+
+
+def measure(name: str, split, text: str, counter: TextChunker, model_limit: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    chunks = split(text)
+    elapsed = time.perf_counter() - start
+    
+    token_counts = [counter.count_tokens(chunk) for chunk in chunks]
+    truncated = sum(1 for count in token_counts if count > model_limit)
+    result = {
+        'seconds': elapsed,
+        'mb_per_sec': len(text.encode('utf-8')) / 1e6 / elapsed,
+        'chunks': len(chunks),
+        'max_tokens': max(token_counts),
+        'mean_tokens': sum(token_counts) / len(token_counts),
+        'truncated_chunks': truncated,
+        'truncated_ratio': truncated / len(chunks)
+    }
+    print(f"  {name:<8} {elapsed:8.2f}s {result['chunks']:>8} chunks  max {result['max_tokens']:>5} tokens  "
+          f"truncated {result['truncated_ratio']:.1%}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 분할 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1_000_000, 4_000_000],
+                        help="입력 텍스트 길이 (문자 수)")
+    parser.add_argument("--no-model", action="store_true",
+                        help="임베딩 모델 토크나이저 대신 근사 토큰 사용")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+    
+    tokenizer = None
+    model_limit = CHUNK_MAX_TOKENS
+    if not args.no_model:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        tokenizer = model.tokenizer
+        model_limit = model.max_seq_length - 2
+    chunker = TextChunker(tokenizer, min(CHUNK_MAX_TOKENS, model_limit), CHUNK_OVERLAP_TOKENS)
+    
+    results = []
+    for size in args.sizes:
+        prose = generate_text(size)
+        # 마침표/줄바꿈이 없는 텍스트 (이전 분할기의 최악 경우)
+        unpunctuated = prose.replace('.', '').replace('\n', ' ')
+        for label, text in (('prose', prose), ('unpunctuated', unpunctuated)):
+            print(f"{label} text, {len(text):,} chars")
+            results.append({
+                'input': label,
+                'chars': len(text),
+                'legacy': measure('legacy', legacy_split_text, text, chunker, model_limit),
+                'chunker': measure('chunker', lambda value: [chunk for chunk, _, _ in chunker.split(value)],
+                                   text, chunker, model_limit)
+            })
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+BM25 역색인 벤치마크
+
+임베딩 없이 합성 청크만으로 BM25Index를 만들어 색인 속도, 로드 시간,
+검색 지연 시간(p50/p95/p99)을 측정한다.
+
+실행 방법:
+    python benchmarks/bench_lexical.py --chunks 1000000
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+from pathlib import Path
+
+# src 모듈 import를 위한 경로 추가
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from synthetic import generate_text, generate_queries
+from run_benchmarks import latency_stats
+from src.lexical import BM25Index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 역색인 벤치마크")
+    parser.add_argument("--chunks", type=int, default=1_000_000, help="색인할 청크 수")
+    parser.add_argument("--chunk-chars", type=int, default=400, help="청크당 문자 수")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    # 청크마다 본문을 새로 생성하면 느리므로 큰 텍스트에서 임의 위치를 잘라 사용
+    text = generate_text(args.chunk_chars * 2000)
+    
+    with tempfile.TemporaryDirectory(prefix="bm25-bench-") as workdir:
+        db_path = os.path.join(workdir, "lexical.sqlite3")
+        index = BM25Index(db_path)
+        
+        start = time.perf_counter()
+        batch_ids, batch_texts = [], []
+        for i in range(args.chunks):
+            offset = rng.randrange(len(text) - args.chunk_chars)
+            # 과정 코드처럼 청크마다 고유한 값 포함
+            batch_ids.append(f"chunk-{i}")
+            batch_texts.append(f"C{i:07d} " + text[offset:offset + args.chunk_chars])
+            if len(batch_ids) >= 1000:
+                index.add(batch_ids, batch_texts)
+                batch_ids, batch_texts = [], []
+        index.add(batch_ids, batch_texts)
+        index.save()
+        index_seconds = time.perf_counter() - start
+        print(f"Indexed {args.chunks} chunks in {index_seconds:.1f}s")
+        
+        start = time.perf_counter()
+        index = BM25Index(db_path)
+        load_seconds = time.perf_counter() - start
+        print(f"Loaded index in {load_seconds:.1f}s")
+        
+        queries = generate_queries(args.queries)
+        # 과정 코드 정확 일치 쿼리
+        queries += [f"C{rng.randrange(args.chunks):07d} 과정 수강료" for _ in range(args.queries)]
+        # 첫 번째 실행은 용어별 점수/후보 목록 계산 비용 포함
+        stats = {}
+        for label in ('cold', 'warm'):
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query, args.top_k)
+                samples.append(time.perf_counter() - start)
+            stats[label] = latency_stats(samples)
+            print(f"Search ({label}): p50={stats[label]['p50_ms']:.2f}ms p95={stats[label]['p95_ms']:.2f}ms "
+                  f"p99={stats[label]['p99_ms']:.2f}ms")
+    
+    results = {
+        'chunks': args.chunks,
+        'terms': len(index.postings),
+        'index_seconds': index_seconds,
+        'load_seconds': load_seconds,
+        'search': stats
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
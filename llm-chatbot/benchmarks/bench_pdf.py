@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+PDF 텍스트 추출 벤치마크
+
+합성 PDF로 기존 방식(PyPDF2로 한 페이지씩 순차 추출)과 PDFExtractor의 추출기/워커 수별
+처리량(pages/sec)을 비교하고, 페이지 캐시가 있을 때 다시 읽는 속도를 측정한다.
+
+실행 방법:
+    python benchmarks/bench_pdf.py --pages 500 --workers 1 4
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+from pathlib import Path
+
+# src 모듈 import를 위한 경로 추가
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import PyPDF2
+
+from synthetic import write_pdf
+from src.pdf_extract import PDFExtractor, PageTextCache, PDF_BACKENDS, fitz
+
+
+def baseline_extract(path: str) -> int:
+    """기존 DocumentLoader._iter_pdf와 같은 방식으로 추출하고 문자 수 반환"""
+    chars = 0
+    with open(path, 'rb') as file:
+        for page in PyPDF2.PdfReader(file).pages:
+            chars += len(page.extract_text() or "")
+    return chars
+
+
+def run_extractor(extractor: PDFExtractor, path: str) -> int:
+    return sum(len(text) for _, text in extractor.iter_pages(path))
+
+
+def measure(label: str, pages: int, func) -> dict:
+    start = time.perf_counter()
+    chars = func()
+    seconds = time.perf_counter() - start
+    print(f"  {label}: {pages / seconds:.1f} pages/sec ({seconds:.2f}s, {chars} chars)")
+    return {'seconds': seconds, 'pages_per_sec': pages / seconds, 'chars': chars}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 텍스트 추출 벤치마크")
+    parser.add_argument("--pages", type=int, default=500, help="합성 PDF의 페이지 수")
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 4], help="페이지 병렬 추출 프로세스 수")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+    
+    backends = [backend for backend in PDF_BACKENDS if backend != 'pymupdf' or fitz is not None]
+    results = {'pages': args.pages, 'cpu_count': os.cpu_count(), 'extract': {}}
+    with tempfile.TemporaryDirectory(prefix="pdf-bench-") as workdir:
+        path = os.path.join(workdir, "brochure.pdf")
+        write_pdf(Path(path), random.Random(42), args.pages, 0)
+        results['file_mb'] = os.path.getsize(path) / 1e6
+        print(f"Generated {args.pages}-page PDF ({results['file_mb']:.1f} MB)")
+        
+        results['baseline'] = measure("baseline (PyPDF2, sequential)", args.pages, lambda: baseline_extract(path))
+        
+        for backend in backends:
+            for workers in args.workers:
+                extractor = PDFExtractor(backend, max_workers=workers, parallel_min_pages=1, use_cache=False)
+                label = f"{backend}_workers_{workers}"
+                results['extract'][label] = measure(label, args.pages, lambda: run_extractor(extractor, path))
+                results['extract'][label]['speedup'] = (
+                    results['baseline']['seconds'] / results['extract'][label]['seconds']
+                )
+        
+        # 설정 변경 후 재인덱싱처럼 같은 파일을 다시 읽는 경우
+        cache = PageTextCache(os.path.join(workdir, "pages.sqlite3"))
+        extractor = PDFExtractor('auto', max_workers=max(args.workers), parallel_min_pages=1, cache=cache)
+        results['cache'] = {
+            'cold': measure(f"{extractor.backend} cache cold", args.pages, lambda: run_extractor(extractor, path)),
+            'warm': measure(f"{extractor.backend} cache warm", args.pages, lambda: run_extractor(extractor, path))
+        }
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
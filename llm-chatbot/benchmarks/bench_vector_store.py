@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+벡터 저장소 벤치마크
+
+임베딩 모델 없이 합성 벡터(군집 구조가 있는 정규화 벡터)로 Chroma 컬렉션과 mmap 저장소
+(float32/float16/int8, IVF 사용 여부)를 만들어 다음 항목을 측정한다.
+    - 저장 시간, 다시 여는 시간, 디스크 크기
+    - 단일 쿼리 / 배치 쿼리 검색 지연 시간 (p50/p95/p99)
+    - 정확한 전체 검색(float32) 대비 recall@k
+
+실행 방법:
+    python benchmarks/bench_vector_store.py --vectors 100000 --ivf-lists 256
+    python benchmarks/bench_vector_store.py --vectors 20000 --chroma
+"""
+
+import sys
+import json
+import time
+import tempfile
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# src 모듈 import를 위한 경로 추가
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from run_benchmarks import latency_stats
+from src.vector_store import MmapVectorStore
+
+
+def generate_vectors(count: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """군집 중심 주변에 흩어진 정규화 벡터 (실제 문서 임베딩처럼 주제별로 모임)"""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=count)] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    scores = queries @ vectors.T
+    return [set(np.argpartition(-row, k - 1)[:k].tolist()) for row in scores]
+
+
+def measure(store, queries: np.ndarray, top_k: int, batch_size: int,
+            expected: List[set]) -> Dict[str, Any]:
+    """단일/배치 검색 지연 시간과 recall@k"""
+    # 첫 조회의 페이지 캐시 적재 비용은 제외
+    store.query(query_embeddings=queries[:1].tolist(), n_results=top_k, include=[])
+    samples = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        result = store.query(query_embeddings=[query.tolist()], n_results=top_k, include=[])
+        samples.append(time.perf_counter() - start)
+        found.append({int(chunk_id[1:]) for chunk_id in result['ids'][0]})
+    recall = float(np.mean([len(got & want) / len(want) for got, want in zip(found, expected)]))
+    
+    batch_samples = []
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        begin = time.perf_counter()
+        store.query(query_embeddings=batch.tolist(), n_results=top_k, include=[])
+        # 쿼리당 시간으로 환산
+        batch_samples.extend([(time.perf_counter() - begin) / len(batch)] * len(batch))
+    return {'recall': recall, 'single': latency_stats(samples), 'batch_per_query': latency_stats(batch_samples)}
+
+
+def directory_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def report(name: str, result: Dict[str, Any]) -> None:
+    print(f"{name:<24} recall@k={result['recall']:.3f} "
+          f"single p50={result['single']['p50_ms']:.2f}ms p95={result['single']['p95_ms']:.2f}ms "
+          f"batch p50={result['batch_per_query']['p50_ms']:.2f}ms/query "
+          f"open={result['open_ms']:.1f}ms size={result['storage_bytes'] / 1024 / 1024:.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 저장소 벤치마크")
+    parser.add_argument("--vectors", type=int, default=100_000, help="저장할 벡터 수")
+    parser.add_argument("--dim", type=int, default=384, help="벡터 차원 (기본: MiniLM 계열)")
+    parser.add_argument("--clusters", type=int, default=500, help="합성 벡터의 군집 수")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=20, help="배치 검색 시 쿼리 수")
+    parser.add_argument("--dtypes", nargs='+', default=['float32', 'float16', 'int8'])
+    parser.add_argument("--ivf-lists", type=int, default=256, help="IVF 목록 수 (0이면 IVF 측정 생략)")
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--chroma", action="store_true", help="Chroma 컬렉션도 측정")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(42)
+    vectors = generate_vectors(args.vectors, args.dim, args.clusters, rng)
+    # 쿼리는 저장된 벡터에 크기 0.5 정도의 잡음을 더해 만듦
+    noise = rng.standard_normal((args.queries, args.dim)).astype(np.float32) * (0.5 / np.sqrt(args.dim))
+    queries = vectors[rng.integers(args.vectors, size=args.queries)] + noise
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    expected = exact_top_k(vectors, queries, args.top_k)
+    ids = [f"c{i}" for i in range(args.vectors)]
+    
+    results: Dict[str, Any] = {'vectors': args.vectors, 'dim': args.dim, 'top_k': args.top_k, 'stores': {}}
+    with tempfile.TemporaryDirectory(prefix="vector-store-bench-") as workdir:
+        for dtype in args.dtypes:
+            directory = Path(workdir) / dtype
+            store = MmapVectorStore(str(directory), dtype=dtype, ivf_lists=0, nprobe=args.nprobe)
+            start = time.perf_counter()
+            for offset in range(0, args.vectors, 10000):
+                store.upsert(ids[offset:offset + 10000], vectors[offset:offset + 10000])
+            insert_seconds = time.perf_counter() - start
+            del store
+            
+            start = time.perf_counter()
+            store = MmapVectorStore(str(directory), nprobe=args.nprobe)
+            open_ms = (time.perf_counter() - start) * 1000
+            result = measure(store, queries, args.top_k, args.batch_size, expected)
+            result.update(insert_seconds=insert_seconds, open_ms=open_ms, storage_bytes=store.storage_bytes())
+            results['stores'][f"mmap-{dtype}"] = result
+            report(f"mmap-{dtype}", result)
+            
+            if args.ivf_lists > 0:
+                start = time.perf_counter()
+                store.build_ivf(args.ivf_lists)
+                build_seconds = time.perf_counter() - start
+                result = measure(store, queries, args.top_k, args.batch_size, expected)
+                result.update(build_seconds=build_seconds, open_ms=open_ms, storage_bytes=store.storage_bytes())
+                results['stores'][f"mmap-{dtype}-ivf"] = result
+                report(f"mmap-{dtype}-ivf{args.ivf_lists}", result)
+        
+        if args.chroma:
+            import chromadb
+            directory = Path(workdir) / "chroma"
+            client = chromadb.PersistentClient(path=str(directory))
+            collection = client.create_collection("bench", metadata={"hnsw:space": "cosine"}, embedding_function=None)
+            start = time.perf_counter()
+            for offset in range(0, args.vectors, 5000):
+                collection.add(ids=ids[offset:offset + 5000], embeddings=vectors[offset:offset + 5000].tolist())
+            insert_seconds = time.perf_counter() - start
+            del collection, client
+            
+            start = time.perf_counter()
+            collection = chromadb.PersistentClient(path=str(directory)).get_collection("bench")
+            collection.count()
+            open_ms = (time.perf_counter() - start) * 1000
+            result = measure(collection, queries, args.top_k, args.batch_size, expected)
+            result.update(insert_seconds=insert_seconds, open_ms=open_ms, storage_bytes=directory_bytes(directory))
+            results['stores']['chroma'] = result
+            report("chroma", result)
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
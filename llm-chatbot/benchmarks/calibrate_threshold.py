@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+SIMILARITY_THRESHOLD 보정 도구
+
+관련 있는 질문과 관련 없는 질문(인사, 스팸, 무의미한 입력 등)에 대해 현재 벡터 DB에서
+가장 가까운 청크의 유사도를 구하고, 임계값별로 두 집합을 얼마나 잘 구분하는지 출력한다.
+
+실행 방법:
+    python benchmarks/calibrate_threshold.py
+    python benchmarks/calibrate_threshold.py --labeled queries.jsonl
+
+queries.jsonl은 한 줄에 하나씩 {"query": "...", "relevant": true} 형식이다.
+지정하지 않으면 합성 코퍼스용 질문과 기본 제공 관련 없는 질문을 사용한다.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# src 모듈 import를 위한 경로 추가
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from synthetic import generate_queries
+from src.embedding import DocumentEmbedder
+from src.config import SIMILARITY_THRESHOLD
+
+OFF_TOPIC_QUERIES = [
+    "안녕", "hi", "hello", "ㅋㅋㅋㅋ", "asdfghjkl", "ㅁㄴㅇㄹ", "테스트", "?",
+    "오늘 날씨 어때?", "점심 메뉴 추천해줘", "로또 번호 알려줘", "주식 뭐 사야 돼?",
+    "무료 대출 상담 클릭하세요", "카지노 가입 이벤트 100% 보너스", "비트코인 시세",
+    "너 이름이 뭐야?", "농담 하나 해줘", "what is the capital of France",
+]
+
+
+def load_labeled(path: str) -> List[Tuple[str, bool]]:
+    with open(path, encoding='utf-8') as f:
+        return [(item['query'], bool(item['relevant'])) for item in map(json.loads, f) if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유사도 임계값 보정")
+    parser.add_argument("--labeled", help="레이블이 있는 질문 JSONL 파일")
+    parser.add_argument("--queries", type=int, default=100, help="합성 관련 질문 수")
+    parser.add_argument("--min-recall", type=float, default=0.95,
+                        help="관련 질문 중 통과시켜야 하는 최소 비율")
+    args = parser.parse_args()
+    
+    labeled = load_labeled(args.labeled) if args.labeled else (
+        [(query, True) for query in generate_queries(args.queries)] +
+        [(query, False) for query in OFF_TOPIC_QUERIES]
+    )
+    
+    embedder = DocumentEmbedder()
+    if embedder.collection.count() == 0:
+        print("벡터 DB가 비어 있습니다. 먼저 python app.py로 문서를 인덱싱해주세요.")
+        sys.exit(1)
+    
+    # 벡터 유사도만 보정 대상 (BM25 정확 일치 예외는 별도)
+    similarities = []
+    for query, _ in labeled:
+        docs = embedder.search_similar(query, top_k=1, mode='vector')
+        similarities.append(docs[0]['similarity'] if docs else 0.0)
+    similarities = np.asarray(similarities)
+    relevant = np.asarray([label for _, label in labeled])
+    
+    print(f"metric: {embedder.distance_metric}, current SIMILARITY_THRESHOLD: {SIMILARITY_THRESHOLD}")
+    print(f"relevant:  mean={similarities[relevant].mean():.3f} min={similarities[relevant].min():.3f}")
+    if (~relevant).any():
+        print(f"off-topic: mean={similarities[~relevant].mean():.3f} max={similarities[~relevant].max():.3f}")
+    print(f"{'threshold':>9} {'recall':>7} {'rejected off-topic':>19}")
+    
+    recommended = None
+    for threshold in np.arange(0.0, 1.0, 0.05):
+        passed = similarities >= threshold
+        recall = passed[relevant].mean()
+        rejected = (~passed[~relevant]).mean() if (~relevant).any() else 0.0
+        print(f"{threshold:>9.2f} {recall:>7.1%} {rejected:>19.1%}")
+        if recall >= args.min_recall:
+            recommended = threshold
+    
+    if recommended is not None:
+        print(f"Recommended SIMILARITY_THRESHOLD (recall >= {args.min_recall:.0%}): {recommended:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+벤치마크 결과 비교
+
+실행 방법:
+    python benchmarks/compare.py results/before.json results/after.json
+"""
+
+import sys
+import json
+import argparse
+from typing import Any, Dict
+
+# 값이 클수록 좋은 지표 (나머지는 지연 시간이므로 작을수록 좋음)
+HIGHER_IS_BETTER = ('files_per_sec', 'mb_per_sec', 'chunks_per_sec')
+
+
+def flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """비교할 지표만 '항목.세부항목.지표' 형태의 키로 추출"""
+    metrics = {}
+    for name, value in (results.get('loader') or {}).items():
+        for metric in ('files_per_sec', 'mb_per_sec'):
+            metrics[f"loader.{name}.{metric}"] = value[metric]
+    if 'embedding' in results:
+        metrics["embedding.chunks_per_sec"] = results['embedding']['chunks_per_sec']
+    for step in results.get('search', []):
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            metrics[f"search.{step.get('mode', 'vector')}.files_{step['files']}.{metric}"] = step[metric]
+    if 'chat' in results:
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            metrics[f"chat.{metric}"] = results['chat'][metric]
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    parser.add_argument("baseline", help="기준 결과 JSON")
+    parser.add_argument("candidate", help="비교할 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="회귀로 표시할 성능 저하 비율 (%%)")
+    args = parser.parse_args()
+    
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = json.load(f)
+    
+    before = flatten(baseline)
+    after = flatten(candidate)
+    print(f"baseline:  {baseline.get('commit')} ({baseline.get('timestamp')})")
+    print(f"candidate: {candidate.get('commit')} ({candidate.get('timestamp')})")
+    print(f"{'metric':<40} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    
+    regressions = 0
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        change = (new - old) / old * 100 if old else 0.0
+        worse = -change if key.endswith(HIGHER_IS_BETTER) else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key:<40} {old:>12.2f} {new:>12.2f} {change:>+8.1f}%{flag}")
+    
+    for key in sorted(set(before) ^ set(after)):
+        print(f"{key:<40} (only in {'baseline' if key in before else 'candidate'})")
+    
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
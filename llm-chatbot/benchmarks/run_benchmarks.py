@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+수집/검색/대화 지연 시간 벤치마크
+
+합성 코퍼스를 만들어 다음 항목을 측정하고 결과를 JSON으로 저장한다.
+    - loader: DocumentLoader 파싱 처리량 (순차 / 병렬)
+    - embedding: DocumentEmbedder.embed_documents 청크 처리량
+    - search: 컬렉션 크기별 search_similar 지연 시간 (p50/p95/p99)
+    - chat: 스텁 LLM을 사용한 /chat 요청 지연 시간
+
+실행 방법:
+    python benchmarks/run_benchmarks.py --sizes 20 100 500 --output results/bench.json
+    python benchmarks/compare.py results/before.json results/after.json
+
+검색/대화 측정에서는 쿼리 임베딩·검색 결과·응답 캐시를 끄고 매 요청의 실제 비용을 잰다.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import logging
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+# src 모듈 import를 위한 경로 추가
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from synthetic import generate_corpus, generate_queries
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """지연 시간 샘플(초)의 요약 통계 (밀리초 단위)"""
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        'count': int(values.size),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max())
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_loader(file_paths: List[str], workers: List[int]) -> Dict[str, Any]:
+    """파일 파싱 처리량 측정"""
+    from src.loader import DocumentLoader
+    
+    total_bytes = sum(os.path.getsize(path) for path in file_paths)
+    results = {}
+    for max_workers in workers:
+        loader = DocumentLoader(max_workers=max_workers)
+        start = time.perf_counter()
+        segments = 0
+        chars = 0
+        for doc in loader.iter_documents(file_paths):
+            for segment in doc['segments']:
+                segments += 1
+                chars += len(segment['content'])
+        elapsed = time.perf_counter() - start
+        results[f"workers_{max_workers}"] = {
+            'files': len(file_paths),
+            'errors': len(loader.errors),
+            'segments': segments,
+            'chars': chars,
+            'seconds': elapsed,
+            'files_per_sec': len(file_paths) / elapsed,
+            'mb_per_sec': total_bytes / 1e6 / elapsed
+        }
+        print(f"  loader workers={max_workers}: {len(file_paths) / elapsed:.1f} files/sec")
+    return results
+
+
+def _disable_caches(embedder) -> None:
+    from src.cache import TTLCache
+    embedder.query_embedding_cache = TTLCache(0, 0)
+    embedder.search_cache = TTLCache(0, 0)
+
+
+def bench_embedding_and_search(file_paths: List[str], sizes: List[int], persist_directory: str,
+                               queries: List[str], top_k: int) -> Dict[str, Any]:
+    """컬렉션을 단계적으로 키우면서 임베딩 처리량과 검색 지연 시간 측정"""
+    from src.loader import DocumentLoader
+    from src.embedding import DocumentEmbedder
+    
+    embedder = DocumentEmbedder(persist_directory=persist_directory)
+    _disable_caches(embedder)
+    loader = DocumentLoader(max_workers=1)
+    
+    embedding_results = []
+    search_results = []
+    indexed = 0
+    for size in sizes:
+        new_files = file_paths[indexed:size]
+        indexed = size
+        
+        before = embedder.collection.count()
+        start = time.perf_counter()
+        embedder.embed_documents(loader.iter_documents(new_files))
+        elapsed = time.perf_counter() - start
+        chunk_count = embedder.collection.count()
+        added = chunk_count - before
+        embedding_results.append({
+            'files': len(new_files),
+            'chunks': added,
+            'seconds': elapsed,
+            'chunks_per_sec': added / elapsed if elapsed else 0.0
+        })
+        print(f"  embed +{len(new_files)} files: {added / max(elapsed, 1e-9):.1f} chunks/sec")
+        
+        for mode in ('vector', 'hybrid'):
+            # 첫 쿼리의 초기화 비용은 제외
+            embedder.search_similar(queries[0], top_k=top_k, mode=mode)
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                embedder.search_similar(query, top_k=top_k, mode=mode)
+                samples.append(time.perf_counter() - start)
+            stats = latency_stats(samples)
+            search_results.append(dict(stats, mode=mode, files=size, chunks=chunk_count, top_k=top_k))
+            print(f"  search ({mode}) @ {chunk_count} chunks: p50={stats['p50_ms']:.1f}ms "
+                  f"p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms")
+    
+    total_chunks = sum(item['chunks'] for item in embedding_results)
+    total_seconds = sum(item['seconds'] for item in embedding_results)
+    return {
+        'embedding': {
+            'steps': embedding_results,
+            'chunks': total_chunks,
+            'seconds': total_seconds,
+            'chunks_per_sec': total_chunks / total_seconds if total_seconds else 0.0
+        },
+        'search': search_results
+    }
+
+
+def bench_chat(queries: List[str]) -> Dict[str, Any]:
+    """Flask 테스트 클라이언트로 /chat 요청 지연 시간 측정 (스텁 LLM 사용)"""
+    import web_app
+    
+    _disable_caches(web_app.embedder)
+    client = web_app.app.test_client()
+    client.post('/chat', json={'message': queries[0]})
+    
+    samples = []
+    failures = 0
+    for query in queries:
+        start = time.perf_counter()
+        response = client.post('/chat', json={'message': query})
+        samples.append(time.perf_counter() - start)
+        if response.status_code != 200 or not response.get_json().get('success'):
+            failures += 1
+    stats = latency_stats(samples)
+    print(f"  chat: p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms")
+    return dict(stats, failures=failures, llm_backend='stub', retrieval=web_app.chatbot.get_stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 챗봇 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[20, 100],
+                        help="검색 지연 시간을 측정할 누적 파일 수 (오름차순)")
+    parser.add_argument("--file-size", type=int, default=50,
+                        help="파일당 분량 (문단/행 수)")
+    parser.add_argument("--loader-files", type=int, default=50,
+                        help="파싱 처리량 측정에 사용할 파일 수")
+    parser.add_argument("--loader-workers", type=int, nargs='+', default=[1, 4],
+                        help="비교할 로더 프로세스 수")
+    parser.add_argument("--queries", type=int, default=200,
+                        help="검색/대화 측정 쿼리 수")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip", nargs='*', default=[], choices=['loader', 'embedding', 'chat'],
+                        help="건너뛸 측정 항목 (embedding을 건너뛰면 search와 chat도 건너뜀)")
+    parser.add_argument("--workdir", help="코퍼스/DB를 만들 디렉토리 (기본값: 임시 디렉토리)")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (기본값: 표준 출력)")
+    args = parser.parse_args()
+    
+    sizes = sorted(args.sizes)
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="chatbot-bench-"))
+    corpus_dir = workdir / "corpus"
+    persist_directory = str(workdir / "chroma")
+    
+    # web_app import 시점의 설정을 벤치마크용으로 지정
+    os.environ['LLM_BACKEND'] = 'stub'
+    os.environ['CHROMA_PERSIST_DIRECTORY'] = persist_directory
+    os.environ['ANSWER_CACHE_ENABLED'] = 'false'
+    
+    results: Dict[str, Any] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'platform': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'system': platform.system(),
+            'cpu_count': os.cpu_count()
+        },
+        'params': vars(args)
+    }
+    
+    try:
+        print(f"Generating corpus in {corpus_dir}")
+        file_paths = generate_corpus(str(corpus_dir), max(sizes[-1], args.loader_files),
+                                     file_size=args.file_size, seed=args.seed)
+        queries = generate_queries(args.queries, seed=args.seed)
+        
+        if 'loader' not in args.skip:
+            print("Benchmarking loader")
+            results['loader'] = bench_loader(file_paths[:args.loader_files], args.loader_workers)
+        
+        if 'embedding' not in args.skip:
+            print("Benchmarking embedding and search")
+            results.update(bench_embedding_and_search(file_paths, sizes, persist_directory, queries, args.top_k))
+            
+            if 'chat' not in args.skip:
+                print("Benchmarking /chat")
+                results['chat'] = bench_chat(queries)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(output, encoding='utf-8')
+        print(f"Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+OpenAI Chat Completions 호환 로컬 스텁 서버 (부하 테스트용)
+
+실제 API 대신 정해진 응답을 지연 모델(첫 토큰 지연 + 초당 토큰 수)에 맞춰 돌려준다.
+스트리밍(stream=true)과 일반 응답을 모두 지원한다.
+
+실행 방법:
+    python benchmarks/stub_llm_server.py --port 8001 --first-token-latency 0.5 --tokens-per-second 50
+    OPENAI_API_BASE=http://localhost:8001/v1 uvicorn async_web_app:app
+"""
+
+import json
+import time
+import asyncio
+import argparse
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE = (
+    "안녕하세요, 문의해주셔서 감사합니다. 요청하신 교육 과정 정보를 안내해드리겠습니다. "
+    "해당 과정은 온라인과 오프라인으로 모두 수강하실 수 있으며, 자세한 커리큘럼과 수강료는 "
+    "교육 자료를 참고하시면 됩니다. 추가 문의사항이 있으시면 언제든 연락주세요."
+)
+
+
+class StubLLMServer:
+    """최소한의 HTTP/1.1 처리로 /chat/completions 요청에 응답하는 스텁 서버"""
+    
+    def __init__(self, response_text: str = DEFAULT_RESPONSE,
+                 first_token_latency: float = 0.5, tokens_per_second: float = 50.0):
+        self.response_text = response_text
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.request_count = 0
+    
+    def _tokens(self):
+        """응답을 공백 단위 토큰으로 분할"""
+        words = self.response_text.split(' ')
+        return [word if i == 0 else ' ' + word for i, word in enumerate(words)]
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """연결 하나에서 keep-alive 요청들을 순서대로 처리"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                
+                if method != 'POST' or not path.rstrip('/').endswith('/chat/completions'):
+                    await self._write_json(writer, {'error': {'message': 'Not Found'}}, status=404)
+                    continue
+                
+                self.request_count += 1
+                payload = json.loads(body or b'{}')
+                if payload.get('stream'):
+                    await self._write_stream(writer, payload)
+                    break
+                await self._write_completion(writer, payload)
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _write_json(self, writer: asyncio.StreamWriter, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+    
+    async def _write_completion(self, writer: asyncio.StreamWriter, payload: dict) -> None:
+        """전체 응답 시간만큼 기다린 뒤 한 번에 응답"""
+        tokens = self._tokens()
+        await asyncio.sleep(self.first_token_latency + len(tokens) / self.tokens_per_second)
+        await self._write_json(writer, {
+            'id': f"stub-{self.request_count}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': self.response_text},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': len(tokens), 'total_tokens': len(tokens)}
+        })
+    
+    async def _write_stream(self, writer: asyncio.StreamWriter, payload: dict) -> None:
+        """토큰 속도에 맞춰 SSE 청크 전송"""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        await writer.drain()
+        
+        await asyncio.sleep(self.first_token_latency)
+        delay = 1.0 / self.tokens_per_second
+        for i, token in enumerate(self._tokens()):
+            if i:
+                await asyncio.sleep(delay)
+            chunk = {
+                'id': f"stub-{self.request_count}",
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': payload.get('model', 'stub'),
+                'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]
+            }
+            writer.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+            await writer.drain()
+        
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
+
+
+async def serve(host: str, port: int, server: StubLLMServer) -> None:
+    """스텁 서버 실행"""
+    listener = await asyncio.start_server(server.handle_connection, host, port, backlog=4096)
+    logger.info(f"Stub LLM server listening on http://{host}:{port}/v1")
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="OpenAI 호환 스텁 LLM 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--first-token-latency", type=float, default=0.5,
+                        help="첫 토큰까지의 지연 (초)")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0,
+                        help="토큰 생성 속도")
+    parser.add_argument("--response", default=DEFAULT_RESPONSE,
+                        help="모든 요청에 돌려줄 응답 텍스트")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(serve(args.host, args.port, StubLLMServer(
+            args.response, args.first_token_latency, args.tokens_per_second
+        )))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,223 @@
+"""
+벤치마크용 합성 교육 자료 코퍼스 생성기
+
+data/ 샘플과 같은 형식(txt, pdf, docx, xlsx, csv)의 파일을 원하는 개수와 크기로 만든다.
+같은 seed로 만들면 항상 같은 코퍼스가 생성된다.
+"""
+
+import csv
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from docx import Document
+from openpyxl import Workbook
+
+COURSE_NAMES = [
+    "머신러닝 기초", "데이터 사이언스 실무", "Python 프로그래밍", "딥러닝 심화", "웹 개발 부트캠프",
+    "SQL 데이터 분석", "클라우드 인프라", "자연어 처리", "컴퓨터 비전", "MLOps 입문"
+]
+INSTRUCTORS = ["김민수", "이지은", "박준호", "최서연", "정우진", "한지민"]
+FORMATS = ["온라인", "오프라인", "온·오프라인 병행"]
+TOPICS = [
+    "회귀와 분류", "모델 평가", "특성 공학", "신경망 구조", "데이터 전처리", "시각화",
+    "API 설계", "배포 자동화", "하이퍼파라미터 튜닝", "추천 시스템"
+]
+ENGLISH_TOPICS = [
+    "linear models", "model evaluation", "feature engineering", "neural networks", "data cleaning",
+    "visualization", "API design", "deployment", "hyperparameter tuning", "recommender systems"
+]
+
+FILE_TYPES = ['txt', 'pdf', 'docx', 'xlsx', 'csv']
+
+
+def _course_record(rng: random.Random, index: int) -> Dict[str, str]:
+    name = rng.choice(COURSE_NAMES)
+    return {
+        '과정코드': f"C{index:05d}",
+        '과정명': f"{name} {index}기",
+        '강사': rng.choice(INSTRUCTORS),
+        '기간': f"{rng.choice([4, 8, 12, 16])}주",
+        '수강료': f"{rng.choice([30, 45, 60, 90, 120]) * 10000:,}원",
+        '수업방식': rng.choice(FORMATS),
+        '주요내용': ", ".join(rng.sample(TOPICS, 3))
+    }
+
+
+def _paragraph(rng: random.Random, index: int) -> str:
+    record = _course_record(rng, index)
+    return (
+        f"{record['과정명']} 과정은 {record['강사']} 강사가 진행하며 {record['기간']} 동안 "
+        f"{record['수업방식']}으로 운영됩니다. 수강료는 {record['수강료']}입니다. "
+        f"주요 내용은 {record['주요내용']}입니다. 수료 후에는 실무 프로젝트를 통해 배운 내용을 "
+        f"직접 적용해볼 수 있습니다."
+    )
+
+
+def _english_paragraph(rng: random.Random, index: int) -> str:
+    # 기본 Type1 글꼴은 한글을 표현할 수 없으므로 PDF에는 영문 텍스트 사용
+    return (
+        f"Course C{index:05d} covers {', '.join(rng.sample(ENGLISH_TOPICS, 3))}. "
+        f"It runs for {rng.choice([4, 8, 12, 16])} weeks and costs {rng.choice([300, 450, 600, 900])} USD. "
+        f"Students complete a hands-on project at the end of the course."
+    )
+
+
+def write_txt(path: Path, rng: random.Random, paragraphs: int, start: int) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(paragraphs):
+            f.write(_paragraph(rng, start + i) + "\n\n")
+
+
+def write_docx(path: Path, rng: random.Random, paragraphs: int, start: int) -> None:
+    doc = Document()
+    doc.add_heading("교육 과정 안내", level=1)
+    for i in range(paragraphs):
+        doc.add_paragraph(_paragraph(rng, start + i))
+    doc.save(path)
+
+
+def write_csv(path: Path, rng: random.Random, rows: int, start: int) -> None:
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = None
+        for i in range(rows):
+            record = _course_record(rng, start + i)
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(record.keys()))
+                writer.writeheader()
+            writer.writerow(record)
+
+
+def write_xlsx(path: Path, rng: random.Random, rows: int, start: int) -> None:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("커리큘럼")
+    header_written = False
+    for i in range(rows):
+        record = _course_record(rng, start + i)
+        if not header_written:
+            sheet.append(list(record.keys()))
+            header_written = True
+        sheet.append(list(record.values()))
+    workbook.save(path)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path: Path, rng: random.Random, pages: int, start: int, lines_per_page: int = 40) -> None:
+    """외부 라이브러리 없이 텍스트만 있는 최소 PDF 작성"""
+    objects: List[bytes] = []
+    
+    def add_object(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+    
+    catalog_id = add_object(b"")  # 페이지 목록을 만든 뒤 채움
+    pages_id = add_object(b"")
+    font_id = add_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    
+    page_ids = []
+    for page in range(pages):
+        lines = []
+        while len(lines) < lines_per_page:
+            paragraph = _english_paragraph(rng, start + page * lines_per_page + len(lines))
+            # 한 줄에 약 90자씩 배치
+            for offset in range(0, len(paragraph), 90):
+                lines.append(paragraph[offset:offset + 90])
+        text_ops = "".join(f"({_pdf_escape(line)}) Tj T* " for line in lines[:lines_per_page])
+        stream = f"BT /F1 10 Tf 14 TL 40 770 Td {text_ops}ET".encode('latin-1')
+        content_id = add_object(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add_object(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font_id, content_id)
+        ))
+    
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode('latin-1')
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+    
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_offset
+    )
+    path.write_bytes(bytes(output))
+
+
+def generate_corpus(output_dir: str, num_files: int, file_size: int = 50, seed: int = 42,
+                    file_types: List[str] = None) -> List[str]:
+    """합성 코퍼스 생성
+    
+    file_size는 파일당 분량으로, txt/docx는 문단 수, csv/xlsx는 행 수, pdf는 페이지 수(1/10)로 쓰인다.
+    """
+    rng = random.Random(seed)
+    file_types = file_types or FILE_TYPES
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    
+    paths = []
+    for i in range(num_files):
+        file_type = file_types[i % len(file_types)]
+        path = output / f"synthetic_{i:06d}.{file_type}"
+        start = i * file_size
+        if file_type == 'txt':
+            write_txt(path, rng, file_size, start)
+        elif file_type == 'docx':
+            write_docx(path, rng, file_size, start)
+        elif file_type == 'csv':
+            write_csv(path, rng, file_size, start)
+        elif file_type == 'xlsx':
+            write_xlsx(path, rng, file_size, start)
+        elif file_type == 'pdf':
+            write_pdf(path, rng, max(file_size // 10, 1), start)
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
+        paths.append(str(path))
+    return paths
+
+
+def generate_text(num_chars: int, seed: int = 42, english_ratio: float = 0.2) -> str:
+    """한국어/영어 문단이 섞인 num_chars 길이 이상의 텍스트 생성"""
+    rng = random.Random(seed)
+    paragraphs = []
+    length = 0
+    index = 0
+    while length < num_chars:
+        if rng.random() < english_ratio:
+            paragraph = _english_paragraph(rng, index)
+        else:
+            paragraph = _paragraph(rng, index)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+        index += 1
+    return "\n\n".join(paragraphs)
+
+
+def generate_queries(count: int, seed: int = 7) -> List[str]:
+    """코퍼스 내용과 관련된 질문 생성"""
+    rng = random.Random(seed)
+    templates = [
+        "{course} 과정의 수강료가 얼마인가요?",
+        "{course} 과정은 몇 주 동안 진행되나요?",
+        "{instructor} 강사님이 진행하는 과정이 있나요?",
+        "{topic}을 배울 수 있는 과정을 추천해주세요",
+        "{format} 수업으로 들을 수 있는 {course} 과정이 있나요?",
+    ]
+    queries = []
+    for _ in range(count):
+        queries.append(rng.choice(templates).format(
+            course=rng.choice(COURSE_NAMES),
+            instructor=rng.choice(INSTRUCTORS),
+            topic=rng.choice(TOPICS),
+            format=rng.choice(FORMATS)
+        ))
+    return queries
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+벡터 저장소 마이그레이션 스크립트
+기존 Chroma 컬렉션의 임베딩/문서/메타데이터를 mmap 저장소로 옮긴다 (다시 임베딩하지 않음).
+
+실행 방법:
+    python migrate_vector_store.py --dtype int8 --ivf-lists 1024
+    VECTOR_STORE_BACKEND=mmap python app.py
+"""
+
+import os
+import json
+import argparse
+import logging
+
+import chromadb
+
+from src.config import (
+    CHROMA_PERSIST_DIRECTORY, CHROMA_COLLECTION_NAME, CHROMA_ADD_BATCH_SIZE,
+    INDEX_MANIFEST_FILENAME, MMAP_STORE_DIRNAME, VECTOR_STORE_DTYPE
+)
+from src.vector_store import MmapVectorStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate(persist_directory: str, dtype: str, ivf_lists: int, batch_size: int) -> int:
+    """Chroma 컬렉션을 mmap 저장소로 복사하고 복사한 청크 수 반환"""
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_collection(CHROMA_COLLECTION_NAME)
+    if (collection.metadata or {}).get('hnsw:space', 'l2') != 'cosine':
+        # mmap 저장소는 코사인 거리만 지원하므로 유사도 임계값 의미가 달라짐
+        logger.warning("Chroma collection does not use cosine distance; "
+                       "review SIMILARITY_THRESHOLD after migrating")
+    
+    store = MmapVectorStore(os.path.join(persist_directory, MMAP_STORE_DIRNAME), dtype=dtype, ivf_lists=0)
+    total = collection.count()
+    migrated = 0
+    for offset in range(0, total, batch_size):
+        batch = collection.get(include=['documents', 'metadatas', 'embeddings'], limit=batch_size, offset=offset)
+        if not batch['ids']:
+            break
+        store.upsert(batch['ids'], batch['embeddings'], batch['documents'], batch['metadatas'])
+        migrated += len(batch['ids'])
+        logger.info(f"Migrated {migrated}/{total} chunks")
+    
+    if ivf_lists > 0:
+        store.build_ivf(ivf_lists)
+    
+    # 매니페스트 설정을 mmap 저장소로 바꿔 다음 실행 때 전체를 다시 인덱싱하지 않게 함
+    manifest_path = os.path.join(persist_directory, INDEX_MANIFEST_FILENAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('settings') is not None:
+            data['settings']['vector_store_backend'] = 'mmap'
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+    
+    logger.info(f"Migration finished: {migrated} chunks, {store.storage_bytes() / 1024 / 1024:.1f} MB")
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chroma 컬렉션을 mmap 벡터 저장소로 마이그레이션")
+    parser.add_argument("--persist-dir", default=CHROMA_PERSIST_DIRECTORY, help="Chroma 저장 디렉토리")
+    parser.add_argument("--dtype", default=VECTOR_STORE_DTYPE, choices=['float16', 'int8', 'float32'],
+                        help="벡터 저장 형식")
+    parser.add_argument("--ivf-lists", type=int, default=0, help="IVF 목록 수 (0이면 전체 검색)")
+    parser.add_argument("--batch-size", type=int, default=CHROMA_ADD_BATCH_SIZE, help="한 번에 읽는 청크 수")
+    args = parser.parse_args()
+    
+    if os.path.exists(os.path.join(args.persist_dir, MMAP_STORE_DIRNAME)):
+        print(f"❌ {MMAP_STORE_DIRNAME} 저장소가 이미 있습니다. 삭제한 뒤 다시 실행해주세요.")
+        return
+    
+    migrate(args.persist_dir, args.dtype, args.ivf_lists, args.batch_size)
+    print("✅ 마이그레이션 완료. VECTOR_STORE_BACKEND=mmap으로 실행하세요.")
+    if args.ivf_lists > 0:
+        print(f"   IVF 색인을 유지하려면 VECTOR_STORE_IVF_LISTS={args.ivf_lists}도 설정하세요.")
+
+
+if __name__ == '__main__':
+    main()
@@ -51,6 +51,9 @@ def setup_google_drive():
             print(f"✅ {len(files)}개의 파일을 동기화했습니다:")
             for file in files:
                 print(f"  - {file}")
+        elif gdrive.state:
+            # 이전 동기화 이후 바뀐 파일이 없으면 받은 파일로 벡터 DB만 다시 확인
+            print("✅ 변경된 파일이 없습니다.")
         else:
             print("❌ 동기화할 파일이 없습니다.")
             return False
@@ -0,0 +1,170 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+from .config import ANSWER_CACHE_PATH, ANSWER_CACHE_SIMILARITY, ANSWER_CACHE_MAX_ENTRIES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# SQLite 바인딩 변수 개수 제한을 넘지 않도록 나누어 처리
+_SQL_BATCH_SIZE = 500
+
+
+def context_key(chunk_ids: List[str]) -> str:
+    """검색된 청크 ID 집합을 순서와 무관한 키로 변환"""
+    return hashlib.sha1("\n".join(sorted(set(chunk_ids))).encode('utf-8')).hexdigest()
+
+
+class SemanticAnswerCache:
+    """쿼리 임베딩과 검색된 청크 집합을 키로 LLM 응답을 저장하는 영구 캐시
+    
+    같은 청크 집합을 검색한 이전 쿼리 중 코사인 유사도가 임계값 이상인 것이
+    있으면 그 응답을 재사용한다. 청크가 변경/삭제되면 해당 응답은 제거된다.
+    """
+    
+    def __init__(self, db_path: str = ANSWER_CACHE_PATH,
+                 similarity_threshold: float = ANSWER_CACHE_SIMILARITY,
+                 max_entries: int = ANSWER_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                context_key TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_answers_context ON answers(context_key);
+            CREATE INDEX IF NOT EXISTS idx_answers_last_access ON answers(last_access);
+            CREATE TABLE IF NOT EXISTS answer_chunks (
+                answer_id INTEGER NOT NULL,
+                chunk_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_answer_chunks_chunk ON answer_chunks(chunk_id);
+            CREATE INDEX IF NOT EXISTS idx_answer_chunks_answer ON answer_chunks(answer_id);
+        """)
+        self._conn.commit()
+    
+    def lookup(self, query_embedding: np.ndarray, chunk_ids: List[str]) -> Optional[str]:
+        """같은 컨텍스트에서 충분히 유사한 쿼리의 응답 반환"""
+        if not chunk_ids:
+            return None
+        
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, embedding, answer FROM answers WHERE context_key = ?",
+                (context_key(chunk_ids),)
+            ).fetchall()
+            
+            best_id, best_answer, best_score = None, None, self.similarity_threshold
+            for answer_id, blob, answer in rows:
+                embedding = np.frombuffer(blob, dtype=np.float32)
+                if embedding.shape != query_embedding.shape:
+                    continue
+                score = float(np.dot(embedding, query_embedding))
+                if score >= best_score:
+                    best_id, best_answer, best_score = answer_id, answer, score
+            
+            if best_id is None:
+                self.misses += 1
+                return None
+            
+            self._conn.execute("UPDATE answers SET last_access = ? WHERE id = ?", (time.time(), best_id))
+            self._conn.commit()
+            self.hits += 1
+            return best_answer
+    
+    def store(self, query_embedding: np.ndarray, chunk_ids: List[str], answer: str) -> None:
+        """응답 저장 (최대 개수를 넘으면 가장 오래 사용되지 않은 응답 제거)"""
+        if not chunk_ids:
+            return
+        
+        blob = np.asarray(query_embedding, dtype=np.float32).tobytes()
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO answers (context_key, embedding, answer, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (context_key(chunk_ids), blob, answer, now, now)
+            )
+            answer_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO answer_chunks (answer_id, chunk_id) VALUES (?, ?)",
+                [(answer_id, chunk_id) for chunk_id in set(chunk_ids)]
+            )
+            
+            count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            if count > self.max_entries:
+                evicted = [row[0] for row in self._conn.execute(
+                    "SELECT id FROM answers ORDER BY last_access ASC LIMIT ?",
+                    (count - self.max_entries,)
+                )]
+                self._delete_answers(evicted)
+            self._conn.commit()
+    
+    def invalidate_chunks(self, chunk_ids: Optional[List[str]]) -> None:
+        """변경/삭제된 청크를 참조하는 응답 제거 (None이면 전체 초기화)"""
+        if chunk_ids is None:
+            self.clear()
+            return
+        
+        chunk_ids = list(chunk_ids)
+        with self._lock:
+            answer_ids = set()
+            for start in range(0, len(chunk_ids), _SQL_BATCH_SIZE):
+                batch = chunk_ids[start:start + _SQL_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                answer_ids.update(row[0] for row in self._conn.execute(
+                    f"SELECT DISTINCT answer_id FROM answer_chunks WHERE chunk_id IN ({placeholders})",
+                    batch
+                ))
+            if answer_ids:
+                self._delete_answers(list(answer_ids))
+                self._conn.commit()
+                logger.info(f"Invalidated {len(answer_ids)} cached answers")
+    
+    def _delete_answers(self, answer_ids: List[int]) -> None:
+        """응답과 청크 참조 삭제 (호출 측에서 잠금과 커밋 처리)"""
+        for start in range(0, len(answer_ids), _SQL_BATCH_SIZE):
+            batch = answer_ids[start:start + _SQL_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            self._conn.execute(f"DELETE FROM answers WHERE id IN ({placeholders})", batch)
+            self._conn.execute(f"DELETE FROM answer_chunks WHERE answer_id IN ({placeholders})", batch)
+    
+    def clear(self) -> None:
+        """모든 응답 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.execute("DELETE FROM answer_chunks")
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """캐시 크기와 적중/미적중 통계"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'size': size,
+            'max_size': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
@@ -0,0 +1,137 @@
+import re
+import logging
+from typing import List, Tuple, Optional, Any
+
+from .config import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 토크나이저가 없을 때 사용할 근사 토큰 (한글은 음절 단위, 그 외는 단어/기호 단위)
+_FALLBACK_TOKEN_RE = re.compile(r'[가-힣]|[^\W가-힣]+|[^\w\s]', re.UNICODE)
+# 문단 경계 (빈 줄)
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+# 문장 경계: 줄바꿈, 또는 공백/문서 끝이 뒤따르는 종결 부호 ("다.", "요.", "?", "!" 등)
+_SENTENCE_RE = re.compile(r'\n|[.?!。？！…](?=\s|$)')
+
+# 청크를 경계에서 자를 때 최소한 채워야 하는 비율 (너무 짧은 청크 방지)
+_MIN_FILL_RATIO = 0.5
+# 언어 추정에 사용하는 글자
+_HANGUL_RE = re.compile(r'[가-힣]')
+_LATIN_RE = re.compile(r'[A-Za-z]')
+
+Chunk = Tuple[str, int, int]
+
+
+def detect_language(text: str) -> str:
+    """한글/영문 글자 비율로 청크 언어 추정 ('ko', 'en' 또는 'unknown')"""
+    hangul = len(_HANGUL_RE.findall(text))
+    latin = len(_LATIN_RE.findall(text))
+    if hangul == 0 and latin == 0:
+        return 'unknown'
+    # 영문 단어는 음절보다 글자 수가 많으므로 한글 비율이 낮아도 한국어로 판단
+    return 'ko' if hangul * 3 >= latin else 'en'
+
+
+class TextChunker:
+    """임베딩 모델의 토큰 수 기준으로 텍스트를 청크로 분할
+    
+    텍스트를 한 번 토큰화한 뒤 각 토큰 위치에서 직전의 문단/문장 경계를
+    미리 계산해 두므로 분할은 텍스트 길이에 선형 시간이 걸린다. 청크는
+    max_tokens를 넘지 않으며 가능한 한 문단, 그 다음 문장 경계에서 끝난다.
+    인접 청크는 overlap_tokens만큼 겹친다.
+    
+    split()은 (청크 텍스트, 시작 문자 위치, 끝 문자 위치) 목록을 반환한다.
+    """
+    
+    def __init__(self, tokenizer: Optional[Any] = None,
+                 max_tokens: int = CHUNK_MAX_TOKENS,
+                 overlap_tokens: int = CHUNK_OVERLAP_TOKENS):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        # offset_mapping은 fast 토크나이저에서만 지원
+        if tokenizer is not None and not getattr(tokenizer, 'is_fast', False):
+            logger.warning("Tokenizer does not support offsets, falling back to approximate token counting")
+            self.tokenizer = None
+    
+    def _token_spans(self, text: str) -> List[Tuple[int, int]]:
+        """토큰별 (시작, 끝) 문자 위치"""
+        if self.tokenizer is None:
+            return [match.span() for match in _FALLBACK_TOKEN_RE.finditer(text)]
+        
+        encoding = self.tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False
+        )
+        # 하나의 단어가 여러 서브워드로 나뉘어도 문자 위치는 단조 증가한다
+        return [(start, end) for start, end in encoding['offset_mapping'] if end > start]
+    
+    @staticmethod
+    def _last_boundaries(pattern: "re.Pattern", text: str, ends: List[int]) -> List[int]:
+        """토큰 i 이하에서 끝나는 마지막 경계 토큰 인덱스 (없으면 -1)
+        
+        경계 문자열이 끝나는 위치 이전에 끝나는 마지막 토큰을 경계 토큰으로 본다.
+        """
+        marks = [-1] * len(ends)
+        index = 0
+        for match in pattern.finditer(text):
+            while index < len(ends) and ends[index] <= match.end():
+                index += 1
+            if index > 0:
+                marks[index - 1] = index - 1
+        
+        last = -1
+        for i, mark in enumerate(marks):
+            if mark >= 0:
+                last = mark
+            marks[i] = last
+        return marks
+    
+    def count_tokens(self, text: str) -> int:
+        """텍스트의 토큰 수"""
+        return len(self._token_spans(text))
+    
+    def split(self, text: str) -> List[Chunk]:
+        """텍스트를 (청크, 시작 위치, 끝 위치) 목록으로 분할"""
+        spans = self._token_spans(text)
+        if not spans:
+            return []
+        
+        total = len(spans)
+        if total <= self.max_tokens:
+            start, end = spans[0][0], spans[-1][1]
+            return [(text[start:end], start, end)]
+        
+        ends = [end for _, end in spans]
+        paragraph_ends = self._last_boundaries(_PARAGRAPH_RE, text, ends)
+        sentence_ends = self._last_boundaries(_SENTENCE_RE, text, ends)
+        min_fill = max(int(self.max_tokens * _MIN_FILL_RATIO), self.overlap_tokens + 1)
+        
+        chunks = []
+        first = 0
+        while True:
+            limit = first + self.max_tokens
+            if limit >= total:
+                last = total - 1
+            else:
+                last = limit - 1
+                for boundaries in (paragraph_ends, sentence_ends):
+                    candidate = boundaries[limit - 1]
+                    if candidate - first + 1 >= min_fill:
+                        last = candidate
+                        break
+            
+            start, end = spans[first][0], spans[last][1]
+            chunks.append((text[start:end], start, end))
+            if last == total - 1:
+                break
+            first = max(last + 1 - self.overlap_tokens, first + 1)
+        
+        return chunks
@@ -7,20 +7,130 @@ load_dotenv()
 # API 키 설정
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")  # 부하 테스트 시 로컬 스텁 서버 주소 (예: http://localhost:8001/v1)
 
 # 벡터 DB 설정
-CHROMA_PERSIST_DIRECTORY = "db/chroma"
+CHROMA_PERSIST_DIRECTORY = os.getenv("CHROMA_PERSIST_DIRECTORY", "db/chroma")
 CHROMA_COLLECTION_NAME = "documents"
+CHROMA_DISTANCE_METRIC = "cosine"  # 새로 생성하는 컬렉션에만 적용
+CHROMA_ADD_BATCH_SIZE = 1000
+INDEX_MANIFEST_FILENAME = "index_manifest.json"
+LEXICAL_INDEX_FILENAME = "lexical_index.sqlite3"  # BM25 역색인 (Chroma 디렉토리 안에 저장)
+TABLE_STORE_FILENAME = "table_store.sqlite3"  # Excel/CSV 행의 셀 값 색인 (Chroma 디렉토리 안에 저장)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma")  # 'chroma' 또는 'mmap' (메모리 매핑 파일)
+MMAP_STORE_DIRNAME = "mmap_store"  # mmap 저장소 디렉토리 (Chroma 디렉토리 안에 저장)
+# 'float16', 'int8'(1/4 크기, 가장 빠름) 또는 'float32'(변환 없음) (새로 만드는 저장소에만 적용)
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float16")
+VECTOR_STORE_BLOCK_ROWS = 16384  # 전체 검색 시 한 번에 행렬 곱을 계산하는 행 수
+VECTOR_STORE_IVF_LISTS = int(os.getenv("VECTOR_STORE_IVF_LISTS", "0"))  # 0이면 항상 정확한 전체 검색
+VECTOR_STORE_IVF_NPROBE = 8  # IVF 검색 시 살펴볼 목록 수
+
+# 임베딩 설정
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDING_NUM_PROCESSES = int(os.getenv("EMBEDDING_NUM_PROCESSES", "1"))  # 2 이상이면 멀티프로세스 인코딩
+CHUNK_MAX_TOKENS = 256  # 청크당 최대 토큰 수 (모델 최대 입력 길이를 넘으면 그 길이로 제한)
+CHUNK_OVERLAP_TOKENS = 32  # 인접 청크가 겹치는 토큰 수
 
 # 파일 업로드 설정
 UPLOAD_FOLDER = "data"
+GDRIVE_DOWNLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, "gdrive")  # Google Drive에서 받은 파일 (source='gdrive')
+GDRIVE_SYNC_STATE_FILE = os.path.join(GDRIVE_DOWNLOAD_FOLDER, ".sync_state.json")  # 파일별 modifiedTime/md5 기록
+GDRIVE_MAX_WORKERS = int(os.getenv("GDRIVE_MAX_WORKERS", "4"))  # 동시에 다운로드할 파일 수
+GDRIVE_PAGE_SIZE = 1000  # files.list 한 페이지의 최대 파일 수
+GDRIVE_CHUNK_SIZE = 8 * 1024 * 1024  # 다운로드 요청 하나의 크기 (이 단위로 이어 받기)
+GDRIVE_NUM_RETRIES = 3  # 요청별 재시도 횟수 (지수 백오프)
+GDRIVE_CHANGES_TOKEN_FILE = os.path.join(GDRIVE_DOWNLOAD_FOLDER, ".changes_token")  # 변경 사항 피드의 마지막 위치
+GDRIVE_WATCH_INTERVAL = float(os.getenv("GDRIVE_WATCH_INTERVAL", "30"))  # 변경 사항 조회 간격 (초)
+GDRIVE_WATCH_QUEUE_SIZE = 1000  # 처리 대기 중인 변경 사항 최대 수 (가득 차면 조회를 멈춤)
+GDRIVE_WATCH_BATCH_SIZE = 50  # 한 번에 다시 인덱싱하는 최대 파일 수
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx', 'xlsx', 'xls', 'csv'}
 
+# 문서 로딩 설정 (세그먼트 단위 스트리밍)
+LOADER_SEGMENT_CHARS = 64 * 1024  # TXT/DOCX 세그먼트 최대 길이
+TABLE_ROWS_PER_SEGMENT = 200  # Excel/CSV 세그먼트당 행 수
+LOADER_MAX_WORKERS = int(os.getenv("LOADER_MAX_WORKERS", "1"))  # 2 이상이면 멀티프로세스 파싱
+LOADER_FILE_TIMEOUT = 300  # 파일당 파싱 제한 시간 (초)
+
+# PDF 텍스트 추출 설정
+PDF_EXTRACT_BACKEND = os.getenv("PDF_EXTRACT_BACKEND", "auto")  # 'auto'(PyMuPDF가 설치되어 있으면 사용), 'pymupdf', 'pypdf2'
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "4"))  # 큰 PDF의 페이지를 나누어 추출할 프로세스 수
+PDF_PARALLEL_MIN_PAGES = 32  # 추출할 페이지가 이 이상인 PDF만 병렬로 처리
+PDF_PAGE_CACHE_ENABLED = os.getenv("PDF_PAGE_CACHE_ENABLED", "true").lower() == "true"
+PDF_PAGE_CACHE_PATH = os.getenv("PDF_PAGE_CACHE_PATH", "db/pdf_page_cache.sqlite3")  # (파일 해시, 페이지)별 추출 결과
+PDF_PAGE_CACHE_MAX_FILES = 2000  # 캐시에 보관할 최대 PDF 수 (넘으면 가장 오래 사용되지 않은 파일부터 삭제)
+
 # LLM 설정
 MODEL_NAME = "gpt-3.5-turbo"
 MAX_TOKENS = 1000
 TEMPERATURE = 0.7
+CONTEXT_WINDOW_TOKENS = 4096  # MODEL_NAME의 최대 컨텍스트 길이 (프롬프트 + 응답)
+CONTEXT_MAX_TOKENS = 1500  # 프롬프트에 넣을 교육 자료의 최대 토큰 수
+HISTORY_MAX_TOKENS = 800  # 프롬프트에 넣을 대화 히스토리의 최대 토큰 수 (오래된 메시지부터 제외)
+HISTORY_SUMMARY_ENABLED = os.getenv("HISTORY_SUMMARY_ENABLED", "true").lower() == "true"  # 오래된 대화를 요약으로 압축
+HISTORY_SUMMARY_TRIGGER_TOKENS = 600  # 그대로 보관 중인 히스토리가 이를 넘으면 백그라운드에서 요약
+HISTORY_RECENT_TOKENS = 300  # 요약하지 않고 그대로 남길 최근 대화 토큰 수
+HISTORY_SUMMARY_MAX_TOKENS = 200  # 누적 요약의 최대 토큰 수
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")  # 'openai' 또는 'stub' (오프라인 벤치마크용)
+STUB_LLM_FIRST_TOKEN_LATENCY = float(os.getenv("STUB_LLM_FIRST_TOKEN_LATENCY", "0"))  # 초
+STUB_LLM_TOKENS_PER_SECOND = float(os.getenv("STUB_LLM_TOKENS_PER_SECOND", "0"))  # 0이면 지연 없음
+
+# 비동기 서빙 설정
+RETRIEVAL_EXECUTOR_WORKERS = int(os.getenv("RETRIEVAL_EXECUTOR_WORKERS", "8"))  # 검색/임베딩을 실행할 스레드 수
 
 # 검색 설정
 TOP_K_RESULTS = 5
-SIMILARITY_THRESHOLD = 0.7 
\ No newline at end of file
+# 검색된 청크의 최소 코사인 유사도 (이보다 관련 없는 질문은 LLM을 호출하지 않고 안내 문구로 응답)
+# all-MiniLM-L6-v2로 한국어 질문을 검색하면 관련 있는 청크도 0.3~0.6 정도이므로
+# benchmarks/calibrate_threshold.py로 실제 데이터에 맞게 조정
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.3"))
+LEXICAL_SCORE_THRESHOLD = 8.0  # 유사도가 낮아도 이 BM25 점수 이상이면 유지 (과정 코드 등 정확 일치)
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")  # 'vector' 또는 'hybrid' (BM25 + 벡터)
+HYBRID_CANDIDATES = 20  # 하이브리드 검색에서 각 검색기로부터 가져올 후보 수
+RRF_K = 60  # Reciprocal Rank Fusion 상수
+BM25_K1 = 1.2
+BM25_B = 0.75
+LEXICAL_CHAMPION_SIZE = 500  # 검색어마다 BM25 점수 상위 몇 개 청크를 후보로 사용할지
+# 검색 필터로 사용할 수 있는 청크 메타데이터 (/chat의 'filters')
+FILTERABLE_METADATA = ('course', 'category', 'language', 'source', 'file_type', 'file_path', 'sheet', 'page')
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+QUERY_EMBEDDING_CACHE_TTL = 24 * 3600  # 초
+SEARCH_RESULT_CACHE_SIZE = 1024
+SEARCH_RESULT_CACHE_TTL = 600  # 초
+# 다른 프로세스(Drive 감시 등)가 인덱스를 갱신했는지 확인하는 간격 (초, 검색 결과에 반영되기까지의 최대 지연)
+INDEX_REFRESH_INTERVAL = float(os.getenv("INDEX_REFRESH_INTERVAL", "5"))
+QUERY_BATCH_SIZE = 256  # 일괄 검색에서 한 번에 임베딩/검색하는 쿼리 수
+# 질문에 과정명 같은 셀 값과 수강료 같은 열 이름이 함께 있으면 벡터 검색 없이 표의 행을 바로 사용
+TABLE_LOOKUP_ENABLED = os.getenv("TABLE_LOOKUP_ENABLED", "true").lower() == "true"
+TABLE_LOOKUP_MAX_ROWS = 3  # 일치하는 행이 이보다 많으면 모호한 질문으로 보고 일반 검색
+TABLE_VALUE_MAX_CHARS = 50  # 이보다 긴 셀 값(설명 등)은 값 색인에서 제외
+
+# 후속 질문 재작성 설정 (대화 히스토리를 반영한 검색어)
+QUERY_REWRITE_MODE = os.getenv("QUERY_REWRITE_MODE", "rule")  # 'off', 'rule'(LLM 호출 없음) 또는 'llm'
+QUERY_REWRITE_HISTORY_MESSAGES = 6  # 재작성에 참고할 최근 메시지 수
+QUERY_REWRITE_CACHE_SIZE = 10000
+QUERY_REWRITE_CACHE_TTL = 2 * 3600  # 초
+# 재작성한 질문으로 검색할 때 LLM에 전달할 문서 수 (후속 질문도 정확히 검색되므로 TOP_K_RESULTS보다 적게)
+HISTORY_TOP_K_RESULTS = 3
+
+# 재순위화 설정 (cross-encoder)
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL_NAME = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # 한국어를 포함한 다국어 모델
+RERANK_CANDIDATES = 20  # 1단계 검색에서 가져올 후보 수
+RERANK_TOP_K = 3  # 재순위화 후 LLM에 전달할 문서 수
+RERANK_MAX_LENGTH = 256  # 질문 + 문서의 최대 토큰 수
+RERANK_LATENCY_BUDGET_MS = float(os.getenv("RERANK_LATENCY_BUDGET_MS", "150"))  # 최근 평균이 이를 넘으면 건너뜀 (0이면 제한 없음)
+RERANK_MAX_CONCURRENT = 2  # 동시에 실행할 수 있는 재순위화 수 (초과 요청은 건너뜀)
+
+# 의미 기반 응답 캐시 설정
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "db/answer_cache.sqlite3")
+ANSWER_CACHE_SIMILARITY = 0.95  # 같은 컨텍스트에서 응답을 재사용할 최소 코사인 유사도
+ANSWER_CACHE_MAX_ENTRIES = 10000
+
+# 대화 세션 저장소 설정 (웹 앱의 세션별 대화 히스토리)
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory")  # 'memory' 또는 'sqlite' (재시작/워커 간 공유)
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "db/sessions.sqlite3")
+SESSION_MAX_SESSIONS = 50000  # 저장할 최대 세션 수 (넘으면 가장 오래 사용되지 않은 세션 제거)
+SESSION_TTL = 2 * 3600  # 마지막 대화 이후 세션을 유지하는 시간 (초)
+SESSION_HISTORY_MAX_TOKENS = HISTORY_MAX_TOKENS  # 세션별로 저장할 히스토리 토큰 수 (프롬프트에 넣을 수 있는 만큼) 
\ No newline at end of file
@@ -1,117 +1,663 @@
 import os
+import time
+import hashlib
+import threading
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Callable, Optional
 import logging
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
-from .config import CHROMA_PERSIST_DIRECTORY, CHROMA_COLLECTION_NAME
+from .config import (
+    CHROMA_PERSIST_DIRECTORY, CHROMA_COLLECTION_NAME, CHROMA_DISTANCE_METRIC, CHROMA_ADD_BATCH_SIZE,
+    INDEX_MANIFEST_FILENAME, LEXICAL_INDEX_FILENAME, TABLE_STORE_FILENAME, VECTOR_STORE_BACKEND, MMAP_STORE_DIRNAME,
+    EMBEDDING_MODEL_NAME, EMBEDDING_BATCH_SIZE,
+    EMBEDDING_NUM_PROCESSES, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS,
+    QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL, SEARCH_RESULT_CACHE_SIZE, SEARCH_RESULT_CACHE_TTL,
+    SEARCH_MODE, HYBRID_CANDIDATES, RRF_K, LEXICAL_SCORE_THRESHOLD, FILTERABLE_METADATA, QUERY_BATCH_SIZE,
+    TABLE_LOOKUP_ENABLED, INDEX_REFRESH_INTERVAL
+)
+from .manifest import IndexManifest, normalize_path
+from .cache import TTLCache, normalize_query
+from .chunker import TextChunker, detect_language
+from .lexical import BM25Index
+from .table_store import TableStore
+from .vector_store import MmapVectorStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 청크 메타데이터 형식 버전 (필드가 추가되면 올려서 전체 재인덱싱)
+METADATA_VERSION = 3
+# 필터가 있으면 BM25 후보 중 일부만 남으므로 후보를 더 많이 가져옴
+_FILTERED_LEXICAL_OVERFETCH = 5
+# 세그먼트에서 청크 메타데이터로 복사하는 구조 정보
+_SEGMENT_METADATA_KEYS = ('page', 'row_start', 'row_end', 'sheet', 'columns')
+
+
+def build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """검색 필터를 Chroma where 조건으로 변환
+    
+    값이 리스트이면 그중 하나와 일치하는 청크를 찾는다. FILTERABLE_METADATA에
+    없는 키나 문자열/숫자가 아닌 값은 ValueError.
+    """
+    if not filters:
+        return None
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object")
+    
+    conditions = []
+    for key, value in sorted(filters.items()):
+        if key not in FILTERABLE_METADATA:
+            raise ValueError(f"Unsupported filter: {key} (allowed: {', '.join(FILTERABLE_METADATA)})")
+        values = value if isinstance(value, list) else [value]
+        if not values or not all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in values):
+            raise ValueError(f"Invalid value for filter {key}")
+        if len(values) == 1:
+            conditions.append({key: values[0]})
+        else:
+            conditions.append({key: {'$in': values}})
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
 class DocumentEmbedder:
     """문서를 벡터로 변환하고 ChromaDB에 저장하는 클래스"""
     
-    def __init__(self, persist_directory: str = CHROMA_PERSIST_DIRECTORY):
+    def __init__(self, persist_directory: str = CHROMA_PERSIST_DIRECTORY,
+                 model_name: str = EMBEDDING_MODEL_NAME,
+                 batch_size: int = EMBEDDING_BATCH_SIZE,
+                 add_batch_size: int = CHROMA_ADD_BATCH_SIZE,
+                 num_processes: int = EMBEDDING_NUM_PROCESSES,
+                 chunk_max_tokens: int = CHUNK_MAX_TOKENS,
+                 chunk_overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+                 vector_store_backend: str = VECTOR_STORE_BACKEND):
+        if vector_store_backend not in ('chroma', 'mmap'):
+            raise ValueError(f"Unknown vector store backend: {vector_store_backend}")
         self.persist_directory = persist_directory
-        self.client = chromadb.PersistentClient(path=persist_directory)
-        self.collection = self._get_or_create_collection()
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.batch_size = batch_size
+        self.add_batch_size = add_batch_size
+        self.num_processes = num_processes
+        self.vector_store_backend = vector_store_backend
+        self.client = None
+        if vector_store_backend == 'mmap':
+            # Chroma 컬렉션과 같은 API를 제공하는 메모리 매핑 저장소 (워커 프로세스 간 페이지 캐시 공유)
+            self.collection = MmapVectorStore(os.path.join(persist_directory, MMAP_STORE_DIRNAME))
+            self.distance_metric = 'cosine'
+        else:
+            self.client = chromadb.PersistentClient(path=persist_directory)
+            self.collection = self._get_or_create_collection()
+        self.embedding_model = SentenceTransformer(model_name)
+        # 모델 입력 길이를 넘는 청크는 임베딩 시 잘리므로 특수 토큰 2개를 뺀 길이로 제한
+        model_max_tokens = self.embedding_model.max_seq_length
+        if model_max_tokens:
+            chunk_max_tokens = min(chunk_max_tokens, model_max_tokens - 2)
+        self.chunker = TextChunker(self.embedding_model.tokenizer, chunk_max_tokens, chunk_overlap_tokens)
+        manifest_settings = {
+            'model_name': model_name,
+            'chunk_max_tokens': self.chunker.max_tokens,
+            'chunk_overlap_tokens': self.chunker.overlap_tokens,
+            'metadata_version': METADATA_VERSION
+        }
+        if vector_store_backend != 'chroma':
+            # 저장소를 바꾸면 새 저장소에 모든 파일을 다시 인덱싱 (migrate_vector_store.py로 옮긴 경우 제외)
+            # 기본 저장소는 키를 넣지 않아 기존 인덱스를 그대로 사용
+            manifest_settings['vector_store_backend'] = vector_store_backend
+        self.manifest = IndexManifest(
+            os.path.join(persist_directory, INDEX_MANIFEST_FILENAME), settings=manifest_settings
+        )
+        self.lexical_index = BM25Index(os.path.join(persist_directory, LEXICAL_INDEX_FILENAME))
+        self._sync_lexical_index()
+        # 표의 행을 셀 값으로 바로 찾는 색인 (정확한 값 조회용)
+        self.table_store = TableStore(os.path.join(persist_directory, TABLE_STORE_FILENAME))
+        self.query_embedding_cache = TTLCache(QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL)
+        self.search_cache = TTLCache(SEARCH_RESULT_CACHE_SIZE, SEARCH_RESULT_CACHE_TTL)
+        # 컬렉션이 바뀔 때마다 증가 (진행 중이던 검색 결과가 캐시에 남지 않도록)
+        self.index_version = 0
+        # 청크가 삭제될 때 호출되는 콜백 (삭제된 청크 ID 목록, 전체 삭제 시 None)
+        self._change_listeners: List[Callable[[Optional[List[str]]], None]] = []
+        # 다른 프로세스가 인덱스를 갱신했는지 확인하기 위한 매니페스트 파일 상태
+        self._refresh_lock = threading.Lock()
+        self._index_stamp = self._read_index_stamp()
+        self._next_refresh_check = time.monotonic() + INDEX_REFRESH_INTERVAL
         
     def _get_or_create_collection(self):
         """컬렉션을 가져오거나 생성"""
+        # 임베딩은 직접 계산해서 전달하므로 Chroma 기본 임베딩 함수는 사용하지 않음
         try:
-            collection = self.client.get_collection(CHROMA_COLLECTION_NAME)
+            collection = self.client.get_collection(CHROMA_COLLECTION_NAME, embedding_function=None)
             logger.info(f"Using existing collection: {CHROMA_COLLECTION_NAME}")
         except:
-            collection = self.client.create_collection(CHROMA_COLLECTION_NAME)
+            collection = self.client.create_collection(
+                CHROMA_COLLECTION_NAME,
+                embedding_function=None,
+                metadata={'hnsw:space': CHROMA_DISTANCE_METRIC}
+            )
             logger.info(f"Created new collection: {CHROMA_COLLECTION_NAME}")
+        self.distance_metric = (collection.metadata or {}).get('hnsw:space', 'l2')
         return collection
     
-    def embed_documents(self, documents: List[Dict[str, Any]]) -> None:
-        """문서들을 임베딩하여 벡터 DB에 저장"""
-        if not documents:
-            logger.warning("No documents to embed")
+    def _sync_lexical_index(self) -> None:
+        """BM25 색인 도입 이전에 저장된 청크를 색인에 추가"""
+        count = self.collection.count()
+        if len(self.lexical_index) or not count:
             return
-            
-        texts = []
-        metadatas = []
-        ids = []
         
-        for i, doc in enumerate(documents):
-            # 긴 텍스트를 청크로 분할
-            chunks = self._split_text(doc['content'])
-            
-            for j, chunk in enumerate(chunks):
-                chunk_id = f"{doc['file_path']}_{i}_{j}"
-                texts.append(chunk)
-                metadatas.append({
-                    'file_path': doc['file_path'],
-                    'file_type': doc['file_type'],
-                    'chunk_index': j,
-                    'total_chunks': len(chunks)
-                })
-                ids.append(chunk_id)
-        
-        # 벡터 DB에 저장
-        self.collection.add(
-            documents=texts,
-            metadatas=metadatas,
-            ids=ids
-        )
+        logger.info(f"Building lexical index for {count} existing chunks")
+        for offset in range(0, count, self.add_batch_size):
+            existing = self.collection.get(include=['documents'], limit=self.add_batch_size, offset=offset)
+            self.lexical_index.add(existing['ids'], existing['documents'])
+        self.lexical_index.save()
+    
+    def encode_texts(self, texts: List[str], pool: Dict[str, Any] = None) -> np.ndarray:
+        """텍스트를 정규화된 float32 임베딩 벡터로 변환"""
+        if pool is not None:
+            embeddings = self.embedding_model.encode_multi_process(texts, pool, batch_size=self.batch_size)
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            return embeddings / np.maximum(norms, 1e-12)
         
-        logger.info(f"Embedded {len(texts)} text chunks from {len(documents)} documents")
+        embeddings = self.embedding_model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return np.asarray(embeddings, dtype=np.float32)
     
-    def _split_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """텍스트를 청크로 분할"""
-        if len(text) <= chunk_size:
-            return [text]
+    def embed_documents(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """문서들을 임베딩하여 벡터 DB에 저장
         
-        chunks = []
-        start = 0
+        문서는 전체 텍스트('content') 또는 DocumentLoader.iter_segments()가 만든
+        세그먼트 제너레이터('segments')를 가질 수 있으며, 세그먼트는 하나씩
+        청크로 분할되어 처리되므로 문서 크기와 무관하게 메모리 사용량이 제한된다.
         
-        while start < len(text):
-            end = start + chunk_size
-            
-            # 문장 경계에서 분할
-            if end < len(text):
-                # 마지막 마침표나 줄바꿈을 찾아서 분할
-                last_period = text.rfind('.', start, end)
-                last_newline = text.rfind('\n', start, end)
-                split_point = max(last_period, last_newline)
+        청크 ID는 파일 경로와 청크 내용으로부터 계산되므로, 이미 저장된 청크는
+        다시 임베딩하지 않고 위치 메타데이터만 갱신하며, 더 이상 존재하지 않는
+        청크만 삭제한다. 새 청크는 add_batch_size 단위로 모아서 임베딩한 뒤
+        Chroma에 저장한다.
+        """
+        document_count = 0
+        removed_count = 0
+        batch = {'ids': [], 'texts': [], 'metadatas': [], 'reused_ids': [], 'reused_metadatas': []}
+        # 모든 청크가 저장된 뒤에 매니페스트에 기록할 문서들
+        pending_updates = []
+        stats = {'added': 0}
+        
+        pool = None
+        if self.num_processes > 1:
+            pool = self.embedding_model.start_multi_process_pool(['cpu'] * self.num_processes)
+        
+        try:
+            for doc in documents:
+                file_path = normalize_path(doc['file_path'])
+                segments = doc.get('segments')
+                if segments is None:
+                    segments = [{'content': doc['content'], 'offset': 0}]
                 
-                if split_point > start:
-                    end = split_point + 1
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
+                attributes = doc.get('attributes') or {}
+                # 설정이 바뀐 파일은 내용이 같은 청크도 다시 저장
+                rebuild = self.manifest.needs_rebuild(file_path)
+                if self.manifest.has_file(file_path):
+                    old_ids = set(self.manifest.get_chunk_ids(file_path))
+                else:
+                    # 매니페스트 도입 이전에 저장된 청크 정리
+                    old_ids = set()
+                    legacy_ids = self.collection.get(where={'file_path': file_path}, include=[])['ids']
+                    if legacy_ids:
+                        self.collection.delete(ids=legacy_ids)
+                        self.lexical_index.remove(legacy_ids)
+                        self._invalidate_search_cache()
+                
+                chunk_ids = []
+                seen: Dict[str, int] = {}
+                table_replaced = False
+                for segment in segments:
+                    if segment.get('table_rows'):
+                        if not table_replaced:
+                            # 표의 행은 청크와 달리 파일 단위로 모두 다시 저장
+                            removed_rows = self.table_store.remove(file_path)
+                            if removed_rows:
+                                self._notify_removed(removed_rows)
+                            table_replaced = True
+                        table_metadata = dict(attributes, file_path=file_path, file_type=doc['file_type'])
+                        if 'sheet' in segment:
+                            table_metadata['sheet'] = segment['sheet']
+                        self.table_store.add(file_path, table_metadata, segment['table_rows'])
+                    
+                    # 세그먼트를 청크로 분할
+                    segment_offset = segment.get('offset', 0)
+                    for chunk, start, end in self.chunker.split(segment['content']):
+                        chunk_id = self._make_chunk_id(file_path, chunk, seen)
+                        chunk_index = len(chunk_ids)
+                        chunk_ids.append(chunk_id)
+                        
+                        metadata = {
+                            'file_path': file_path,
+                            'file_type': doc['file_type'],
+                            'chunk_index': chunk_index,
+                            'segment_offset': segment_offset,
+                            # 문서 내 청크 위치 (인용 표시용)
+                            'start_char': segment_offset + start,
+                            'end_char': segment_offset + end,
+                            'language': detect_language(chunk)
+                        }
+                        metadata.update(attributes)
+                        for key in _SEGMENT_METADATA_KEYS:
+                            if key in segment:
+                                metadata[key] = segment[key]
+                        
+                        if chunk_id in old_ids and not rebuild:
+                            # 내용이 같은 청크는 임베딩을 재사용하고 위치 메타데이터만 갱신 (앞부분이 바뀌면 위치가 달라짐)
+                            batch['reused_ids'].append(chunk_id)
+                            batch['reused_metadatas'].append(metadata)
+                        else:
+                            batch['texts'].append(chunk)
+                            batch['metadatas'].append(metadata)
+                            batch['ids'].append(chunk_id)
+                        
+                        if len(batch['ids']) + len(batch['reused_ids']) >= self.add_batch_size:
+                            self._flush_batch(batch, pool, stats)
+                            self._apply_manifest_updates(pending_updates)
+                
+                if doc.get('error'):
+                    # 읽는 도중 실패한 문서는 기존 청크를 유지하고 다음 실행에서 다시 인덱싱
+                    pending_updates.append((file_path, None, list(old_ids | set(chunk_ids))))
+                    continue
+                
+                if not chunk_ids:
+                    # 오류 없이 읽었지만 텍스트가 없는 문서 (내용을 지웠거나 이미지만 남은 PDF)는
+                    # 이전 청크를 모두 삭제하고 빈 청크 목록으로 기록 (파일이 다시 바뀔 때까지 건너뜀)
+                    logger.warning(f"No text extracted from {file_path}, removing its existing chunks")
+                    if not table_replaced:
+                        removed_rows = self.table_store.remove(file_path)
+                        if removed_rows:
+                            self._notify_removed(removed_rows)
+                
+                current_ids = set(chunk_ids)
+                stale_ids = [chunk_id for chunk_id in old_ids if chunk_id not in current_ids]
+                if stale_ids:
+                    self.collection.delete(ids=stale_ids)
+                    self.lexical_index.remove(stale_ids)
+                    self._invalidate_search_cache()
+                    self._notify_removed(stale_ids)
+                    removed_count += len(stale_ids)
+                
+                pending_updates.append((file_path, chunk_ids, None))
+                document_count += 1
             
-            start = end - overlap
-            if start >= len(text):
-                break
+            self._flush_batch(batch, pool, stats)
+            self._apply_manifest_updates(pending_updates)
+        finally:
+            if pool is not None:
+                self.embedding_model.stop_multi_process_pool(pool)
+            self.lexical_index.save()
+            self.manifest.save()
+            self._index_stamp = self._read_index_stamp()
+            if self.vector_store_backend == 'mmap':
+                # 삭제된 행 회수, IVF 색인 갱신
+                self.collection.maintain()
+        
+        if document_count == 0:
+            logger.warning("No documents to embed")
+            return
         
-        return chunks
+        logger.info(f"Embedded {stats['added']} new text chunks, removed {removed_count} stale chunks "
+                    f"from {document_count} documents")
     
-    def search_similar(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """쿼리와 유사한 문서 검색"""
+    def _flush_batch(self, batch: Dict[str, List], pool: Dict[str, Any], stats: Dict[str, int]) -> None:
+        """모아둔 청크를 임베딩하여 벡터 DB에 저장하고, 재사용한 청크의 메타데이터 갱신"""
+        if batch['reused_ids']:
+            # 메타데이터만 바꾸므로 다시 임베딩하지 않음
+            self.collection.update(ids=batch['reused_ids'], metadatas=batch['reused_metadatas'])
+            self._invalidate_search_cache()
+            batch['reused_ids'].clear()
+            batch['reused_metadatas'].clear()
+        if not batch['ids']:
+            return
+        
+        start_time = time.perf_counter()
+        embeddings = self.encode_texts(batch['texts'], pool)
+        encode_time = time.perf_counter() - start_time
+        
+        # 벡터 DB에 저장 (재인덱싱 시 같은 ID의 청크는 덮어씀)
+        self.collection.upsert(
+            ids=batch['ids'],
+            embeddings=embeddings.tolist(),
+            documents=batch['texts'],
+            metadatas=batch['metadatas']
+        )
+        self.lexical_index.add(batch['ids'], batch['texts'])
+        self._invalidate_search_cache()
+        total_time = time.perf_counter() - start_time
+        
+        count = len(batch['ids'])
+        stats['added'] += count
+        logger.info(f"Embedded batch of {count} chunks: {count / max(encode_time, 1e-9):.1f} chunks/sec encode, "
+                    f"{count / max(total_time, 1e-9):.1f} chunks/sec end-to-end")
+        
+        for values in batch.values():
+            values.clear()
+    
+    def _apply_manifest_updates(self, pending_updates: List[tuple]) -> None:
+        """저장이 끝난 문서들을 매니페스트에 기록"""
+        for file_path, chunk_ids, incomplete_ids in pending_updates:
+            if incomplete_ids is not None:
+                self.manifest.mark_incomplete(file_path, incomplete_ids)
+            else:
+                self.manifest.update(file_path, chunk_ids)
+        pending_updates.clear()
+    
+    def _make_chunk_id(self, file_path: str, chunk: str, seen: Dict[str, int]) -> str:
+        """파일 경로와 청크 내용 기반의 안정적인 청크 ID 생성"""
+        digest = hashlib.sha1(f"{file_path}\x00{chunk}".encode('utf-8')).hexdigest()
+        # 같은 파일 안에서 동일한 청크가 반복되는 경우 구분
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        return digest if occurrence == 0 else f"{digest}-{occurrence}"
+    
+    def get_changed_files(self, file_paths: List[str]) -> List[str]:
+        """마지막 인덱싱 이후 새로 추가되었거나 변경된 파일 반환"""
+        return [file_path for file_path in file_paths if not self.manifest.is_unchanged(file_path)]
+    
+    def get_deleted_files(self, file_paths: List[str]) -> List[str]:
+        """인덱싱되어 있지만 현재 파일 목록에 없는 파일 반환"""
+        current = {normalize_path(file_path) for file_path in file_paths}
+        return [file_path for file_path in self.manifest.files() if file_path not in current]
+    
+    def remove_documents(self, file_paths: List[str]) -> None:
+        """파일에 속한 모든 청크를 벡터 DB에서 삭제"""
+        if not file_paths:
+            return
+        
+        removed_count = 0
+        for file_path in file_paths:
+            table_ids = self.table_store.remove(normalize_path(file_path))
+            if table_ids:
+                self._notify_removed(table_ids)
+            chunk_ids = self.manifest.remove(file_path)
+            if chunk_ids:
+                self.collection.delete(ids=chunk_ids)
+                self.lexical_index.remove(chunk_ids)
+                self._notify_removed(chunk_ids)
+                removed_count += len(chunk_ids)
+        
+        self._invalidate_search_cache()
+        self.lexical_index.save()
+        self.manifest.save()
+        self._index_stamp = self._read_index_stamp()
+        logger.info(f"Removed {removed_count} chunks from {len(file_paths)} deleted documents")
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """쿼리 임베딩 계산 (정규화된 쿼리 기준으로 캐시)"""
+        key = normalize_query(query)
+        embedding = self.query_embedding_cache.get(key)
+        if embedding is None:
+            embedding = self.encode_texts([key])[0]
+            self.query_embedding_cache.set(key, embedding)
+        return embedding
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """여러 쿼리의 임베딩을 계산 (캐시에 없는 쿼리만 한 번에 인코딩)"""
+        keys = [normalize_query(query) for query in queries]
+        embeddings = {}
+        for key in keys:
+            if key not in embeddings:
+                embeddings[key] = self.query_embedding_cache.get(key)
+        
+        missing = [key for key, embedding in embeddings.items() if embedding is None]
+        if missing:
+            for key, embedding in zip(missing, self.encode_texts(missing)):
+                embeddings[key] = embedding
+                self.query_embedding_cache.set(key, embedding)
+        return np.stack([embeddings[key] for key in keys])
+    
+    def lookup_table(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """질문에 셀 값과 다른 열 이름이 함께 나오면 해당 표의 행 반환 (벡터 검색 없이 정확한 값 조회)"""
+        if not TABLE_LOOKUP_ENABLED:
+            return []
+        self.refresh_if_changed()
+        return self.table_store.lookup(query, build_where(filters))
+    
+    def search_similar(self, query: str, top_k: int = 5, mode: str = SEARCH_MODE,
+                       min_similarity: Optional[float] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """쿼리와 유사한 문서 검색
+        
+        mode가 'hybrid'이면 벡터 검색과 BM25 검색 결과를 Reciprocal Rank Fusion으로
+        합쳐 과정 코드, 강사 이름, 가격처럼 그대로 입력된 값도 찾을 수 있게 한다.
+        
+        각 결과에는 거리를 코사인 유사도로 변환한 'similarity'가 포함되며,
+        min_similarity를 지정하면 그보다 유사도가 낮은 결과는 제외한다
+        (BM25 점수가 LEXICAL_SCORE_THRESHOLD 이상인 정확 일치 결과는 유지).
+        
+        filters는 {'course': '파이썬 기초', 'language': ['ko', 'en']}처럼 청크 메타데이터
+        조건이며, 벡터 검색 전에 적용되어 조건에 맞는 청크 중에서만 검색한다.
+        """
+        return self.search_similar_batch([query], top_k, mode, min_similarity, filters)[0]
+    
+    def search_similar_batch(self, queries: List[str], top_k: int = 5, mode: str = SEARCH_MODE,
+                             min_similarity: Optional[float] = None,
+                             filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리를 한 번에 검색하여 쿼리별 결과 목록 반환
+        
+        캐시에 없는 쿼리는 QUERY_BATCH_SIZE개씩 한 번에 임베딩하고 하나의 다중 쿼리
+        벡터 검색으로 처리한다. 같은 쿼리가 여러 번 있으면 한 번만 검색한다.
+        인자의 의미는 search_similar와 같다.
+        """
+        if mode not in ('vector', 'hybrid'):
+            raise ValueError(f"Unknown search mode: {mode}")
+        where = build_where(filters)
+        self.refresh_if_changed()
+        
+        results: Dict[tuple, List[Dict[str, Any]]] = {}
+        cache_keys = [(normalize_query(query), top_k, mode, repr(where)) for query in queries]
+        pending: Dict[tuple, str] = {}
+        for query, cache_key in zip(queries, cache_keys):
+            if cache_key in results or cache_key in pending:
+                continue
+            documents = self.search_cache.get(cache_key)
+            if documents is None:
+                pending[cache_key] = query
+            else:
+                results[cache_key] = documents
+        
+        pending_items = list(pending.items())
+        for start in range(0, len(pending_items), QUERY_BATCH_SIZE):
+            batch = pending_items[start:start + QUERY_BATCH_SIZE]
+            for cache_key, documents in zip((key for key, _ in batch), self._search_batch(
+                    [query for _, query in batch], top_k, mode, where)):
+                results[cache_key] = documents
+        
+        if min_similarity is None:
+            return [[dict(doc) for doc in results[cache_key]] for cache_key in cache_keys]
+        return [
+            [dict(doc) for doc in results[cache_key] if self._is_relevant(doc, min_similarity)]
+            for cache_key in cache_keys
+        ]
+    
+    def _search_batch(self, queries: List[str], top_k: int, mode: str,
+                      where: Optional[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """캐시에 없는 쿼리들을 검색하고 결과를 캐시에 저장"""
+        index_version = self.index_version
+        query_embeddings = self.embed_queries(queries)
+        hybrid = mode == 'hybrid' and len(self.lexical_index)
+        n_results = max(top_k, HYBRID_CANDIDATES) if hybrid else top_k
+        vector_results = self._vector_search_batch(query_embeddings, n_results, where)
+        
+        batch_results = []
+        for query, query_embedding, vector_docs in zip(queries, query_embeddings, vector_results):
+            if hybrid:
+                documents = self._hybrid_search(query, query_embedding, top_k, where, vector_docs)
+            else:
+                documents = vector_docs
+            for doc in documents:
+                doc['similarity'] = self.similarity(doc['distance'])
+            
+            if index_version == self.index_version:
+                self.search_cache.set((normalize_query(query), top_k, mode, repr(where)), documents)
+            batch_results.append(documents)
+        return batch_results
+    
+    def similarity(self, distance: Optional[float]) -> Optional[float]:
+        """컬렉션 거리 값을 코사인 유사도로 변환 (임베딩은 정규화되어 있음)"""
+        if distance is None:
+            return None
+        if self.distance_metric == 'l2':
+            # 정규화된 벡터의 제곱 L2 거리 = 2 - 2 * 코사인 유사도
+            return 1.0 - distance / 2.0
+        # cosine, ip
+        return 1.0 - distance
+    
+    def _is_relevant(self, doc: Dict[str, Any], min_similarity: float) -> bool:
+        """검색 결과가 유사도 임계값을 넘는지 확인"""
+        if doc['similarity'] is None or doc['similarity'] >= min_similarity:
+            return True
+        return doc.get('lexical_score', 0.0) >= LEXICAL_SCORE_THRESHOLD
+    
+    def _vector_search(self, query_embedding: np.ndarray, top_k: int,
+                       where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """벡터 유사도 검색 (where 조건에 맞는 청크만)"""
+        return self._vector_search_batch(query_embedding[np.newaxis, :], top_k, where)[0]
+    
+    def _vector_search_batch(self, query_embeddings: np.ndarray, top_k: int,
+                             where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리 임베딩을 한 번의 벡터 검색으로 처리"""
         results = self.collection.query(
-            query_texts=[query],
-            n_results=top_k
+            query_embeddings=query_embeddings.tolist(),
+            n_results=top_k,
+            where=where
         )
         
-        documents = []
-        if results['documents']:
-            for i, doc in enumerate(results['documents'][0]):
-                documents.append({
-                    'content': doc,
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i] if 'distances' in results else None
-                })
+        batch_documents = []
+        for q in range(len(query_embeddings)):
+            documents = []
+            if results['documents']:
+                for i, doc in enumerate(results['documents'][q]):
+                    documents.append({
+                        'id': results['ids'][q][i],
+                        'content': doc,
+                        'metadata': results['metadatas'][q][i],
+                        'distance': results['distances'][q][i] if 'distances' in results else None
+                    })
+            batch_documents.append(documents)
+        return batch_documents
+    
+    def _hybrid_search(self, query: str, query_embedding: np.ndarray, top_k: int,
+                       where: Optional[Dict[str, Any]] = None,
+                       vector_docs: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """벡터 검색과 BM25 검색 결과를 Reciprocal Rank Fusion으로 결합
+        
+        vector_docs를 주면 (일괄 검색에서 미리 구한 벡터 검색 후보) 벡터 검색을 생략한다.
+        """
+        candidates = max(top_k, HYBRID_CANDIDATES)
+        if vector_docs is None:
+            vector_docs = self._vector_search(query_embedding, candidates, where)
+        if where is None:
+            lexical_hits = self.lexical_index.search(query, candidates)
+        else:
+            # BM25 색인에는 메타데이터가 없으므로 후보를 더 가져와 조건에 맞는 청크만 남김
+            lexical_hits = self.lexical_index.search(query, candidates * _FILTERED_LEXICAL_OVERFETCH)
+            if lexical_hits:
+                allowed = set(self.collection.get(ids=[chunk_id for chunk_id, _ in lexical_hits],
+                                                  where=where, include=[])['ids'])
+                lexical_hits = [hit for hit in lexical_hits if hit[0] in allowed][:candidates]
         
-        return documents
+        scores: Dict[str, float] = {}
+        for rank, doc in enumerate(vector_docs):
+            scores[doc['id']] = 1.0 / (RRF_K + rank + 1)
+        for rank, (chunk_id, _) in enumerate(lexical_hits):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        lexical_scores = dict(lexical_hits)
+        ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        
+        by_id = {doc['id']: doc for doc in vector_docs}
+        missing = [chunk_id for chunk_id in ranked if chunk_id not in by_id]
+        if missing:
+            # BM25로만 찾은 청크는 저장된 임베딩으로 벡터 거리를 계산
+            fetched = self.collection.get(ids=missing, include=['documents', 'metadatas', 'embeddings'])
+            distances = self._distances(query_embedding, np.asarray(fetched['embeddings'], dtype=np.float32))
+            for i, chunk_id in enumerate(fetched['ids']):
+                by_id[chunk_id] = {
+                    'id': chunk_id,
+                    'content': fetched['documents'][i],
+                    'metadata': fetched['metadatas'][i],
+                    'distance': float(distances[i])
+                }
+        
+        # BM25 색인에만 남아 있는 청크는 제외
+        return [
+            dict(by_id[chunk_id], fusion_score=scores[chunk_id], lexical_score=lexical_scores.get(chunk_id, 0.0))
+            for chunk_id in ranked if chunk_id in by_id
+        ]
+    
+    def _distances(self, query_embedding: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+        """컬렉션 거리 함수와 같은 방식으로 쿼리와 임베딩 간 거리 계산"""
+        if self.distance_metric == 'l2':
+            # Chroma의 l2 거리는 제곱 거리
+            return np.sum((embeddings - query_embedding) ** 2, axis=1)
+        # cosine, ip (임베딩은 정규화되어 있음)
+        return 1.0 - embeddings @ query_embedding
+    
+    def _read_index_stamp(self) -> Optional[tuple]:
+        """매니페스트 파일의 (inode, 수정 시각) (인덱싱이 끝날 때마다 원자적으로 다시 저장됨)"""
+        try:
+            stat = os.stat(self.manifest.manifest_path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+    
+    def refresh_if_changed(self) -> bool:
+        """다른 프로세스(Drive 감시, 일괄 인덱싱 등)가 인덱스를 바꿨으면 메모리에 올린 색인을 다시 로드
+        
+        INDEX_REFRESH_INTERVAL초에 한 번 매니페스트 파일이 바뀌었는지 확인하고, 바뀌었으면
+        매니페스트와 BM25 색인을 다시 읽고 검색 결과 캐시를 비운다. Chroma는 프로세스마다
+        벡터 색인을 메모리에 두므로 클라이언트를 다시 만든다 (mmap 저장소는 스스로 다시 매핑).
+        """
+        if time.monotonic() < self._next_refresh_check:
+            return False
+        with self._refresh_lock:
+            if time.monotonic() < self._next_refresh_check:
+                return False
+            self._next_refresh_check = time.monotonic() + INDEX_REFRESH_INTERVAL
+            stamp = self._read_index_stamp()
+            if stamp == self._index_stamp:
+                return False
+            
+            self._index_stamp = stamp
+            self.manifest = IndexManifest(self.manifest.manifest_path, settings=self.manifest.settings)
+            self.lexical_index.reload()
+            if self.vector_store_backend == 'chroma':
+                self.client.clear_system_cache()
+                self.client = chromadb.PersistentClient(path=self.persist_directory)
+                self.collection = self._get_or_create_collection()
+            self._invalidate_search_cache()
+            logger.info("Reloaded index updated by another process")
+            return True
+    
+    def _invalidate_search_cache(self) -> None:
+        """컬렉션 변경 시 검색 결과 캐시 무효화"""
+        self.index_version += 1
+        self.search_cache.clear()
+    
+    def add_change_listener(self, listener: Callable[[Optional[List[str]]], None]) -> None:
+        """청크 삭제 시 호출될 콜백 등록 (응답 캐시 무효화 등)"""
+        self._change_listeners.append(listener)
+    
+    def _notify_removed(self, chunk_ids: Optional[List[str]]) -> None:
+        """삭제된 청크를 등록된 콜백에 알림"""
+        for listener in self._change_listeners:
+            try:
+                listener(chunk_ids)
+            except Exception as e:
+                logger.error(f"Error in change listener: {e}")
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """쿼리 임베딩/검색 결과 캐시 통계"""
+        return {
+            'query_embedding': self.query_embedding_cache.stats(),
+            'search_results': self.search_cache.stats()
+        }
     
     def get_collection_info(self) -> Dict[str, Any]:
         """컬렉션 정보 반환"""
@@ -119,11 +665,22 @@ class DocumentEmbedder:
         return {
             'collection_name': CHROMA_COLLECTION_NAME,
             'document_count': count,
-            'persist_directory': self.persist_directory
+            'persist_directory': self.persist_directory,
+            'vector_store_backend': self.vector_store_backend,
+            'table_rows': len(self.table_store)
         }
     
     def clear_collection(self) -> None:
         """컬렉션의 모든 데이터 삭제"""
-        self.client.delete_collection(CHROMA_COLLECTION_NAME)
-        self.collection = self._get_or_create_collection()
+        if self.vector_store_backend == 'mmap':
+            self.collection.clear()
+        else:
+            self.client.delete_collection(CHROMA_COLLECTION_NAME)
+            self.collection = self._get_or_create_collection()
+        self.lexical_index.clear()
+        self.table_store.clear()
+        self.manifest.clear()
+        self._index_stamp = self._read_index_stamp()
+        self._invalidate_search_cache()
+        self._notify_removed(None)
         logger.info("Collection cleared") 
\ No newline at end of file
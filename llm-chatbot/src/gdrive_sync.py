@@ -3,24 +3,69 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-import io
+import json
+import time
+import hashlib
+import threading
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
-from .config import GOOGLE_API_KEY, UPLOAD_FOLDER
+from .config import (
+    GOOGLE_API_KEY, GDRIVE_DOWNLOAD_FOLDER, GDRIVE_SYNC_STATE_FILE, GDRIVE_MAX_WORKERS,
+    GDRIVE_PAGE_SIZE, GDRIVE_CHUNK_SIZE, GDRIVE_NUM_RETRIES
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 폴더와 Google Docs/Sheets 등은 get_media로 받을 수 없음 (내보내기 필요)
+GOOGLE_APPS_MIME_PREFIX = 'application/vnd.google-apps.'
+_FILE_FIELDS = "id, name, mimeType, size, modifiedTime, md5Checksum"
+_HASH_BLOCK_SIZE = 1024 * 1024
+# 재시도할 HTTP 상태 (요청 한도 초과, 서버 오류)
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _md5(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 class GoogleDriveSync:
-    """Google Drive와 동기화하는 클래스"""
+    """Google Drive와 동기화하는 클래스
+    
+    파일별 modifiedTime/md5Checksum을 상태 파일에 기록해 바뀐 파일만 받는다.
+    다운로드는 스레드 풀에서 병렬로 실행하며, 파일을 메모리에 모으지 않고 GDRIVE_CHUNK_SIZE 단위
+    Range 요청으로 .part 임시 파일에 기록한 뒤 원자적으로 이름을 바꾼다. 중간에 실패하면 .part 파일을
+    남겨 다음 동기화 때 받은 부분 이후부터 이어 받는다.
+    
+    Drive는 한 폴더에 같은 이름의 파일을 허용하므로, 다른 파일이 이미 쓰는 이름이면
+    '이름 (파일 ID).확장자'로 저장한다.
     
-    def __init__(self):
+    service를 넘기면 인증 없이 그 객체를 Drive API 클라이언트로 사용한다 (로컬 가짜 서비스 등).
+    """
+    
+    def __init__(self, service=None, download_folder: str = GDRIVE_DOWNLOAD_FOLDER,
+                 state_path: str = GDRIVE_SYNC_STATE_FILE, max_workers: int = GDRIVE_MAX_WORKERS):
         self.SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
-        self.service = None
-        self._authenticate()
+        self.download_folder = Path(download_folder)
+        self.state_path = Path(state_path)
+        self.max_workers = max_workers
+        self.service = service
+        self._credentials = None
+        # httplib2 연결은 스레드 간에 공유할 수 없으므로 다운로드 스레드마다 클라이언트 생성
+        self._local = threading.local()
+        self._state_lock = threading.Lock()
+        # 다운로드 중인 파일이 쓸 로컬 경로 (경로별 파일 ID)
+        self._reserved: Dict[Path, str] = {}
+        if self.service is None:
+            self._authenticate()
+        self.state: Dict[str, Dict[str, Any]] = self._load_state()
     
     def _authenticate(self):
         """Google Drive API 인증"""
@@ -43,9 +88,56 @@ class GoogleDriveSync:
             with open('token.json', 'w') as token:
                 token.write(creds.to_json())
         
-        self.service = build('drive', 'v3', credentials=creds)
+        self._credentials = creds
+        self.service = build('drive', 'v3', credentials=creds, cache_discovery=False)
         logger.info("Google Drive API 인증 완료")
     
+    def _thread_service(self):
+        """현재 스레드에서 사용할 Drive API 클라이언트"""
+        if self._credentials is None:
+            # 주입된 서비스는 그대로 공유
+            return self.service
+        if getattr(self._local, 'service', None) is None:
+            self._local.service = build('drive', 'v3', credentials=self._credentials, cache_discovery=False)
+        return self._local.service
+    
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        """동기화 상태 파일 로드 (파일 ID별 이름, 경로, modifiedTime, md5Checksum)"""
+        if not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except Exception as e:
+            logger.error(f"Error reading Drive sync state {self.state_path}: {e}")
+            return {}
+    
+    def save_state(self) -> None:
+        """동기화 상태를 원자적으로 저장"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with self._state_lock:
+            data = {'version': 1, 'files': dict(self.state)}
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+    
+    def _list(self, query: str) -> List[Dict[str, Any]]:
+        """nextPageToken을 따라 모든 페이지의 파일 목록 조회"""
+        files = []
+        page_token = None
+        while True:
+            results = self.service.files().list(
+                q=query,
+                pageSize=GDRIVE_PAGE_SIZE,
+                pageToken=page_token,
+                fields=f"nextPageToken, files({_FILE_FIELDS})"
+            ).execute(num_retries=GDRIVE_NUM_RETRIES)
+            files.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return files
+    
     def list_files(self, folder_id: str = None) -> List[Dict[str, Any]]:
         """Google Drive의 파일 목록 조회"""
         try:
@@ -53,86 +145,241 @@ class GoogleDriveSync:
             if folder_id:
                 query += f" and '{folder_id}' in parents"
             
-            results = self.service.files().list(
-                q=query,
-                pageSize=100,
-                fields="nextPageToken, files(id, name, mimeType, size, modifiedTime)"
-            ).execute()
-            
-            files = results.get('files', [])
+            files = self._list(query)
             logger.info(f"Found {len(files)} files in Google Drive")
             return files
-            
+        
         except Exception as e:
             logger.error(f"Error listing files: {e}")
             return []
     
-    def download_file(self, file_id: str, filename: str = None) -> bool:
-        """Google Drive에서 파일 다운로드"""
+    def is_unchanged(self, file: Dict[str, Any]) -> bool:
+        """상태 파일에 기록된 내용과 같고 로컬 파일이 남아 있으면 True"""
+        entry = self.state.get(file['id'])
+        if not entry or entry.get('name') != file['name'] or not os.path.exists(entry.get('path', '')):
+            return False
+        if file.get('md5Checksum') and entry.get('md5Checksum'):
+            return file['md5Checksum'] == entry['md5Checksum']
+        return file.get('modifiedTime') == entry.get('modifiedTime')
+    
+    def _paths_in_use(self, file_id: str) -> set:
+        """다른 파일이 쓰고 있거나 받는 중인 로컬 경로 (호출 측에서 잠금)"""
+        paths = {Path(entry['path']) for other_id, entry in self.state.items()
+                 if other_id != file_id and entry.get('path')}
+        paths.update(path for path, owner in self._reserved.items() if owner != file_id)
+        return paths
+    
+    def _reserve_path(self, file_id: str, filename: str) -> Path:
+        """파일을 저장할 로컬 경로를 정하고 다운로드가 끝날 때까지 예약
+        
+        이름이 그대로인 파일은 이전 경로를 계속 사용하고, 다른 파일이 쓰는 이름이면 파일 ID를 붙인다.
+        """
+        # Drive 파일 이름에는 '/'가 들어갈 수 있으므로 폴더 밖에 쓰지 않도록 바꿈
+        path = self.download_folder / filename.replace('/', '_').replace('\\', '_')
+        with self._state_lock:
+            in_use = self._paths_in_use(file_id)
+            entry = self.state.get(file_id) or {}
+            if entry.get('name') == filename and entry.get('path') and Path(entry['path']) not in in_use:
+                path = Path(entry['path'])
+            elif path in in_use:
+                path = path.with_name(f"{path.stem} ({file_id}){path.suffix}")
+            self._reserved[path] = file_id
+        return path
+    
+    def _request_range(self, request, start: int, end: int):
+        """get_media 요청에 Range 헤더를 넣어 보내고 (응답, 내용) 반환 (일시적 오류는 재시도)"""
+        headers = dict(request.headers, range=f"bytes={start}-{end}")
+        for attempt in range(GDRIVE_NUM_RETRIES + 1):
+            retry = attempt < GDRIVE_NUM_RETRIES
+            try:
+                response, content = request.http.request(request.uri, method='GET', headers=headers)
+            except (ConnectionError, TimeoutError):
+                if not retry:
+                    raise
+            else:
+                if response.status not in _RETRY_STATUSES or not retry:
+                    return response, content
+            time.sleep(2 ** attempt)
+    
+    def _download_media(self, service, file_id: str, fh, offset: int, size: Optional[int]) -> None:
+        """파일 내용을 offset부터 GDRIVE_CHUNK_SIZE 단위 Range 요청으로 받아 fh 끝에 기록"""
+        request = service.files().get_media(fileId=file_id)
+        total = size
+        while total is None or offset < total:
+            response, content = self._request_range(request, offset, offset + GDRIVE_CHUNK_SIZE - 1)
+            if response.status == 416:
+                # 빈 파일에는 범위 요청이 맞지 않음
+                break
+            if response.status not in (200, 206):
+                raise IOError(f"HTTP {response.status} while downloading {file_id}")
+            if response.status == 200 and offset:
+                # 범위를 무시하고 전체 내용을 보낸 경우 처음부터 다시 기록
+                fh.truncate(0)
+                offset = 0
+            fh.write(content)
+            offset += len(content)
+            
+            content_range = response.get('content-range', '')
+            if '/' in content_range and not content_range.endswith('/*'):
+                total = int(content_range.rsplit('/', 1)[1])
+            elif response.status == 200 or not content:
+                break
+            logger.debug(f"Download {file_id} {offset}/{total} bytes")
+    
+    def download_file(self, file_id: str, filename: str = None,
+                      file_metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Google Drive에서 파일 다운로드 (.part 임시 파일에 이어 받은 뒤 이름 변경)"""
+        download_path = None
         try:
+            service = self._thread_service()
             # 파일 정보 가져오기
-            file_metadata = self.service.files().get(fileId=file_id).execute()
+            if file_metadata is None:
+                file_metadata = service.files().get(
+                    fileId=file_id, fields=_FILE_FIELDS
+                ).execute(num_retries=GDRIVE_NUM_RETRIES)
             
             if not filename:
                 filename = file_metadata['name']
             
-            # 다운로드 경로 설정
-            download_path = Path(UPLOAD_FOLDER) / filename
+            # 다운로드 경로 설정 (업로드 파일과 구분되도록 Drive 전용 폴더에 저장)
+            download_path = self._reserve_path(file_id, filename)
+            download_path.parent.mkdir(parents=True, exist_ok=True)
+            part_path = download_path.with_name(download_path.name + ".part")
             
-            # 파일 다운로드
-            request = self.service.files().get_media(fileId=file_id)
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
+            expected_size = int(file_metadata['size']) if file_metadata.get('size') is not None else None
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            if expected_size is not None and offset > expected_size:
+                offset = 0
+            if offset:
+                logger.info(f"Resuming download of {filename} from byte {offset}")
             
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
-                logger.info(f"Download {int(status.progress() * 100)}%")
+            # 파일 다운로드 (청크 단위로 파일에 바로 기록)
+            with open(part_path, 'ab' if offset else 'wb') as fh:
+                if expected_size is None or offset < expected_size:
+                    self._download_media(service, file_id, fh, offset, expected_size)
             
-            # 파일 저장
-            with open(download_path, 'wb') as f:
-                f.write(fh.getvalue())
+            md5_checksum = file_metadata.get('md5Checksum')
+            if md5_checksum and _md5(part_path) != md5_checksum:
+                # 이어 받은 내용이 맞지 않으면 처음부터 다시 받도록 임시 파일 삭제
+                part_path.unlink()
+                raise IOError(f"MD5 mismatch for {filename}")
+            os.replace(part_path, download_path)
             
+            with self._state_lock:
+                previous = self.state.get(file_id) or {}
+                self.state[file_id] = {
+                    'name': file_metadata.get('name', filename),
+                    'path': str(download_path),
+                    'modifiedTime': file_metadata.get('modifiedTime'),
+                    'md5Checksum': md5_checksum,
+                    'folder_id': previous.get('folder_id')
+                }
+                # Drive에서 이름이 바뀐 파일은 이전 이름의 로컬 복사본 삭제 (다른 파일이 쓰는 경로는 남김)
+                stale_path = previous.get('path')
+                if stale_path and Path(stale_path) in self._paths_in_use(file_id) | {download_path}:
+                    stale_path = None
+            if stale_path and os.path.exists(stale_path):
+                os.remove(stale_path)
             logger.info(f"Downloaded {filename} to {download_path}")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error downloading file {file_id}: {e}")
             return False
+        finally:
+            if download_path is not None:
+                with self._state_lock:
+                    self._reserved.pop(download_path, None)
     
     def sync_folder(self, folder_id: str) -> List[str]:
-        """폴더의 모든 파일을 동기화"""
+        """폴더의 바뀐 파일만 병렬로 동기화하고 받은 파일 이름 목록 반환
+        
+        Drive 폴더에서 사라진 파일은 로컬 복사본과 상태 기록을 삭제한다.
+        """
         downloaded_files = []
         
         try:
-            files = self.list_files(folder_id)
+            files = [
+                file for file in self.list_files(folder_id)
+                if not file['mimeType'].startswith(GOOGLE_APPS_MIME_PREFIX)
+            ]
+            changed = [file for file in files if not self.is_unchanged(file)]
             
-            for file in files:
-                if file['mimeType'] != 'application/vnd.google-apps.folder':
-                    success = self.download_file(file['id'], file['name'])
-                    if success:
-                        downloaded_files.append(file['name'])
+            with self._state_lock:
+                for file in changed:
+                    self.state.setdefault(file['id'], {})['folder_id'] = folder_id
+            self._remove_missing(folder_id, {file['id'] for file in files})
             
-            logger.info(f"Synced {len(downloaded_files)} files from Google Drive")
-            return downloaded_files
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                futures = {
+                    executor.submit(self.download_file, file['id'], file['name'], file): file
+                    for file in changed
+                }
+                for future in as_completed(futures):
+                    if future.result():
+                        downloaded_files.append(futures[future]['name'])
             
+            logger.info(f"Synced {len(downloaded_files)} files from Google Drive "
+                        f"({len(files) - len(changed)} unchanged, {len(changed) - len(downloaded_files)} failed)")
+            return downloaded_files
+        
         except Exception as e:
             logger.error(f"Error syncing folder: {e}")
-            return []
+            return downloaded_files
+        finally:
+            self.save_state()
+    
+    def _remove_missing(self, folder_id: str, current_ids: set) -> None:
+        """폴더에서 삭제되었거나 다른 곳으로 옮겨진 파일의 로컬 복사본 삭제"""
+        with self._state_lock:
+            missing = [
+                file_id for file_id, entry in self.state.items()
+                if entry.get('folder_id') == folder_id and file_id not in current_ids
+            ]
+        for file_id in missing:
+            self.remove_file(file_id)
+    
+    def sync_file(self, file: Dict[str, Any], folder_id: str) -> bool:
+        """폴더에 속한 파일 하나를 동기화 (바뀌지 않았으면 받지 않음)"""
+        if self.is_unchanged(file):
+            return True
+        with self._state_lock:
+            self.state.setdefault(file['id'], {})['folder_id'] = folder_id
+        return self.download_file(file['id'], file['name'], file)
+    
+    def remove_file(self, file_id: str) -> Optional[str]:
+        """동기화된 파일의 로컬 복사본과 상태 기록을 삭제하고 로컬 경로 반환 (다른 파일도 쓰는 경로이면 None)"""
+        with self._state_lock:
+            entry = self.state.pop(file_id, None)
+            # 이전 버전에서 같은 경로에 받은 다른 파일이 있으면 그 파일의 복사본이므로 남김
+            shared = bool(entry and entry.get('path') and Path(entry['path']) in self._paths_in_use(file_id))
+        if not entry or not entry.get('path') or shared:
+            return None
+        if os.path.exists(entry['path']):
+            os.remove(entry['path'])
+            logger.info(f"Removed {entry['path']} (deleted from Google Drive)")
+        return entry['path']
+    
+    def local_path(self, file_id: str) -> Optional[str]:
+        """동기화된 파일의 로컬 경로 (받은 적이 없으면 None)"""
+        with self._state_lock:
+            return (self.state.get(file_id) or {}).get('path')
+    
+    def folder_files(self, folder_id: Optional[str] = None) -> List[str]:
+        """폴더에서 동기화된 파일들의 로컬 경로 (folder_id가 없으면 모든 폴더)"""
+        with self._state_lock:
+            return [
+                entry['path'] for entry in self.state.values()
+                if (folder_id is None or entry.get('folder_id') == folder_id) and entry.get('path')
+            ]
     
     def search_files(self, query: str) -> List[Dict[str, Any]]:
         """Google Drive에서 파일 검색"""
         try:
-            results = self.service.files().list(
-                q=f"name contains '{query}' and trashed=false",
-                pageSize=100,
-                fields="nextPageToken, files(id, name, mimeType, size, modifiedTime)"
-            ).execute()
-            
-            files = results.get('files', [])
+            files = self._list(f"name contains '{query}' and trashed=false")
             logger.info(f"Found {len(files)} files matching '{query}'")
             return files
-            
+        
         except Exception as e:
             logger.error(f"Error searching files: {e}")
             return []
@@ -144,4 +391,4 @@ class GoogleDriveSync:
             return file_info
         except Exception as e:
             logger.error(f"Error getting file info: {e}")
-            return {} 
\ No newline at end of file
+            return {}
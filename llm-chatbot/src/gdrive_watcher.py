@@ -0,0 +1,263 @@
+import os
+import queue
+import threading
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from .config import (
+    ALLOWED_EXTENSIONS, GDRIVE_CHANGES_TOKEN_FILE, GDRIVE_WATCH_INTERVAL, GDRIVE_WATCH_QUEUE_SIZE,
+    GDRIVE_WATCH_BATCH_SIZE, GDRIVE_PAGE_SIZE, GDRIVE_NUM_RETRIES
+)
+from .gdrive_sync import GoogleDriveSync, GOOGLE_APPS_MIME_PREFIX
+from .manifest import normalize_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_CHANGE_FIELDS = ("nextPageToken, newStartPageToken, "
+                  "changes(fileId, removed, file(id, name, mimeType, size, modifiedTime, md5Checksum, parents, trashed))")
+# 큐 항목 종류
+_UPSERT = 'upsert'
+_DELETE = 'delete'
+# 이 항목 앞의 변경 사항을 모두 처리하면 피드 위치 저장
+_CHECKPOINT = 'checkpoint'
+
+
+class DriveChangeWatcher:
+    """Drive 변경 사항 피드(changes.list)를 주기적으로 조회해 바뀐 파일만 다시 인덱싱
+    
+    조회 스레드는 추가/수정/삭제를 크기가 GDRIVE_WATCH_QUEUE_SIZE인 큐에 넣고, 큐가 가득 차면
+    처리 스레드가 따라잡을 때까지 조회를 멈춘다. 처리 스레드는 최대 GDRIVE_WATCH_BATCH_SIZE개씩
+    꺼내 같은 파일의 변경을 하나로 합친 뒤 파일을 받고 해당 파일만 DocumentLoader/DocumentEmbedder로
+    다시 인덱싱한다. 피드 위치(page token)는 그 앞의 변경 사항을 모두 처리한 뒤에만 저장한다.
+    
+    시작할 때 sync_folder로 꺼져 있던 동안의 변경을 먼저 반영한다. 별도 프로세스의 웹 서버는
+    DocumentEmbedder.refresh_if_changed로 INDEX_REFRESH_INTERVAL초 안에 바뀐 인덱스를 다시 로드하므로,
+    Drive의 변경은 대략 조회 간격 + 인덱싱 시간 + INDEX_REFRESH_INTERVAL 안에 검색된다.
+    """
+    
+    def __init__(self, sync: GoogleDriveSync, folder_id: str, loader, embedder,
+                 poll_interval: float = GDRIVE_WATCH_INTERVAL,
+                 queue_size: int = GDRIVE_WATCH_QUEUE_SIZE,
+                 batch_size: int = GDRIVE_WATCH_BATCH_SIZE,
+                 token_path: str = GDRIVE_CHANGES_TOKEN_FILE):
+        self.sync = sync
+        self.folder_id = folder_id
+        self.loader = loader
+        self.embedder = embedder
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.token_path = Path(token_path)
+        self.queue: "queue.Queue[tuple]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # 다운로드/인덱싱에 실패해 다음 배치에서 다시 시도할 변경 사항 (파일 ID별)
+        self._retry: Dict[str, tuple] = {}
+        self._page_token: Optional[str] = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'polls': 0,
+            'changes': 0,
+            'indexed_files': 0,
+            'removed_files': 0,
+            'failed_downloads': 0,
+            'backpressure_waits': 0
+        }
+    
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[name] += value
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return dict(self.stats, queue_size=self.queue.qsize(), pending_retries=len(self._retry))
+    
+    def _load_token(self) -> Optional[str]:
+        if not self.token_path.exists():
+            return None
+        return self.token_path.read_text(encoding='utf-8').strip() or None
+    
+    def _save_token(self, token: str) -> None:
+        """피드 위치를 원자적으로 저장"""
+        self.token_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.token_path.with_name(self.token_path.name + ".tmp")
+        tmp_path.write_text(token, encoding='utf-8')
+        os.replace(tmp_path, self.token_path)
+    
+    def start(self) -> None:
+        """밀린 변경 사항을 반영한 뒤 조회/처리 스레드 시작"""
+        token = self._load_token()
+        if token is None:
+            # 전체 동기화 중에 생긴 변경도 피드에서 받도록 동기화 전에 위치를 얻음
+            token = self.sync.service.changes().getStartPageToken().execute(
+                num_retries=GDRIVE_NUM_RETRIES)['startPageToken']
+        self._page_token = token
+        self.catch_up()
+        self._save_token(token)
+        
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._poll_loop, name="drive-poll", daemon=True),
+            threading.Thread(target=self._worker_loop, name="drive-index", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Watching Google Drive folder {self.folder_id} every {self.poll_interval}s")
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self.sync.save_state()
+    
+    def catch_up(self) -> None:
+        """폴더 전체를 동기화하고 인덱스와 다른 파일만 다시 인덱싱
+        
+        꺼져 있던 동안 Drive에서 삭제되거나 이름이 바뀐 파일은 sync_folder가 로컬 복사본만 지우므로,
+        인덱스에 남아 있는 Drive 다운로드 폴더의 파일 중 동기화 상태에 없는 파일의 청크를 삭제한다.
+        """
+        self.sync.sync_folder(self.folder_id)
+        download_folder = normalize_path(self.sync.download_folder)
+        removed_paths = [
+            path for path in self.embedder.get_deleted_files(self.sync.folder_files())
+            if os.path.dirname(path) == download_folder
+        ]
+        if removed_paths:
+            logger.info(f"Removing {len(removed_paths)} files deleted from Google Drive while not watching")
+            self.embedder.remove_documents(removed_paths)
+            self._count('removed_files', len(removed_paths))
+        paths = self.sync.folder_files(self.folder_id)
+        self._index(self.embedder.get_changed_files(paths))
+    
+    def poll(self) -> int:
+        """변경 사항 피드를 끝까지 읽어 큐에 넣고 넣은 항목 수 반환"""
+        self._count('polls')
+        start_token = token = self._page_token
+        queued = 0
+        while token:
+            response = self.sync.service.changes().list(
+                pageToken=token,
+                pageSize=GDRIVE_PAGE_SIZE,
+                spaces='drive',
+                includeRemoved=True,
+                fields=_CHANGE_FIELDS
+            ).execute(num_retries=GDRIVE_NUM_RETRIES)
+            for change in response.get('changes', []):
+                item = self._to_work_item(change)
+                if item is not None and self._put(item):
+                    queued += 1
+            if response.get('newStartPageToken'):
+                self._page_token = response['newStartPageToken']
+                break
+            token = response.get('nextPageToken')
+        
+        self._count('changes', queued)
+        if self._page_token != start_token:
+            # 큐에 남은 변경 사항이 처리된 뒤에 위치가 저장되도록 처리 스레드에 넘김
+            self._put((_CHECKPOINT, self._page_token))
+        return queued
+    
+    def _to_work_item(self, change: Dict[str, Any]) -> Optional[tuple]:
+        """변경 사항을 큐 항목으로 변환 (감시 중인 폴더와 관계없으면 None)"""
+        file_id = change.get('fileId')
+        file = change.get('file') or {}
+        in_folder = (
+            not change.get('removed') and not file.get('trashed')
+            and self.folder_id in file.get('parents', [])
+            and not file.get('mimeType', '').startswith(GOOGLE_APPS_MIME_PREFIX)
+        )
+        if in_folder:
+            return (_UPSERT, file_id, file)
+        # 삭제, 휴지통 이동, 다른 폴더로 이동은 받은 적이 있는 파일만 처리
+        if self.sync.local_path(file_id) is not None:
+            return (_DELETE, file_id, None)
+        return None
+    
+    def _put(self, item: tuple) -> bool:
+        """큐에 항목 추가 (가득 차면 자리가 날 때까지 대기)"""
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=1.0)
+                return True
+            except queue.Full:
+                self._count('backpressure_waits')
+        return False
+    
+    def _poll_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling Google Drive changes: {e}")
+            self._stop.wait(self.poll_interval)
+    
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # 재시도할 항목이 있으면 새 변경 사항이 없어도 조회 간격마다 처리
+                items = [self.queue.get(timeout=self.poll_interval if self._retry else 1.0)]
+            except queue.Empty:
+                if not self._retry:
+                    continue
+                items = []
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.process(items)
+            except Exception as e:
+                logger.error(f"Error processing Google Drive changes: {e}")
+    
+    def process(self, items: List[tuple]) -> None:
+        """큐 항목 묶음을 처리 (같은 파일의 변경은 마지막 것만 반영)"""
+        pending: Dict[str, tuple] = dict(self._retry)
+        checkpoint = None
+        for item in items:
+            if item[0] == _CHECKPOINT:
+                checkpoint = item[1]
+            else:
+                pending[item[1]] = item
+        self._retry = {}
+        
+        removed_paths = []
+        changed_paths = []
+        for file_id, (kind, _, file) in pending.items():
+            previous_path = self.sync.local_path(file_id)
+            if kind == _DELETE:
+                path = self.sync.remove_file(file_id)
+                if path:
+                    removed_paths.append(path)
+                continue
+            if not self.sync.sync_file(file, self.folder_id):
+                self._retry[file_id] = (kind, file_id, file)
+                continue
+            path = self.sync.local_path(file_id)
+            if previous_path and previous_path != path:
+                # 이름이 바뀐 파일은 이전 경로의 청크 삭제
+                removed_paths.append(previous_path)
+            changed_paths.append(path)
+        
+        if removed_paths:
+            self.embedder.remove_documents(removed_paths)
+            self._count('removed_files', len(removed_paths))
+        self._index(self.embedder.get_changed_files(changed_paths))
+        self.sync.save_state()
+        
+        self._count('failed_downloads', len(self._retry))
+        if checkpoint is not None:
+            # 실패한 파일은 _retry에 남아 있고, 재시작하면 catch_up에서 다시 받음
+            self._save_token(checkpoint)
+    
+    def _index(self, paths: List[str]) -> None:
+        """지원하는 형식의 파일만 로드해 다시 임베딩"""
+        paths = [path for path in paths if Path(path).suffix.lstrip('.').lower() in ALLOWED_EXTENSIONS]
+        if not paths:
+            return
+        logger.info(f"Re-indexing {len(paths)} files changed in Google Drive")
+        self.embedder.embed_documents(self.loader.iter_documents(paths))
+        for error in self.loader.errors:
+            logger.warning(f"  - {error['file_path']}: {error['error']}")
+        self._count('indexed_files', len(paths) - len(self.loader.errors))
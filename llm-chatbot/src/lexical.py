@@ -0,0 +1,316 @@
+import os
+import re
+import math
+import sqlite3
+import threading
+import unicodedata
+import logging
+from array import array
+from collections import Counter
+from typing import List, Dict, Tuple, Iterable, Set
+import numpy as np
+
+from .config import BM25_K1, BM25_B, LEXICAL_CHAMPION_SIZE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 한글 음절 연속 구간과 영문/숫자 단어
+_TOKEN_RE = re.compile(r'[가-힣]+|[0-9a-z]+')
+
+# 삭제된 청크 비율이 이 값을 넘으면 로드 시 색인을 다시 압축
+_COMPACT_DEAD_RATIO = 0.3
+# 평균 청크 길이가 이 비율 이상 바뀌면 미리 계산한 용어별 점수를 다시 계산
+_AVG_LENGTH_DRIFT = 0.05
+# SQLite 바인딩 변수 개수 제한을 넘지 않도록 나누어 처리
+_SQL_BATCH_SIZE = 500
+
+
+def tokenize(text: str) -> List[str]:
+    """BM25 색인용 토큰 분할
+    
+    영문/숫자는 단어 단위로, 한글은 조사·어미가 붙어도 일치하도록 음절 bigram
+    단위로 나눈다 (한 글자 단어는 그대로 사용). 과정 코드, 가격, 강사 이름처럼
+    그대로 입력되는 값이 정확히 일치하도록 하기 위한 것이다.
+    """
+    tokens = []
+    for word in _TOKEN_RE.findall(unicodedata.normalize('NFKC', text).lower()):
+        if word[0] >= '가' and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """청크 ID 단위의 영구 BM25 역색인
+    
+    포스팅 목록은 용어별 압축 배열(array)로 메모리에 두고 검색 시 numpy로
+    점수를 계산한다. 흔한 검색어의 포스팅 전체를 훑지 않도록 용어마다 점수가
+    높은 champion_size개 청크만 후보로 모으고, 후보에 대해서는 모든 검색어의
+    정확한 점수를 합산한다. 청크 추가/삭제는 증분으로 처리되며, 삭제된 청크는
+    표시만 해 두었다가 비율이 커지면 다음 로드 시 압축한다. 디스크에는
+    SQLite로 저장하며 save() 시 변경된 용어만 다시 쓴다.
+    """
+    
+    def __init__(self, db_path: str, k1: float = BM25_K1, b: float = BM25_B,
+                 champion_size: int = LEXICAL_CHAMPION_SIZE):
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self.champion_size = champion_size
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                idx INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT PRIMARY KEY,
+                doc_ids BLOB NOT NULL,
+                tfs BLOB NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self._load()
+    
+    def _reset_memory(self) -> None:
+        self.chunk_ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.lengths = array('I')
+        self.alive = bytearray()
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.alive_count = 0
+        self.total_length = 0
+        self._dirty: Set[str] = set()
+        # 용어별 포스팅의 BM25 점수 (idf 제외, 검색 시 지연 계산)
+        self._impacts: Dict[str, np.ndarray] = {}
+        self._impact_avg_length = 0.0
+        # 용어별 점수 상위 청크 위치 (검색 후보)
+        self._champion_lists: Dict[str, np.ndarray] = {}
+    
+    def _load(self, compact: bool = True) -> None:
+        """디스크에서 색인 로드"""
+        self._reset_memory()
+        rows = self._conn.execute("SELECT idx, chunk_id, length FROM chunks ORDER BY idx").fetchall()
+        
+        # 삭제된 청크의 포스팅은 압축 전까지 남아 있으므로 배열 크기는 포스팅의 최대 위치까지 포함
+        # (마지막 청크가 삭제된 뒤 그 위치를 새 청크가 다시 쓰면 이전 포스팅까지 이어받게 됨)
+        size = rows[-1][0] + 1 if rows else 0
+        for term, doc_ids, tfs in self._conn.execute("SELECT term, doc_ids, tfs FROM postings"):
+            ids = array('I')
+            ids.frombytes(doc_ids)
+            counts = array('H')
+            counts.frombytes(tfs)
+            self.postings[term] = (ids, counts)
+            if ids:
+                size = max(size, ids[-1] + 1)
+        if not size:
+            return
+        
+        self.chunk_ids = [""] * size
+        self.lengths = array('I', bytes(4 * size))
+        self.alive = bytearray(size)
+        for idx, chunk_id, length in rows:
+            self.chunk_ids[idx] = chunk_id
+            self.positions[chunk_id] = idx
+            self.lengths[idx] = length
+            self.alive[idx] = 1
+            self.total_length += length
+        self.alive_count = len(rows)
+        
+        if compact and 1 - self.alive_count / size > _COMPACT_DEAD_RATIO:
+            self._compact()
+        logger.info(f"Loaded lexical index with {self.alive_count} chunks and {len(self.postings)} terms")
+    
+    def _compact(self) -> None:
+        """삭제된 청크를 포스팅에서 제거하고 위치를 다시 매김"""
+        alive = np.frombuffer(bytes(self.alive), dtype=np.uint8).astype(bool)
+        remap = np.cumsum(alive, dtype=np.int64) - 1
+        
+        postings = {}
+        for term, (ids, counts) in self.postings.items():
+            ids_np = np.frombuffer(ids, dtype=np.uint32)
+            keep = alive[ids_np]
+            if keep.any():
+                postings[term] = (
+                    array('I', remap[ids_np[keep]].astype(np.uint32).tobytes()),
+                    array('H', np.frombuffer(counts, dtype=np.uint16)[keep].tobytes())
+                )
+        
+        chunk_ids = [chunk_id for chunk_id, flag in zip(self.chunk_ids, self.alive) if flag]
+        lengths = array('I', np.frombuffer(self.lengths, dtype=np.uint32)[alive].tobytes())
+        
+        self._conn.execute("DELETE FROM chunks")
+        self._conn.execute("DELETE FROM postings")
+        self._conn.executemany(
+            "INSERT INTO chunks (idx, chunk_id, length) VALUES (?, ?, ?)",
+            [(idx, chunk_id, lengths[idx]) for idx, chunk_id in enumerate(chunk_ids)]
+        )
+        self._conn.executemany(
+            "INSERT INTO postings (term, doc_ids, tfs) VALUES (?, ?, ?)",
+            [(term, ids.tobytes(), counts.tobytes()) for term, (ids, counts) in postings.items()]
+        )
+        self._conn.commit()
+        
+        self.chunk_ids = chunk_ids
+        self.positions = {chunk_id: idx for idx, chunk_id in enumerate(chunk_ids)}
+        self.lengths = lengths
+        self.alive = bytearray(b'\x01' * len(chunk_ids))
+        self.postings = postings
+        self._impacts = {}
+        self._champion_lists = {}
+        logger.info(f"Compacted lexical index to {len(chunk_ids)} chunks")
+    
+    def __len__(self) -> int:
+        return self.alive_count
+    
+    def add(self, chunk_ids: List[str], texts: List[str]) -> None:
+        """청크 색인 (이미 색인된 청크는 건너뜀)"""
+        with self._lock:
+            rows = []
+            for chunk_id, text in zip(chunk_ids, texts):
+                if chunk_id in self.positions:
+                    continue
+                idx = len(self.chunk_ids)
+                tokens = tokenize(text)
+                self.chunk_ids.append(chunk_id)
+                self.positions[chunk_id] = idx
+                self.lengths.append(len(tokens))
+                self.alive.append(1)
+                self.alive_count += 1
+                self.total_length += len(tokens)
+                rows.append((idx, chunk_id, len(tokens)))
+                
+                for term, count in Counter(tokens).items():
+                    entry = self.postings.get(term)
+                    if entry is None:
+                        entry = self.postings[term] = (array('I'), array('H'))
+                    entry[0].append(idx)
+                    entry[1].append(min(count, 65535))
+                    self._dirty.add(term)
+                    self._impacts.pop(term, None)
+                    self._champion_lists.pop(term, None)
+            
+            self._conn.executemany("INSERT INTO chunks (idx, chunk_id, length) VALUES (?, ?, ?)", rows)
+    
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """청크를 검색 대상에서 제외"""
+        with self._lock:
+            removed = []
+            for chunk_id in chunk_ids:
+                idx = self.positions.pop(chunk_id, None)
+                if idx is None:
+                    continue
+                self.alive[idx] = 0
+                self.alive_count -= 1
+                self.total_length -= self.lengths[idx]
+                removed.append(chunk_id)
+            
+            for start in range(0, len(removed), _SQL_BATCH_SIZE):
+                batch = removed[start:start + _SQL_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                self._conn.execute(f"DELETE FROM chunks WHERE chunk_id IN ({placeholders})", batch)
+    
+    def save(self) -> None:
+        """변경된 포스팅 목록을 디스크에 기록"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO postings (term, doc_ids, tfs) VALUES (?, ?, ?)",
+                [(term, self.postings[term][0].tobytes(), self.postings[term][1].tobytes()) for term in self._dirty]
+            )
+            self._conn.commit()
+            self._dirty.clear()
+    
+    def reload(self) -> None:
+        """다른 프로세스가 저장한 색인을 다시 로드
+        
+        압축은 색인을 쓰는 프로세스의 메모리 위치를 바꾸므로 읽기만 하는 쪽에서는 하지 않는다.
+        """
+        with self._lock:
+            self._load(compact=False)
+    
+    def clear(self) -> None:
+        """색인 전체 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM postings")
+            self._conn.commit()
+            self._reset_memory()
+    
+    def _term_impacts(self, term: str) -> np.ndarray:
+        """용어의 포스팅별 BM25 점수 (idf 제외)"""
+        impacts = self._impacts.get(term)
+        if impacts is None:
+            ids, counts = self.postings[term]
+            lengths = np.frombuffer(self.lengths, dtype=np.uint32)[np.frombuffer(ids, dtype=np.uint32)]
+            tf = np.frombuffer(counts, dtype=np.uint16).astype(np.float32)
+            norm = self.k1 * (1 - self.b + self.b * lengths / self._impact_avg_length)
+            impacts = self._impacts[term] = (tf * (self.k1 + 1) / (tf + norm)).astype(np.float32)
+            self._champion_lists.pop(term, None)
+        return impacts
+    
+    def _champions(self, term: str) -> np.ndarray:
+        """용어 점수가 가장 높은 청크 위치 (최대 champion_size개)"""
+        impacts = self._term_impacts(term)
+        champions = self._champion_lists.get(term)
+        if champions is None:
+            ids = np.frombuffer(self.postings[term][0], dtype=np.uint32)
+            if len(ids) > self.champion_size:
+                top = np.argpartition(-impacts, self.champion_size - 1)[:self.champion_size]
+                champions = ids[top]
+            else:
+                champions = ids.copy()
+            self._champion_lists[term] = champions
+        return champions
+    
+    def _idf(self, term: str, doc_count: int) -> float:
+        df = len(self.postings[term][0])
+        return math.log(1 + (max(doc_count - df, 0) + 0.5) / (df + 0.5))
+    
+    def search(self, query: str, top_k: int = 20) -> List[Tuple[str, float]]:
+        """BM25 점수 상위 청크 ID와 점수 반환"""
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or self.alive_count == 0:
+                return []
+            
+            doc_count = self.alive_count
+            avg_length = max(self.total_length / doc_count, 1.0)
+            if abs(avg_length - self._impact_avg_length) > _AVG_LENGTH_DRIFT * self._impact_avg_length:
+                self._impacts.clear()
+                self._champion_lists.clear()
+                self._impact_avg_length = avg_length
+            
+            present = [term for term in terms if term in self.postings]
+            if not present:
+                return []
+            
+            # 각 용어의 상위 청크들을 후보로 모은 뒤 모든 용어에 대해 정확한 점수 계산
+            candidates = np.unique(np.concatenate([self._champions(term) for term in present]))
+            totals = np.zeros(len(candidates), dtype=np.float64)
+            for term in present:
+                # 포스팅은 청크 위치 순으로 정렬되어 있으므로 이진 탐색으로 후보를 찾음
+                term_ids = np.frombuffer(self.postings[term][0], dtype=np.uint32)
+                positions = np.minimum(np.searchsorted(term_ids, candidates), len(term_ids) - 1)
+                matched = term_ids[positions] == candidates
+                totals[matched] += self._impacts[term][positions[matched]] * self._idf(term, doc_count)
+            
+            # 삭제된 청크 제외
+            keep = np.frombuffer(self.alive, dtype=np.uint8)[candidates].astype(bool)
+            candidates = candidates[keep]
+            totals = totals[keep]
+            if not len(candidates):
+                return []
+            
+            k = min(top_k, len(candidates))
+            top = np.argpartition(-totals, k - 1)[:k]
+            top = top[np.argsort(-totals[top])]
+            return [(self.chunk_ids[candidates[i]], float(totals[i])) for i in top]
@@ -0,0 +1,175 @@
+import time
+import asyncio
+import hashlib
+import logging
+from typing import List, Dict, Any, Iterator, AsyncIterator, Sequence
+
+from openai import OpenAI, AsyncOpenAI
+
+from .config import (
+    OPENAI_API_KEY, OPENAI_API_BASE, MODEL_NAME, MAX_TOKENS, TEMPERATURE,
+    LLM_BACKEND, STUB_LLM_FIRST_TOKEN_LATENCY, STUB_LLM_TOKENS_PER_SECOND
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STUB_RESPONSES = (
+    "안녕하세요, 문의해주셔서 감사합니다. 요청하신 교육 과정 정보를 안내해드리겠습니다. "
+    "해당 과정은 온라인과 오프라인으로 모두 수강하실 수 있으며, 자세한 커리큘럼과 수강료는 "
+    "교육 자료를 참고하시면 됩니다. 추가 문의사항이 있으시면 언제든 연락주세요.",
+    "문의하신 내용은 현재 제공된 교육 과정 정보에서 확인하실 수 있습니다. "
+    "과정별 기간과 수강료가 다를 수 있으니 원하시는 과정을 말씀해주시면 자세히 안내해드리겠습니다.",
+)
+
+
+class LLMBackend:
+    """채팅 메시지 목록을 받아 응답을 생성하는 LLM 백엔드 인터페이스"""
+    
+    def generate(self, messages: List[Dict[str, str]]) -> str:
+        """전체 응답 생성"""
+        raise NotImplementedError
+    
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """응답 토큰을 생성되는 대로 반환"""
+        raise NotImplementedError
+    
+    async def agenerate(self, messages: List[Dict[str, str]]) -> str:
+        """generate의 비동기 버전"""
+        raise NotImplementedError
+    
+    async def astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """stream의 비동기 버전"""
+        raise NotImplementedError
+        yield
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI Chat Completions API 백엔드 (openai>=1.0 클라이언트)
+    
+    클라이언트는 처음 호출할 때 만들므로 API 키 없이도 백엔드를 생성할 수 있다.
+    """
+    
+    def __init__(self, model: str = MODEL_NAME, max_tokens: int = MAX_TOKENS, temperature: float = TEMPERATURE):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._client = None
+        self._async_client = None
+    
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_API_BASE or None)
+        return self._client
+    
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_API_BASE or None)
+        return self._async_client
+    
+    def _request(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        return dict(model=self.model, messages=messages, max_tokens=self.max_tokens,
+                    temperature=self.temperature, **kwargs)
+    
+    def generate(self, messages: List[Dict[str, str]]) -> str:
+        response = self.client.chat.completions.create(**self._request(messages))
+        return (response.choices[0].message.content or "").strip()
+    
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        stream = self.client.chat.completions.create(**self._request(messages, stream=True))
+        for chunk in stream:
+            # 마지막 청크 등은 choices가 비어 있을 수 있음
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                yield token
+    
+    async def agenerate(self, messages: List[Dict[str, str]]) -> str:
+        response = await self.async_client.chat.completions.create(**self._request(messages))
+        return (response.choices[0].message.content or "").strip()
+    
+    async def astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        stream = await self.async_client.chat.completions.create(**self._request(messages, stream=True))
+        async for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                yield token
+
+
+class StubLLMBackend(LLMBackend):
+    """네트워크 없이 정해진 응답을 돌려주는 결정적 스텁 백엔드 (벤치마크/오프라인용)
+    
+    응답은 마지막 사용자 메시지의 해시로 responses 중에서 고르므로 같은 입력에는
+    항상 같은 응답이 나온다. 지연은 첫 토큰 지연 + 토큰 수 / 초당 토큰 수로 모델링하며,
+    tokens_per_second가 0이면 토큰 간 지연 없이 즉시 생성한다.
+    """
+    
+    def __init__(self, responses: Sequence[str] = STUB_RESPONSES,
+                 first_token_latency: float = STUB_LLM_FIRST_TOKEN_LATENCY,
+                 tokens_per_second: float = STUB_LLM_TOKENS_PER_SECOND):
+        self.responses = list(responses)
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.call_count = 0
+        self.last_messages: List[Dict[str, str]] = []
+    
+    def _select_response(self, messages: List[Dict[str, str]]) -> str:
+        """마지막 사용자 메시지에 따라 응답을 결정적으로 선택"""
+        self.call_count += 1
+        self.last_messages = messages
+        query = next((msg['content'] for msg in reversed(messages) if msg['role'] == 'user'), "")
+        index = int(hashlib.md5(query.encode('utf-8')).hexdigest(), 16) % len(self.responses)
+        return self.responses[index]
+    
+    def _tokens(self, text: str) -> List[str]:
+        """응답을 공백 단위 토큰으로 분할"""
+        words = text.split(' ')
+        return [word if i == 0 else ' ' + word for i, word in enumerate(words)]
+    
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+    
+    def generate(self, messages: List[Dict[str, str]]) -> str:
+        text = self._select_response(messages)
+        delay = self.first_token_latency + len(self._tokens(text)) * self._token_delay()
+        if delay > 0:
+            time.sleep(delay)
+        return text
+    
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        text = self._select_response(messages)
+        if self.first_token_latency > 0:
+            time.sleep(self.first_token_latency)
+        delay = self._token_delay()
+        for i, token in enumerate(self._tokens(text)):
+            if i and delay:
+                time.sleep(delay)
+            yield token
+    
+    async def agenerate(self, messages: List[Dict[str, str]]) -> str:
+        text = self._select_response(messages)
+        delay = self.first_token_latency + len(self._tokens(text)) * self._token_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return text
+    
+    async def astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        text = self._select_response(messages)
+        if self.first_token_latency > 0:
+            await asyncio.sleep(self.first_token_latency)
+        delay = self._token_delay()
+        for i, token in enumerate(self._tokens(text)):
+            if i and delay:
+                await asyncio.sleep(delay)
+            yield token
+
+
+def create_llm_backend(name: str = LLM_BACKEND) -> LLMBackend:
+    """설정된 이름으로 LLM 백엔드 생성 ('openai' 또는 'stub')"""
+    if name == 'openai':
+        return OpenAIBackend()
+    if name == 'stub':
+        logger.info("Using stub LLM backend")
+        return StubLLMBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
@@ -1,53 +1,216 @@
 import os
+import csv
+import math
+import time
+from datetime import datetime, date
 import pandas as pd
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Iterator
 from pathlib import Path
-import PyPDF2
 from docx import Document
+from openpyxl import load_workbook
 import logging
 
-from .config import ALLOWED_EXTENSIONS, UPLOAD_FOLDER
+from .config import (
+    ALLOWED_EXTENSIONS, UPLOAD_FOLDER, GDRIVE_DOWNLOAD_FOLDER, LOADER_SEGMENT_CHARS, TABLE_ROWS_PER_SEGMENT,
+    LOADER_MAX_WORKERS, LOADER_FILE_TIMEOUT, PDF_EXTRACT_WORKERS
+)
+from .pdf_extract import PDFExtractor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DocumentLoader:
-    """다양한 파일 형식을 텍스트로 변환하는 로더"""
+    """다양한 파일 형식을 텍스트로 변환하는 로더
     
-    def __init__(self, upload_folder: str = UPLOAD_FOLDER):
+    iter_segments()는 문서 전체를 메모리에 올리지 않고 페이지/행 블록 단위의
+    세그먼트를 순서대로 생성한다. 각 세그먼트는 'content'와 문서 내 문자 위치인
+    'offset'(세그먼트들을 줄바꿈으로 이었을 때 기준)을 가진다.
+    
+    각 문서의 'attributes'에는 검색 필터로 쓰는 파일 속성(과정명, 분류, 출처)이 들어가며,
+    세그먼트에는 페이지 번호, 시트 이름, 열 이름 같은 구조 정보가 함께 기록된다.
+    
+    max_workers가 2 이상이면 파일을 프로세스 풀에서 병렬로 파싱한다. 결과는
+    입력 순서대로 반환되며, 실패하거나 file_timeout을 넘긴 파일은 errors에 기록된다.
+    PDF는 PDFExtractor로 추출하며, 파일 단위로 병렬 파싱할 때는 페이지 병렬 추출을 쓰지 않는다.
+    """
+    
+    def __init__(self, upload_folder: str = UPLOAD_FOLDER,
+                 max_workers: int = LOADER_MAX_WORKERS,
+                 file_timeout: float = LOADER_FILE_TIMEOUT,
+                 pdf_workers: int = PDF_EXTRACT_WORKERS):
         self.upload_folder = Path(upload_folder)
-        
+        self.max_workers = max_workers
+        self.file_timeout = file_timeout
+        self.pdf_workers = pdf_workers
+        # 첫 PDF를 읽을 때 생성 (페이지 캐시 DB를 PDF가 없는 실행에서 열지 않도록)
+        self._pdf_extractor = None
+        self.errors: List[Dict[str, str]] = []
+    
     def load_documents(self, file_paths: List[str] = None) -> List[Dict[str, Any]]:
         """여러 문서를 로드하여 텍스트로 변환"""
         documents = []
         
+        for doc in self.iter_documents(file_paths):
+            text = "\n".join(segment['content'] for segment in doc['segments']).strip()
+            if text and not doc.get('error'):
+                documents.append({
+                    'file_path': doc['file_path'],
+                    'content': text,
+                    'file_type': doc['file_type'],
+                    'attributes': doc['attributes']
+                })
+        
+        return documents
+    
+    def iter_documents(self, file_paths: List[str] = None) -> Iterator[Dict[str, Any]]:
+        """문서를 입력 순서대로 하나씩 생성
+        
+        순차 모드에서는 'segments'가 지연 로딩 제너레이터이며, 읽는 도중 오류가
+        발생하면 문서에 'error'가 기록된다. 병렬 모드에서는 파싱이 끝난 세그먼트
+        리스트를 가진 문서만 생성된다.
+        """
+        self.errors = []
+        
         if file_paths is None:
             # data 폴더의 모든 파일 로드
-            file_paths = self._get_all_files()
+            file_paths = self.get_all_files()
         
+        valid_paths = []
         for file_path in file_paths:
-            try:
-                text = self._load_single_document(file_path)
-                if text:
-                    documents.append({
-                        'file_path': file_path,
-                        'content': text,
-                        'file_type': Path(file_path).suffix.lower()
-                    })
-            except Exception as e:
-                logger.error(f"Error loading {file_path}: {e}")
+            if not Path(file_path).exists():
+                self._record_error(file_path, "File not found")
+            elif Path(file_path).suffix.lower().lstrip('.') not in ALLOWED_EXTENSIONS:
+                self._record_error(file_path, f"Unsupported file type: {Path(file_path).suffix.lower()}")
+            else:
+                valid_paths.append(file_path)
+        
+        if self.max_workers > 1 and len(valid_paths) > 1:
+            yield from self._iter_documents_parallel(valid_paths)
+            return
+        
+        for file_path in valid_paths:
+            doc = {
+                'file_path': file_path,
+                'file_type': Path(file_path).suffix.lower(),
+                'attributes': self.file_attributes(file_path)
+            }
+            doc['segments'] = self._guarded_segments(doc)
+            yield doc
+    
+    def _guarded_segments(self, doc: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """세그먼트를 생성하면서 오류를 문서별로 기록"""
+        try:
+            yield from self.iter_segments(doc['file_path'])
+        except Exception as e:
+            doc['error'] = str(e)
+            self._record_error(doc['file_path'], e)
+    
+    def _iter_documents_parallel(self, file_paths: List[str]) -> Iterator[Dict[str, Any]]:
+        """프로세스 풀에서 파일을 병렬로 파싱하고 입력 순서대로 생성"""
+        results: Dict[int, Any] = {}
+        in_flight: Dict[Future, tuple] = {}
+        next_to_submit = 0
+        next_to_yield = 0
+        # 순서 보장을 위해 버퍼링하는 결과 수 상한
+        window = self.max_workers * 4
+        
+        executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        
+        def submit(index: int) -> None:
+            future = executor.submit(_parse_file, str(self.upload_folder), file_paths[index])
+            in_flight[future] = (index, time.monotonic() + self.file_timeout)
+        
+        try:
+            while next_to_yield < len(file_paths):
+                # 실행 중인 작업이 워커 수를 넘지 않도록 제출 (제출 시점부터 타임아웃 계산)
+                while (len(in_flight) < self.max_workers and next_to_submit < len(file_paths)
+                       and next_to_submit - next_to_yield < window):
+                    submit(next_to_submit)
+                    next_to_submit += 1
                 
-        return documents
+                while next_to_yield in results:
+                    file_path = file_paths[next_to_yield]
+                    segments = results.pop(next_to_yield)
+                    next_to_yield += 1
+                    if segments is not None:
+                        yield {
+                            'file_path': file_path,
+                            'segments': segments,
+                            'file_type': Path(file_path).suffix.lower(),
+                            'attributes': self.file_attributes(file_path)
+                        }
+                
+                if not in_flight:
+                    continue
+                
+                nearest_deadline = min(deadline for _, deadline in in_flight.values())
+                done, _ = wait(list(in_flight), timeout=max(nearest_deadline - time.monotonic(), 0),
+                               return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    index, _ = in_flight.pop(future)
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        self._record_error(file_paths[index], e)
+                        results[index] = None
+                
+                now = time.monotonic()
+                expired = [future for future, (_, deadline) in in_flight.items() if deadline <= now]
+                if expired:
+                    # 멈춘 워커는 종료할 수밖에 없으므로 풀을 재시작하고 나머지 작업은 다시 제출
+                    for future in expired:
+                        index, _ = in_flight.pop(future)
+                        self._record_error(file_paths[index], f"Timed out after {self.file_timeout}s")
+                        results[index] = None
+                    retry_indices = [index for index, _ in in_flight.values()]
+                    in_flight.clear()
+                    _terminate_executor(executor)
+                    executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    for index in retry_indices:
+                        submit(index)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _record_error(self, file_path: str, error: Any) -> None:
+        """파일별 로딩 오류 기록"""
+        logger.error(f"Error loading {file_path}: {error}")
+        self.errors.append({'file_path': str(file_path), 'error': str(error)})
     
-    def _get_all_files(self) -> List[str]:
-        """data 폴더의 모든 허용된 파일 반환"""
+    def get_all_files(self) -> List[str]:
+        """data 폴더(하위 폴더 포함)의 모든 허용된 파일 반환"""
         files = []
         for ext in ALLOWED_EXTENSIONS:
-            files.extend(self.upload_folder.glob(f"*.{ext}"))
+            files.extend(self.upload_folder.rglob(f"*.{ext}"))
         return [str(f) for f in files]
     
-    def _load_single_document(self, file_path: str) -> str:
-        """단일 문서를 텍스트로 변환"""
+    def file_attributes(self, file_path: str) -> Dict[str, str]:
+        """파일 위치로부터 검색 필터용 속성 추출
+        
+        - source: Google Drive에서 받은 파일이면 'gdrive', 그 외에는 'upload'
+        - category: data 폴더 (Drive 파일은 Drive 다운로드 폴더) 아래 첫 번째 하위 폴더 이름
+        - course: 확장자를 뺀 파일 이름
+        """
+        path = Path(file_path).resolve()
+        gdrive_folder = Path(GDRIVE_DOWNLOAD_FOLDER).resolve()
+        if gdrive_folder in path.parents:
+            source, root = 'gdrive', gdrive_folder
+        else:
+            source, root = 'upload', self.upload_folder.resolve()
+        
+        try:
+            relative_dirs = path.relative_to(root).parts[:-1]
+        except ValueError:
+            relative_dirs = ()
+        return {
+            'source': source,
+            'category': relative_dirs[0] if relative_dirs else '',
+            'course': path.stem
+        }
+    
+    def iter_segments(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """단일 문서를 세그먼트 단위로 생성"""
         file_path = Path(file_path)
         
         if not file_path.exists():
@@ -56,66 +219,177 @@ class DocumentLoader:
         file_extension = file_path.suffix.lower()
         
         if file_extension == '.pdf':
-            return self._load_pdf(file_path)
+            segments = self._iter_pdf(file_path)
         elif file_extension in ['.docx', '.doc']:
-            return self._load_docx(file_path)
+            segments = self._iter_docx(file_path)
         elif file_extension in ['.xlsx', '.xls']:
-            return self._load_excel(file_path)
+            segments = self._iter_excel(file_path)
         elif file_extension == '.csv':
-            return self._load_csv(file_path)
+            segments = self._iter_csv(file_path)
         elif file_extension == '.txt':
-            return self._load_txt(file_path)
+            segments = self._iter_txt(file_path)
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
+        
+        offset = 0
+        for segment in segments:
+            if not segment['content'].strip():
+                continue
+            segment['offset'] = offset
+            offset += len(segment['content']) + 1
+            yield segment
     
-    def _load_pdf(self, file_path: Path) -> str:
-        """PDF 파일을 텍스트로 변환"""
-        text = ""
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-        except Exception as e:
-            logger.error(f"Error reading PDF {file_path}: {e}")
-        return text.strip()
+    def _iter_pdf(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """PDF 파일을 페이지 단위로 변환"""
+        if self._pdf_extractor is None:
+            self._pdf_extractor = PDFExtractor(max_workers=self.pdf_workers)
+        for page_number, text in self._pdf_extractor.iter_pages(file_path):
+            yield {'content': text, 'page': page_number}
     
-    def _load_docx(self, file_path: Path) -> str:
-        """DOCX 파일을 텍스트로 변환"""
-        text = ""
-        try:
-            doc = Document(file_path)
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-        except Exception as e:
-            logger.error(f"Error reading DOCX {file_path}: {e}")
-        return text.strip()
+    def _iter_docx(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """DOCX 파일을 문단 블록 단위로 변환"""
+        doc = Document(file_path)
+        block = []
+        block_size = 0
+        for paragraph in doc.paragraphs:
+            block.append(paragraph.text)
+            block_size += len(paragraph.text) + 1
+            if block_size >= LOADER_SEGMENT_CHARS:
+                yield {'content': "\n".join(block)}
+                block = []
+                block_size = 0
+        if block:
+            yield {'content': "\n".join(block)}
     
-    def _load_excel(self, file_path: Path) -> str:
-        """Excel 파일을 텍스트로 변환"""
-        text = ""
+    def _iter_excel(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Excel 파일의 모든 시트를 행 블록 단위로 변환"""
+        if file_path.suffix.lower() == '.xls':
+            # 구형 xls는 스트리밍 읽기를 지원하지 않으므로 시트 단위로 읽음
+            excel = pd.ExcelFile(file_path)
+            for sheet in excel.sheet_names:
+                df = excel.parse(sheet, header=None, dtype=object)
+                yield from self._iter_table(df.itertuples(index=False, name=None), sheet)
+            return
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
         try:
-            df = pd.read_excel(file_path)
-            text = df.to_string(index=False)
-        except Exception as e:
-            logger.error(f"Error reading Excel {file_path}: {e}")
-        return text.strip()
+            for worksheet in workbook.worksheets:
+                yield from self._iter_table(worksheet.iter_rows(values_only=True), worksheet.title)
+        finally:
+            workbook.close()
     
-    def _load_csv(self, file_path: Path) -> str:
-        """CSV 파일을 텍스트로 변환"""
-        text = ""
-        try:
-            df = pd.read_csv(file_path)
-            text = df.to_string(index=False)
-        except Exception as e:
-            logger.error(f"Error reading CSV {file_path}: {e}")
-        return text.strip()
+    def _iter_csv(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """CSV 파일을 행 블록 단위로 변환 (Excel에서 저장한 CSV의 BOM은 제거)"""
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as file:
+            yield from self._iter_table(csv.reader(file))
     
-    def _load_txt(self, file_path: Path) -> str:
-        """텍스트 파일을 읽기"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read().strip()
-        except Exception as e:
-            logger.error(f"Error reading TXT {file_path}: {e}")
-            return "" 
\ No newline at end of file
+    def _iter_table(self, rows: Iterator[tuple], sheet: str = None) -> Iterator[Dict[str, Any]]:
+        """첫 번째 비어 있지 않은 행을 헤더로 보고 TABLE_ROWS_PER_SEGMENT행씩 세그먼트 생성"""
+        columns = None
+        for row in rows:
+            if any(_format_cell(value) for value in row):
+                columns = [_format_cell(name) or f"열{i + 1}" for i, name in enumerate(row)]
+                break
+        if columns is None:
+            return
+        
+        block = []
+        for index, row in enumerate(rows):
+            block.append((index, row))
+            if len(block) >= TABLE_ROWS_PER_SEGMENT:
+                yield self._table_segment(columns, block, sheet)
+                block = []
+        if block:
+            yield self._table_segment(columns, block, sheet)
+    
+    def _table_segment(self, columns: List[str], block: List[tuple], sheet: str = None) -> Dict[str, Any]:
+        """표의 행 블록을 행마다 "열 이름: 값" 레코드로 변환
+        
+        레코드마다 열 이름을 반복하므로 청크가 행 중간에서 나뉘어도 값의 의미가 남고,
+        행 사이를 빈 줄로 구분해 청크가 가능한 한 행 경계에서 나뉜다. 'table_rows'에는
+        정확한 값 조회(TableStore)를 위한 행별 (행 번호, 레코드, [(열 이름, 값)])이 들어간다.
+        """
+        records = []
+        table_rows = []
+        for index, row in block:
+            cells = []
+            for i, value in enumerate(row):
+                value = _format_cell(value)
+                if value:
+                    cells.append((columns[i] if i < len(columns) else f"열{i + 1}", value))
+            if not cells:
+                continue
+            record = " | ".join(f"{name}: {value}" for name, value in cells)
+            records.append(record)
+            table_rows.append((index, record, cells))
+        
+        segment = {
+            'content': "\n\n".join(records),
+            'row_start': block[0][0],
+            'row_end': block[-1][0] + 1,
+            # 메타데이터 값은 문자열/숫자만 저장할 수 있으므로 열 이름은 이어 붙임
+            'columns': ", ".join(columns),
+            'table_rows': table_rows
+        }
+        if sheet is not None:
+            segment['sheet'] = sheet
+        return segment
+    
+    def _iter_txt(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """텍스트 파일을 줄 경계 기준 블록 단위로 읽기"""
+        with open(file_path, 'r', encoding='utf-8') as file:
+            remainder = ""
+            while True:
+                block = file.read(LOADER_SEGMENT_CHARS)
+                if not block:
+                    break
+                block = remainder + block
+                split_point = block.rfind('\n')
+                if split_point == -1:
+                    remainder = block
+                    if len(remainder) < LOADER_SEGMENT_CHARS * 4:
+                        continue
+                    # 줄바꿈이 없는 매우 긴 줄은 그대로 자름
+                    split_point = len(block)
+                    remainder = ""
+                else:
+                    remainder = block[split_point + 1:]
+                yield {'content': block[:split_point]}
+            if remainder:
+                yield {'content': remainder}
+
+
+def _format_cell(value: Any) -> str:
+    """표의 셀 값을 레코드에 넣을 문자열로 변환 (빈 셀은 빈 문자열)"""
+    if value is None or value is pd.NaT:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        # Excel은 정수도 실수로 저장하므로 소수점 없이 표시
+        if value.is_integer():
+            return str(int(value))
+    if isinstance(value, datetime):
+        if value.hour == value.minute == value.second == 0:
+            return value.date().isoformat()
+        return value.isoformat(sep=' ', timespec='minutes')
+    if isinstance(value, date):
+        return value.isoformat()
+    # 셀 안의 줄바꿈과 연속된 공백은 하나로 합침
+    return " ".join(str(value).split())
+
+
+def _parse_file(upload_folder: str, file_path: str) -> List[Dict[str, Any]]:
+    """워커 프로세스에서 단일 파일을 세그먼트 리스트로 파싱"""
+    # 워커 프로세스 안에서 다시 프로세스 풀을 만들지 않도록 페이지 병렬 추출은 사용하지 않음
+    loader = DocumentLoader(upload_folder, max_workers=1, pdf_workers=1)
+    return list(loader.iter_segments(file_path))
+
+
+def _terminate_executor(executor: ProcessPoolExecutor) -> None:
+    """응답하지 않는 워커 프로세스를 포함해 프로세스 풀을 강제 종료"""
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
@@ -0,0 +1,146 @@
+import os
+import json
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_content_hash(file_path: str) -> str:
+    """파일 내용의 SHA-256 해시 계산 (블록 단위 스트리밍)"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def normalize_path(file_path: str) -> str:
+    """매니페스트 키로 사용할 파일 경로 정규화"""
+    return os.path.normpath(str(file_path))
+
+
+class IndexManifest:
+    """인덱싱된 파일의 상태(mtime, 크기, 내용 해시, 청크 ID)를 기록하는 매니페스트"""
+    
+    def __init__(self, manifest_path: str, settings: Optional[Dict[str, Any]] = None):
+        self.manifest_path = manifest_path
+        # 청크 분할 방식 등 청크 ID에 영향을 주는 설정 (바뀌면 모든 파일을 다시 인덱싱)
+        self.settings = settings
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+    
+    def _load(self) -> None:
+        """디스크에서 매니페스트 로드"""
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('files', {})
+        except Exception as e:
+            logger.error(f"Error reading index manifest {self.manifest_path}: {e}")
+            self.entries = {}
+            return
+        
+        if self.settings is not None and data.get('settings') != self.settings and self.entries:
+            # 기존 청크 ID는 유지해 다시 인덱싱할 때 이전 청크가 정리되도록 함
+            logger.info("Index settings changed, all files will be re-indexed")
+            for entry in self.entries.values():
+                entry['sha256'] = None
+                # 내용이 같은 청크도 임베딩/메타데이터를 다시 기록
+                entry['rebuild'] = True
+    
+    def save(self) -> None:
+        """매니페스트를 원자적으로 저장"""
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'settings': self.settings, 'files': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def files(self) -> List[str]:
+        """매니페스트에 기록된 파일 목록"""
+        return list(self.entries.keys())
+    
+    def has_file(self, file_path: str) -> bool:
+        return normalize_path(file_path) in self.entries
+    
+    def get_chunk_ids(self, file_path: str) -> List[str]:
+        """파일에 속한 청크 ID 목록"""
+        entry = self.entries.get(normalize_path(file_path))
+        return list(entry['chunk_ids']) if entry else []
+    
+    def needs_rebuild(self, file_path: str) -> bool:
+        """설정 변경으로 기존 청크를 재사용하지 않고 모두 다시 저장해야 하는지 확인"""
+        entry = self.entries.get(normalize_path(file_path))
+        return bool(entry and entry.get('rebuild'))
+    
+    def is_unchanged(self, file_path: str) -> bool:
+        """파일이 마지막 인덱싱 이후 변경되지 않았는지 확인
+        
+        mtime과 크기가 같으면 해시 계산 없이 변경 없음으로 판단하고,
+        mtime만 바뀐 경우에는 내용 해시를 비교한다.
+        """
+        key = normalize_path(file_path)
+        entry = self.entries.get(key)
+        if entry is None or entry['sha256'] is None:
+            return False
+        
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return False
+        
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime == entry['mtime']:
+            return True
+        
+        if file_content_hash(key) == entry['sha256']:
+            # 내용은 같고 mtime만 바뀐 경우 (touch, 재다운로드 등)
+            entry['mtime'] = stat.st_mtime
+            return True
+        return False
+    
+    def update(self, file_path: str, chunk_ids: List[str], content_hash: Optional[str] = None) -> None:
+        """파일의 현재 상태와 청크 ID 기록"""
+        key = normalize_path(file_path)
+        stat = os.stat(key)
+        self.entries[key] = {
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'sha256': content_hash or file_content_hash(key),
+            'chunk_ids': list(chunk_ids)
+        }
+    
+    def mark_incomplete(self, file_path: str, chunk_ids: List[str]) -> None:
+        """인덱싱이 중간에 실패한 파일 기록
+        
+        저장된 청크 ID는 유지하되 해시를 비워 다음 실행에서 다시 인덱싱되도록 한다.
+        """
+        key = normalize_path(file_path)
+        self.entries[key] = {
+            'mtime': None,
+            'size': None,
+            'sha256': None,
+            'chunk_ids': list(chunk_ids),
+            'rebuild': self.needs_rebuild(key)
+        }
+    
+    def remove(self, file_path: str) -> List[str]:
+        """파일 항목을 제거하고 해당 청크 ID 반환"""
+        entry = self.entries.pop(normalize_path(file_path), None)
+        return list(entry['chunk_ids']) if entry else []
+    
+    def clear(self) -> None:
+        """매니페스트 초기화"""
+        self.entries = {}
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
@@ -0,0 +1,220 @@
+import os
+import time
+import zlib
+import sqlite3
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import PyPDF2
+
+try:
+    import pymupdf as fitz  # PyMuPDF (선택)
+except ImportError:
+    try:
+        import fitz  # PyMuPDF 1.24 이전
+    except ImportError:
+        fitz = None
+
+from .config import (
+    PDF_EXTRACT_BACKEND, PDF_EXTRACT_WORKERS, PDF_PARALLEL_MIN_PAGES, PDF_PAGE_CACHE_ENABLED,
+    PDF_PAGE_CACHE_PATH, PDF_PAGE_CACHE_MAX_FILES
+)
+from .manifest import file_content_hash
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PDF_BACKENDS = ('pymupdf', 'pypdf2')
+# 병렬 추출 시 워커당 나누어 줄 작업 수 (페이지마다 처리 시간이 달라도 워커가 고르게 바쁘도록)
+_TASKS_PER_WORKER = 4
+# 추출한 페이지를 이 수만큼 모아서 캐시에 저장
+_CACHE_WRITE_PAGES = 64
+
+
+def resolve_backend(name: str = PDF_EXTRACT_BACKEND) -> str:
+    """설정된 이름을 실제 추출기 이름으로 변환 ('auto'이면 PyMuPDF가 설치되어 있을 때 사용)"""
+    if name == 'auto':
+        return 'pymupdf' if fitz is not None else 'pypdf2'
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF extract backend: {name}")
+    if name == 'pymupdf' and fitz is None:
+        raise ValueError("PDF extract backend 'pymupdf' requires PyMuPDF (pip install pymupdf)")
+    return name
+
+
+def page_count(backend: str, file_path: str) -> int:
+    if backend == 'pymupdf':
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def iter_page_texts(backend: str, file_path: str, pages: List[int]) -> Iterator[str]:
+    """지정한 페이지(0부터 시작)의 텍스트를 순서대로 생성 (파일은 한 번만 엶)"""
+    if backend == 'pymupdf':
+        with fitz.open(file_path) as doc:
+            for page in pages:
+                yield doc[page].get_text()
+        return
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page in pages:
+            yield reader.pages[page].extract_text() or ""
+
+
+def _extract_pages(backend: str, file_path: str, pages: List[int]) -> List[str]:
+    """워커 프로세스에서 페이지 묶음의 텍스트 추출"""
+    return list(iter_page_texts(backend, file_path, pages))
+
+
+class PageTextCache:
+    """PDF 페이지별 추출 텍스트를 (파일 해시, 추출기, 페이지) 단위로 저장하는 SQLite 캐시
+    
+    파일 경로가 아니라 내용 해시로 찾으므로 설정 변경으로 다시 인덱싱하거나 파일을 옮겨도
+    다시 파싱하지 않는다. 텍스트는 압축해 저장하며, max_files개를 넘으면 가장 오래
+    사용되지 않은 파일의 페이지부터 삭제한다. 여러 로더 워커 프로세스가 함께 사용할 수 있다.
+    """
+    
+    def __init__(self, db_path: str = PDF_PAGE_CACHE_PATH, max_files: int = PDF_PAGE_CACHE_MAX_FILES):
+        self.db_path = db_path
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                file_hash TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                page_count INTEGER NOT NULL,
+                used_at REAL NOT NULL,
+                PRIMARY KEY (file_hash, backend)
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                file_hash TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                text BLOB NOT NULL,
+                PRIMARY KEY (file_hash, backend, page)
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_used ON files(used_at);
+        """)
+        self._conn.commit()
+    
+    def get_pages(self, file_hash: str, backend: str) -> Tuple[Optional[int], Dict[int, str]]:
+        """(전체 페이지 수, 저장된 페이지 텍스트) 반환 (페이지 번호는 0부터, 처음 보는 파일이면 (None, {}))"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_count FROM files WHERE file_hash = ? AND backend = ?", (file_hash, backend)
+            ).fetchone()
+            if row is None:
+                return None, {}
+            rows = self._conn.execute(
+                "SELECT page, text FROM pages WHERE file_hash = ? AND backend = ?", (file_hash, backend)
+            ).fetchall()
+            self._conn.execute("UPDATE files SET used_at = ? WHERE file_hash = ? AND backend = ?",
+                               (time.time(), file_hash, backend))
+            self._conn.commit()
+        return row[0], {page: zlib.decompress(text).decode('utf-8') for page, text in rows}
+    
+    def put_pages(self, file_hash: str, backend: str, page_count: int, pages: List[Tuple[int, str]]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (file_hash, backend, page_count, used_at) VALUES (?, ?, ?, ?)",
+                (file_hash, backend, page_count, time.time())
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pages (file_hash, backend, page, text) VALUES (?, ?, ?, ?)",
+                [(file_hash, backend, page, zlib.compress(text.encode('utf-8'))) for page, text in pages]
+            )
+            self._prune()
+            self._conn.commit()
+    
+    def _prune(self) -> None:
+        """max_files를 넘는 오래된 파일의 페이지 삭제 (잠금을 가진 상태에서 호출)"""
+        stale = self._conn.execute(
+            "SELECT file_hash, backend FROM files ORDER BY used_at DESC LIMIT -1 OFFSET ?", (self.max_files,)
+        ).fetchall()
+        for file_hash, backend in stale:
+            self._conn.execute("DELETE FROM pages WHERE file_hash = ? AND backend = ?", (file_hash, backend))
+            self._conn.execute("DELETE FROM files WHERE file_hash = ? AND backend = ?", (file_hash, backend))
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("DELETE FROM files")
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {'files': files, 'pages': pages, 'max_files': self.max_files}
+
+
+class PDFExtractor:
+    """PDF를 페이지 단위 텍스트로 추출
+    
+    PyMuPDF가 설치되어 있으면 사용하고 없으면 PyPDF2를 사용한다 (backend로 지정 가능).
+    캐시에 없는 페이지가 parallel_min_pages 이상이면 페이지를 묶음으로 나누어
+    max_workers개 프로세스에서 추출하며, 결과는 페이지 순서대로 생성한다.
+    추출한 텍스트는 (파일 해시, 추출기, 페이지) 단위로 캐시한다.
+    """
+    
+    def __init__(self, backend: str = PDF_EXTRACT_BACKEND, max_workers: int = PDF_EXTRACT_WORKERS,
+                 parallel_min_pages: int = PDF_PARALLEL_MIN_PAGES, cache: Optional[PageTextCache] = None,
+                 use_cache: bool = PDF_PAGE_CACHE_ENABLED):
+        self.backend = resolve_backend(backend)
+        self.max_workers = max_workers
+        self.parallel_min_pages = parallel_min_pages
+        if cache is None and use_cache:
+            cache = PageTextCache()
+        self.cache = cache
+    
+    def iter_pages(self, file_path: str) -> Iterator[Tuple[int, str]]:
+        """(페이지 번호(1부터), 텍스트)를 페이지 순서대로 생성"""
+        file_path = str(file_path)
+        file_hash = file_content_hash(file_path) if self.cache is not None else None
+        total, cached = self.cache.get_pages(file_hash, self.backend) if self.cache is not None else (None, {})
+        if total is None:
+            total = page_count(self.backend, file_path)
+        missing = [page for page in range(total) if page not in cached]
+        if cached:
+            logger.debug(f"Using {total - len(missing)} cached pages for {Path(file_path).name}")
+        
+        extracted = self._extract(file_path, missing)
+        pending: List[Tuple[int, str]] = []
+        for page in range(total):
+            if page not in cached:
+                page_numbers, texts = next(extracted)
+                cached.update(zip(page_numbers, texts))
+                pending.extend(zip(page_numbers, texts))
+                if self.cache is not None and len(pending) >= _CACHE_WRITE_PAGES:
+                    self.cache.put_pages(file_hash, self.backend, total, pending)
+                    pending = []
+            yield page + 1, cached.pop(page)
+        if self.cache is not None and pending:
+            self.cache.put_pages(file_hash, self.backend, total, pending)
+    
+    def _extract(self, file_path: str, pages: List[int]) -> Iterator[Tuple[List[int], List[str]]]:
+        """(페이지 목록, 텍스트 목록) 묶음을 페이지 순서대로 생성"""
+        if not pages:
+            return
+        if self.max_workers <= 1 or len(pages) < self.parallel_min_pages:
+            for page, text in zip(pages, iter_page_texts(self.backend, file_path, pages)):
+                yield [page], [text]
+            return
+        
+        size = -(-len(pages) // (self.max_workers * _TASKS_PER_WORKER))
+        tasks = [pages[start:start + size] for start in range(0, len(pages), size)]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for task, texts in zip(tasks, executor.map(partial(_extract_pages, self.backend, file_path), tasks)):
+                yield task, texts
@@ -0,0 +1,220 @@
+import re
+import hashlib
+import threading
+import logging
+from typing import List, Dict, Any, Optional
+
+from .config import (
+    QUERY_REWRITE_MODE, QUERY_REWRITE_HISTORY_MESSAGES, QUERY_REWRITE_CACHE_SIZE, QUERY_REWRITE_CACHE_TTL
+)
+from .cache import TTLCache, normalize_query
+from .text import strip_particle
+from .llm import LLMBackend
+from .summarizer import SUMMARY_PREFIX
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_ROLE_LABELS = {'user': '고객', 'assistant': '상담원'}
+_WORD_PATTERN = re.compile(r"[0-9A-Za-z가-힣+#]+")
+# 후속 질문을 시작하는 말
+_FOLLOWUP_MARKERS = {'그럼', '그러면', '그리고', '그건', '그거', '그거는', '거기', '거기는', '이건', '이거', '저건', '저거',
+                     '그', '이', '저', '또', '그것', '이것', '해당', 'what', 'how', 'and', 'it', 'that', 'this'}
+# 검색에 도움이 되지 않는 질문/기능어
+_STOPWORDS = _FOLLOWUP_MARKERS | {
+    '알려주세요', '알려줘', '알려', '주세요', '궁금합니다', '궁금해요', '궁금', '뭐예요', '뭔가요', '무엇인가요', '무엇',
+    '뭐', '어떻게', '어떤', '얼마', '얼마나', '있나요', '있어요', '있', '되나요', '되', '해요', '하나요', '인지', '언제',
+    '어디', '누구', '몇', '혹시', '좀', '네', '감사합니다', '다시', '더', 'about', 'the', 'is', 'are', 'for', 'of'
+}
+# 과정의 속성을 묻는 말 (후속 질문은 보통 속성만 바꾸거나 대상만 바꿈)
+_ATTRIBUTES = {
+    '수강료', '가격', '비용', '금액', '할인', '환불', '기간', '일정', '시간', '시작', '개강', '종료', '커리큘럼', '내용',
+    '과목', '강사', '선생님', '장소', '위치', '온라인', '오프라인', '신청', '등록', '접수', '자격', '자격증', '수료',
+    '수료증', '난이도', '대상', '준비물', '교재', '정원', '인원', '후기', '취업', 'price', 'cost', 'fee', 'schedule',
+    'duration', 'curriculum'
+}
+# 과정명에 붙는 일반 명사 (이것만으로는 대상이 정해지지 않음)
+_GENERIC = {'과정', '강의', '수업', '코스', '교육', '클래스', '프로그램', 'course', 'class'}
+# 앞 질문의 속성을 생략한 질문의 끝말 (예: "자바는요?", "엑셀 과정은?")
+_ELLIPTICAL_ENDINGS = ('은요', '는요', '이요', '은', '는')
+# 대상이 있는 질문은 내용어가 이 수 이하이고 생략형일 때만 후속 질문으로 봄
+_FOLLOWUP_MAX_TERMS = 2
+
+
+def _terms(text: str) -> List[str]:
+    """질문의 내용어 (조사를 뗀 단어, 불용어 제외)"""
+    terms = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        term = strip_particle(word)
+        if term not in _STOPWORDS and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def _entities(terms: List[str]) -> List[str]:
+    return [term for term in terms if term not in _ATTRIBUTES]
+
+
+def _attributes(terms: List[str]) -> List[str]:
+    return [term for term in terms if term in _ATTRIBUTES]
+
+
+def _has_subject(terms: List[str]) -> bool:
+    """대상(과정명 등)이 있는지 (일반 명사만 있으면 없는 것으로 봄)"""
+    return any(term not in _GENERIC for term in _entities(terms))
+
+
+def _is_elliptical(word: str) -> bool:
+    return any(len(word) > len(ending) and word.endswith(ending) for ending in _ELLIPTICAL_ENDINGS)
+
+
+def is_followup(query: str) -> bool:
+    """앞 대화를 봐야 뜻이 정해지는 후속 질문인지
+    
+    지시어로 시작하거나, 대상 없이 속성만 묻거나 ("수강료는요?", "얼마예요?"), 짧은 생략형 질문
+    ("자바는요?")인 경우. "hi", "감사합니다"처럼 질문의 단서가 없는 말은 후속 질문으로 보지 않는다.
+    """
+    words = _WORD_PATTERN.findall(query.lower())
+    if not words:
+        return False
+    if words[0] in _FOLLOWUP_MARKERS:
+        return True
+    terms = _terms(query)
+    if not terms:
+        # 의문사만 있는 질문 ("얼마예요?")
+        return query.rstrip().endswith('?')
+    if not _has_subject(terms):
+        return True
+    return len(terms) <= _FOLLOWUP_MAX_TERMS and _is_elliptical(words[-1])
+
+
+class QueryRewriter:
+    """후속 질문을 앞 대화를 반영한 독립적인 검색어로 다시 씀
+    
+    'rule' 모드는 LLM 호출 없이 이전 질문의 대상(과정명 등)이나 속성(수강료, 기간 등) 중 빠진 쪽을
+    이어 붙인다 (예: "파이썬 기초 과정 일정 알려주세요" 다음의 "그럼 수강료는요?" →
+    "파이썬 기초 과정 수강료는요?"). 'llm' 모드는 후속 질문으로 보이는 경우에만 LLM으로 다시 쓰고,
+    실패하면 'rule' 결과를 사용한다. 'off'이면 질문을 그대로 반환한다.
+    결과는 (세션, 최근 히스토리, 질문) 단위로 캐시한다.
+    """
+    
+    def __init__(self, llm: Optional[LLMBackend] = None, mode: str = QUERY_REWRITE_MODE,
+                 history_messages: int = QUERY_REWRITE_HISTORY_MESSAGES,
+                 cache_size: int = QUERY_REWRITE_CACHE_SIZE, cache_ttl: float = QUERY_REWRITE_CACHE_TTL):
+        if mode not in ('off', 'rule', 'llm'):
+            raise ValueError(f"Unknown query rewrite mode: {mode}")
+        if mode == 'llm' and llm is None:
+            raise ValueError("LLM query rewriting requires an LLM backend")
+        self.llm = llm
+        self.mode = mode
+        self.history_messages = history_messages
+        self._cache = TTLCache(cache_size, cache_ttl)
+        # 세션별 마지막 (원래 질문, 다시 쓴 질문): 연속된 후속 질문에서 대상을 이어받음
+        self._standalone = TTLCache(cache_size, cache_ttl)
+        self._stats_lock = threading.Lock()
+        self._stats = {'queries': 0, 'rewritten': 0, 'cache_hits': 0, 'llm_calls': 0, 'llm_failures': 0}
+    
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += value
+    
+    def rewrite(self, query: str, history: List[Dict[str, str]] = None, session_id: Optional[str] = None) -> str:
+        """검색에 사용할 독립적인 질문 반환 (다시 쓸 필요가 없으면 query 그대로)"""
+        recent = (history or [])[-self.history_messages:] if self.history_messages else []
+        if self.mode == 'off' or not recent:
+            return query
+        self._count('queries')
+        
+        key = (session_id, self._fingerprint(recent), normalize_query(query))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._count('cache_hits')
+            return cached
+        
+        rewritten = query
+        if is_followup(query):
+            rewritten = self._rule_rewrite(query, recent, session_id)
+            if self.mode == 'llm':
+                rewritten = self._llm_rewrite(query, recent) or rewritten
+        if rewritten != query:
+            self._count('rewritten')
+            logger.info(f"Rewrote follow-up query: {query!r} -> {rewritten!r}")
+        
+        self._cache.set(key, rewritten)
+        if session_id is not None:
+            self._standalone.set(session_id, (query, rewritten))
+        return rewritten
+    
+    @staticmethod
+    def _fingerprint(messages: List[Dict[str, str]]) -> str:
+        digest = hashlib.sha1()
+        for message in messages:
+            digest.update(f"{message['role']}\x00{message['content']}\x01".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _previous_questions(self, history: List[Dict[str, str]], session_id: Optional[str]) -> List[str]:
+        """이전 질문들 (최근 것부터). 직전 질문을 다시 쓴 결과가 있으면 그것을 먼저 사용"""
+        questions = [message['content'] for message in reversed(history) if message['role'] == 'user']
+        if session_id is not None and questions:
+            last = self._standalone.get(session_id)
+            if last is not None and last[0] == questions[0]:
+                questions.insert(0, last[1])
+        return questions
+    
+    def _rule_rewrite(self, query: str, history: List[Dict[str, str]], session_id: Optional[str]) -> str:
+        """이전 질문에서 빠진 대상 또는 속성을 이어 붙임"""
+        terms = _terms(query)
+        need_subject = not _has_subject(terms)
+        need_attributes = not need_subject and not _attributes(terms)
+        
+        for previous in self._previous_questions(history, session_id):
+            previous_terms = _terms(previous)
+            if need_subject and _has_subject(previous_terms):
+                carried = [term for term in _entities(previous_terms) if term not in terms]
+                return f"{' '.join(carried)} {self._strip_marker(query)}"
+            if need_attributes and _attributes(previous_terms):
+                return f"{self._strip_marker(query)} {' '.join(_attributes(previous_terms))}"
+        return query
+    
+    @staticmethod
+    def _strip_marker(query: str) -> str:
+        """질문 앞의 "그럼", "그거" 같은 지시어 제거"""
+        words = query.split()
+        while len(words) > 1 and words[0].lower().strip(',.?!~') in _FOLLOWUP_MARKERS:
+            words.pop(0)
+        return ' '.join(words)
+    
+    def _llm_rewrite(self, query: str, history: List[Dict[str, str]]) -> Optional[str]:
+        lines = []
+        for message in history:
+            content = message['content']
+            if message['role'] == 'system' and content.startswith(SUMMARY_PREFIX):
+                lines.append(f"이전 대화 요약: {content[len(SUMMARY_PREFIX):]}")
+            elif message['role'] in _ROLE_LABELS:
+                lines.append(f"{_ROLE_LABELS[message['role']]}: {content}")
+        transcript = "\n".join(lines)
+        messages = [
+            {'role': 'system', 'content': (
+                "교육 서비스 상담 대화의 마지막 질문을 앞 대화 없이도 이해할 수 있는 검색용 질문 한 문장으로 다시 쓰세요. "
+                "과정명 등 대화에서 가리키는 대상을 포함하고, 질문의 의도는 바꾸지 마세요. 다시 쓴 질문만 출력하세요."
+            )},
+            {'role': 'user', 'content': f"**대화:**\n{transcript}\n\n**마지막 질문:** {query}"}
+        ]
+        self._count('llm_calls')
+        try:
+            rewritten = self.llm.generate(messages)
+        except Exception as e:
+            logger.error(f"Error rewriting query: {e}")
+            self._count('llm_failures')
+            return None
+        lines = [line for line in rewritten.strip().splitlines() if line.strip()]
+        return lines[0].strip().strip('"\'') if lines else None
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['mode'] = self.mode
+        stats['rewrite_rate'] = stats['rewritten'] / stats['queries'] if stats['queries'] else 0.0
+        return stats
@@ -0,0 +1,109 @@
+import time
+import threading
+import logging
+from typing import List, Dict, Any, Tuple
+
+from .config import (
+    RERANK_MODEL_NAME, RERANK_MAX_LENGTH, RERANK_LATENCY_BUDGET_MS, RERANK_MAX_CONCURRENT
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 최근 재순위화 시간의 지수 이동 평균 가중치
+_LATENCY_EWMA_ALPHA = 0.2
+# 재순위화를 건너뛸 때마다 추정 시간을 줄여 부하가 줄면 다시 시도하게 함
+_LATENCY_DECAY_ON_SKIP = 0.9
+
+
+class CrossEncoderReranker:
+    """로컬 cross-encoder로 검색 후보를 다시 정렬하는 클래스
+    
+    후보 전체를 한 번의 배치 추론으로 점수화한다. CPU 추론이므로 동시에 실행 중인
+    재순위화가 RERANK_MAX_CONCURRENT개 이상이거나 최근 평균 시간이 지연 예산을 넘으면
+    재순위화를 건너뛰고 1단계 검색 순서를 그대로 사용한다.
+    """
+    
+    def __init__(self, model_name: str = RERANK_MODEL_NAME, max_length: int = RERANK_MAX_LENGTH,
+                 latency_budget_ms: float = RERANK_LATENCY_BUDGET_MS,
+                 max_concurrent: int = RERANK_MAX_CONCURRENT):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.latency_budget_ms = latency_budget_ms
+        self.max_concurrent = max_concurrent
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency_ms = 0.0
+    
+    @property
+    def model(self):
+        """cross-encoder 모델 (처음 사용할 때 로드)"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name, max_length=self.max_length, device='cpu')
+                    logger.info(f"Loaded reranker model {self.model_name}")
+        return self._model
+    
+    def _acquire(self) -> bool:
+        """부하 상태를 확인하고 재순위화를 실행할 수 있으면 슬롯 확보"""
+        with self._lock:
+            overloaded = self._in_flight >= self.max_concurrent
+            over_budget = self.latency_budget_ms > 0 and self._latency_ms > self.latency_budget_ms
+            if overloaded or over_budget:
+                self._latency_ms *= _LATENCY_DECAY_ON_SKIP
+                return False
+            self._in_flight += 1
+            return True
+    
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+    
+    def _record_latency(self, elapsed_ms: float) -> None:
+        """성공한 재순위화 시간을 평균에 반영"""
+        with self._lock:
+            if self._latency_ms == 0.0:
+                self._latency_ms = elapsed_ms
+            else:
+                self._latency_ms += _LATENCY_EWMA_ALPHA * (elapsed_ms - self._latency_ms)
+    
+    def rerank(self, query: str, documents: List[Dict[str, Any]], top_k: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """후보 문서를 cross-encoder 점수 순으로 정렬해 상위 top_k개 반환
+        
+        반환값의 두 번째 항목은 실제로 재순위화했는지 여부이며, 건너뛴 경우
+        입력 순서의 상위 top_k개를 반환한다.
+        """
+        if len(documents) <= 1 or not self._acquire():
+            return documents[:top_k], False
+        
+        try:
+            # 모델 로드 시간은 추론 시간 추정에서 제외
+            model = self.model
+            start = time.perf_counter()
+            pairs = [(query, doc['content']) for doc in documents]
+            scores = model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+            # 실패한 요청은 평균에 넣지 않음 (0으로 넣으면 예산을 넘는 모델도 계속 실행됨)
+            self._record_latency((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            logger.error(f"Error reranking documents: {e}")
+            return documents[:top_k], False
+        finally:
+            self._release()
+        
+        for doc, score in zip(documents, scores):
+            doc['rerank_score'] = float(score)
+        ranked = sorted(documents, key=lambda doc: doc['rerank_score'], reverse=True)
+        return ranked[:top_k], True
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'model': self.model_name,
+                'in_flight': self._in_flight,
+                'latency_ms_avg': self._latency_ms,
+                'latency_budget_ms': self.latency_budget_ms
+            }
@@ -1,59 +1,265 @@
-import openai
-from typing import List, Dict, Any
+import time
+import asyncio
+import functools
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, AsyncIterator, Optional, Callable
 import logging
-from .config import OPENAI_API_KEY, MODEL_NAME, MAX_TOKENS, TEMPERATURE, TOP_K_RESULTS
+from .config import (
+    TOP_K_RESULTS, SIMILARITY_THRESHOLD, ANSWER_CACHE_ENABLED, RETRIEVAL_EXECUTOR_WORKERS,
+    CONTEXT_WINDOW_TOKENS, MAX_TOKENS, RERANK_ENABLED, RERANK_CANDIDATES, RERANK_TOP_K, HISTORY_TOP_K_RESULTS
+)
+from .answer_cache import SemanticAnswerCache
+from .llm import LLMBackend, create_llm_backend
+from .tokens import ContextPacker, count_message_tokens
+from .rerank import CrossEncoderReranker
+from .query_rewriter import QueryRewriter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+NO_RESULTS_MESSAGE = "죄송합니다. 관련된 교육 과정 정보를 찾을 수 없습니다. 다른 질문을 해주시거나 상담원에게 문의해주세요."
+ERROR_MESSAGE = "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+GENERATION_ERROR_MESSAGE = "죄송합니다. 응답 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+# 단계별 소요 시간을 집계하는 단계 이름
+STAGES = ('rewrite', 'retrieval', 'rerank', 'generation')
+
 class ChatbotSearch:
     """검색 및 LLM 응답 처리를 담당하는 클래스"""
     
-    def __init__(self, embedder):
+    def __init__(self, embedder, llm: LLMBackend = None, answer_cache: SemanticAnswerCache = None,
+                 similarity_threshold: float = SIMILARITY_THRESHOLD, packer: ContextPacker = None,
+                 reranker: CrossEncoderReranker = None, rerank_candidates: int = RERANK_CANDIDATES,
+                 rerank_top_k: int = RERANK_TOP_K, rewriter: QueryRewriter = None):
         self.embedder = embedder
-        openai.api_key = OPENAI_API_KEY
+        self.llm = llm if llm is not None else create_llm_backend()
+        self.similarity_threshold = similarity_threshold
+        # 교육 자료와 대화 히스토리를 토큰 예산에 맞게 구성
+        self.packer = packer if packer is not None else ContextPacker()
+        
+        # 후보를 rerank_candidates개 검색한 뒤 cross-encoder로 rerank_top_k개만 남김
+        if reranker is None and RERANK_ENABLED:
+            reranker = CrossEncoderReranker()
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self.rerank_top_k = rerank_top_k
+        
+        # 대화 중 후속 질문을 독립적인 검색어로 다시 쓴 뒤 검색
+        self.rewriter = rewriter if rewriter is not None else QueryRewriter(self.llm)
+        
+        # 검색/LLM 호출 통계
+        self._stats = {'queries': 0, 'short_circuited': 0, 'llm_calls': 0,
+                       'prompt_tokens_total': 0, 'prompt_tokens_last': 0,
+                       'reranked': 0, 'rerank_skipped': 0, 'table_lookups': 0}
+        for stage in STAGES:
+            self._stats[f'{stage}_ms_total'] = 0.0
+            self._stats[f'{stage}_count'] = 0
+        self._stats_lock = threading.Lock()
         
-    def search_and_respond(self, query: str, top_k: int = TOP_K_RESULTS) -> str:
-        """쿼리를 검색하고 LLM으로 응답 생성"""
+        # 비동기 API에서 CPU 작업(임베딩, 벡터 검색)을 실행할 스레드 풀
+        self._executor = None
+        
+        if answer_cache is None and ANSWER_CACHE_ENABLED:
+            answer_cache = SemanticAnswerCache()
+        self.answer_cache = answer_cache
+        if self.answer_cache is not None:
+            # 청크가 변경/삭제되면 해당 청크로 만든 응답 무효화
+            self.embedder.add_change_listener(self.answer_cache.invalidate_chunks)
+        
+    def search_and_respond(self, query: str, top_k: int = TOP_K_RESULTS,
+                           filters: Optional[Dict[str, Any]] = None) -> str:
+        """쿼리를 검색하고 LLM으로 응답 생성 (filters로 검색할 문서 범위 제한)"""
         try:
             # 유사한 문서 검색
-            similar_docs = self.embedder.search_similar(query, top_k)
-            
-            if not similar_docs:
-                return "죄송합니다. 관련된 교육 과정 정보를 찾을 수 없습니다. 다른 질문을 해주시거나 상담원에게 문의해주세요."
+            similar_docs = self._retrieve(query, top_k, filters)
+            return self.respond(query, similar_docs)
             
-            # 컨텍스트 구성
-            context = self._build_context(similar_docs)
+        except Exception as e:
+            logger.error(f"Error in search_and_respond: {e}")
+            return ERROR_MESSAGE
+    
+    def search_and_respond_batch(self, queries: List[str], top_k: int = TOP_K_RESULTS,
+                                 filters: Optional[Dict[str, Any]] = None) -> List[str]:
+        """여러 쿼리를 한 번에 검색한 뒤 쿼리별 응답 생성 (FAQ 응답 캐시 예열용)"""
+        try:
+            batch_docs = self.retrieve_batch(queries, top_k, filters)
+        except Exception as e:
+            logger.error(f"Error in search_and_respond_batch: {e}")
+            return [ERROR_MESSAGE] * len(queries)
+        
+        responses = []
+        for query, similar_docs in zip(queries, batch_docs):
+            try:
+                responses.append(self.respond(query, similar_docs))
+            except Exception as e:
+                logger.error(f"Error in search_and_respond_batch: {e}")
+                responses.append(ERROR_MESSAGE)
+        return responses
+    
+    def respond(self, query: str, similar_docs: List[Dict[str, Any]]) -> str:
+        """검색된 문서로 응답 생성 (응답 캐시 조회/저장 포함)"""
+        if not similar_docs:
+            return NO_RESULTS_MESSAGE
+        
+        # 같은 컨텍스트에서 의미가 같은 질문에 대한 응답이 있으면 재사용
+        cached_response = self._lookup_cached_answer(query, similar_docs)
+        if cached_response is not None:
+            return cached_response
+        
+        # 컨텍스트 구성
+        context = self._build_context(similar_docs)
+        
+        # LLM 응답 생성
+        response = self._generate_response(query, context)
+        
+        if response != GENERATION_ERROR_MESSAGE:
+            self._store_answer(query, similar_docs, response)
+        
+        return response
+    
+    def stream_search_and_respond(self, query: str, top_k: int = TOP_K_RESULTS,
+                                  filters: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """쿼리를 검색하고 LLM 응답을 토큰 단위로 스트리밍
+        
+        토큰 전송 중에 LLM 호출이 실패하면 예외를 그대로 전달하며, 잘린 응답은 캐시에 저장하지 않는다.
+        """
+        try:
+            similar_docs = self._retrieve(query, top_k, filters)
             
-            # LLM 응답 생성
-            response = self._generate_response(query, context)
+            if not similar_docs:
+                yield NO_RESULTS_MESSAGE
+                return
             
-            return response
+            cached_response = self._lookup_cached_answer(query, similar_docs)
+            if cached_response is not None:
+                yield cached_response
+                return
             
+            context = self._build_context(similar_docs)
         except Exception as e:
-            logger.error(f"Error in search_and_respond: {e}")
-            return "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+            logger.error(f"Error in stream_search_and_respond: {e}")
+            yield ERROR_MESSAGE
+            return
+        
+        tokens = []
+        for token in self._stream_or_error(self._build_messages(query, context)):
+            tokens.append(token)
+            yield token
+        
+        # 토큰 전송 중 실패하면 _stream_or_error에서 예외가 발생하므로 여기까지 오면 완전한 응답
+        response = "".join(tokens).strip()
+        if response and response != GENERATION_ERROR_MESSAGE:
+            self._store_answer(query, similar_docs, response)
     
-    def _build_context(self, similar_docs: List[Dict[str, Any]]) -> str:
-        """검색된 문서들을 컨텍스트로 구성"""
-        context_parts = []
+    def _retrieve(self, query: str, top_k: int, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """유사도 임계값을 넘는 문서만 검색 (결과가 없으면 LLM을 호출하지 않음)
         
-        for i, doc in enumerate(similar_docs, 1):
-            content = doc['content']
-            metadata = doc['metadata']
-            
-            # 문서 정보 추가
-            context_part = f"[교육 자료 {i} - {metadata.get('file_path', 'Unknown')}]\n{content}\n"
-            context_parts.append(context_part)
+        재순위화를 사용하면 후보를 더 많이 가져와 cross-encoder 점수 순으로 상위 문서만 남긴다.
+        """
+        return self.retrieve_batch([query], top_k, filters)[0]
+    
+    def retrieve_batch(self, queries: List[str], top_k: int = TOP_K_RESULTS,
+                       filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리를 한 번의 일괄 검색으로 처리하여 쿼리별 문서 목록 반환 (오프라인 평가용)
+        
+        과정명과 수강료처럼 표의 셀 값과 열 이름을 함께 묻는 쿼리는 벡터 검색 대신 표의 행을 바로 사용한다.
+        """
+        fetch_k = max(top_k, self.rerank_candidates) if self.reranker is not None else top_k
+        with self._timed('retrieval'):
+            table_docs = [self.embedder.lookup_table(query, filters)[:top_k] for query in queries]
+            search_queries = [query for query, docs in zip(queries, table_docs) if not docs]
+            batch_docs = iter(self.embedder.search_similar_batch(search_queries, fetch_k,
+                                                                 min_similarity=self.similarity_threshold,
+                                                                 filters=filters) if search_queries else [])
         
-        return "\n".join(context_parts)
+        results = []
+        for query, table_rows in zip(queries, table_docs):
+            self._count('queries')
+            if table_rows:
+                self._count('table_lookups')
+                results.append(table_rows)
+                continue
+            similar_docs = next(batch_docs)
+            if not similar_docs:
+                self._count('short_circuited')
+                logger.info(f"No documents above similarity threshold {self.similarity_threshold}, skipping LLM call")
+            elif self.reranker is not None:
+                with self._timed('rerank'):
+                    similar_docs, reranked = self.reranker.rerank(query, similar_docs, min(top_k, self.rerank_top_k))
+                self._count('reranked' if reranked else 'rerank_skipped')
+            results.append(similar_docs)
+        return results
     
-    def _generate_response(self, query: str, context: str) -> str:
-        """OpenAI API를 사용하여 교육 서비스 특화 응답 생성"""
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += value
+    
+    def _record_time(self, stage: str, seconds: float) -> None:
+        with self._stats_lock:
+            self._stats[f'{stage}_ms_total'] += seconds * 1000
+            self._stats[f'{stage}_count'] += 1
+    
+    @contextlib.contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        """블록 실행 시간을 단계별 통계에 기록"""
+        start = time.perf_counter()
         try:
-            system_prompt = f"""당신은 교육 서비스 회사의 공손하고 전문적인 상담원입니다. 
-다음 교육 과정 정보를 기반으로 고객의 질문에 답변해주세요.
+            yield
+        finally:
+            self._record_time(stage, time.perf_counter() - start)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """검색/LLM 호출 통계 (관련 문서가 없어 LLM 호출을 생략한 비율 포함)"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['short_circuit_rate'] = stats['short_circuited'] / stats['queries'] if stats['queries'] else 0.0
+        stats['prompt_tokens_avg'] = stats['prompt_tokens_total'] / stats['llm_calls'] if stats['llm_calls'] else 0.0
+        for stage in STAGES:
+            count = stats[f'{stage}_count']
+            stats[f'{stage}_ms_avg'] = stats[f'{stage}_ms_total'] / count if count else 0.0
+        if self.reranker is not None:
+            stats['reranker'] = self.reranker.stats()
+        stats['query_rewriter'] = self.rewriter.stats()
+        stats['similarity_threshold'] = self.similarity_threshold
+        return stats
+    
+    def _lookup_cached_answer(self, query: str, similar_docs: List[Dict[str, Any]]) -> Optional[str]:
+        """응답 캐시에서 같은 컨텍스트의 유사한 질문에 대한 응답 조회"""
+        if self.answer_cache is None:
+            return None
+        query_embedding = self.embedder.embed_query(query)
+        return self.answer_cache.lookup(query_embedding, [doc['id'] for doc in similar_docs])
+    
+    def _store_answer(self, query: str, similar_docs: List[Dict[str, Any]], response: str) -> None:
+        """생성된 응답을 응답 캐시에 저장"""
+        if self.answer_cache is None:
+            return
+        try:
+            query_embedding = self.embedder.embed_query(query)
+            self.answer_cache.store(query_embedding, [doc['id'] for doc in similar_docs], response)
+        except Exception as e:
+            logger.error(f"Error storing cached answer: {e}")
+    
+    def _build_context(self, similar_docs: List[Dict[str, Any]]) -> str:
+        """검색된 문서들을 토큰 예산 안에서 컨텍스트로 구성
 
+        겹치거나 이어지는 청크는 합치고, 관련도가 높은 문서부터 CONTEXT_MAX_TOKENS까지 채움
+        """
+        context, used_docs = self.packer.pack(similar_docs)
+        if len(used_docs) < len(similar_docs):
+            logger.debug(f"Packed {len(similar_docs)} chunks into {len(used_docs)} context passages")
+        return context
+    
+    def _build_messages(self, query: str, context: str, history: List[Dict[str, str]] = None) -> List[Dict[str, str]]:
+        """교육 서비스 상담원 프롬프트와 대화 히스토리로 메시지 목록 구성"""
+        history_instruction = ""
+        if history is not None:
+            history_instruction = "이전 대화 내용도 참고하여 일관성 있고 친절한 답변을 제공하세요.\n"
+        
+        system_prompt = f"""당신은 교육 서비스 회사의 공손하고 전문적인 상담원입니다. 
+다음 교육 과정 정보를 기반으로 고객의 질문에 답변해주세요.
+{history_instruction}
 **응답 스타일:**
 - 공손하고 친절한 톤으로 답변
 - "~입니다", "~하시면 됩니다" 등의 존댓말 사용
@@ -68,37 +274,63 @@ class ChatbotSearch:
 
 **답변:**"""
 
-            response = openai.ChatCompletion.create(
-                model=MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": query}
-                ],
-                max_tokens=MAX_TOKENS,
-                temperature=TEMPERATURE
-            )
-            
-            return response.choices[0].message.content.strip()
+        messages = [{"role": "system", "content": system_prompt}]
+        question = {"role": "user", "content": query}
+        
+        # 대화 히스토리 추가 (응답 토큰을 남기고 컨텍스트 창에 들어가는 만큼 최근 메시지부터)
+        if history:
+            available = CONTEXT_WINDOW_TOKENS - MAX_TOKENS - count_message_tokens(messages + [question])
+            for msg in self.packer.truncate_history(history, max(available, 0)):
+                messages.append({"role": msg["role"], "content": msg["content"]})
+        
+        # 현재 질문 추가
+        messages.append(question)
+        
+        prompt_tokens = count_message_tokens(messages)
+        self._count('prompt_tokens_total', prompt_tokens)
+        with self._stats_lock:
+            self._stats['prompt_tokens_last'] = prompt_tokens
+        logger.info(f"Prompt tokens: {prompt_tokens} ({len(messages) - 2} history messages)")
+        return messages
+    
+    def _generate_response(self, query: str, context: str) -> str:
+        """LLM 백엔드를 사용하여 교육 서비스 특화 응답 생성"""
+        try:
+            self._count('llm_calls')
+            messages = self._build_messages(query, context)
+            with self._timed('generation'):
+                return self.llm.generate(messages)
             
         except Exception as e:
             logger.error(f"Error generating response: {e}")
-            return "죄송합니다. 응답 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+            return GENERATION_ERROR_MESSAGE
     
-    def get_relevant_documents(self, query: str, top_k: int = TOP_K_RESULTS) -> List[Dict[str, Any]]:
+    def get_relevant_documents(self, query: str, top_k: int = TOP_K_RESULTS,
+                               filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """쿼리와 관련된 문서들 반환 (디버깅용)"""
-        return self.embedder.search_similar(query, top_k)
+        return self.embedder.search_similar(query, top_k, filters=filters)
+    
+    def _retrieve_with_history(self, query: str, history: List[Dict[str, str]],
+                               filters: Optional[Dict[str, Any]], session_id: Optional[str]) -> List[Dict[str, Any]]:
+        """후속 질문을 히스토리를 반영한 검색어로 다시 쓴 뒤 검색 (응답 생성에는 원래 질문 사용)"""
+        if self.rewriter.mode == 'off':
+            return self._retrieve(query, TOP_K_RESULTS, filters)
+        with self._timed('rewrite'):
+            search_query = self.rewriter.rewrite(query, history, session_id)
+        return self._retrieve(search_query, HISTORY_TOP_K_RESULTS, filters)
     
-    def chat_with_history(self, query: str, conversation_history: List[Dict[str, str]] = None) -> str:
-        """대화 히스토리를 고려한 채팅"""
+    def chat_with_history(self, query: str, conversation_history: List[Dict[str, str]] = None,
+                          filters: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None) -> str:
+        """대화 히스토리를 고려한 채팅 (session_id는 질문 재작성 결과 캐시에 사용)"""
         if conversation_history is None:
             conversation_history = []
         
         try:
             # 유사한 문서 검색
-            similar_docs = self.embedder.search_similar(query, TOP_K_RESULTS)
+            similar_docs = self._retrieve_with_history(query, conversation_history, filters, session_id)
             
             if not similar_docs:
-                return "죄송합니다. 관련된 교육 과정 정보를 찾을 수 없습니다. 다른 질문을 해주시거나 상담원에게 문의해주세요."
+                return NO_RESULTS_MESSAGE
             
             # 컨텍스트 구성
             context = self._build_context(similar_docs)
@@ -110,47 +342,147 @@ class ChatbotSearch:
             
         except Exception as e:
             logger.error(f"Error in chat_with_history: {e}")
-            return "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+            return ERROR_MESSAGE
     
     def _generate_response_with_history(self, query: str, context: str, history: List[Dict[str, str]]) -> str:
         """대화 히스토리를 고려한 교육 서비스 특화 응답 생성"""
         try:
-            system_prompt = f"""당신은 교육 서비스 회사의 공손하고 전문적인 상담원입니다. 
-다음 교육 과정 정보를 기반으로 고객의 질문에 답변해주세요.
-이전 대화 내용도 참고하여 일관성 있고 친절한 답변을 제공하세요.
-
-**응답 스타일:**
-- 공손하고 친절한 톤으로 답변
-- "~입니다", "~하시면 됩니다" 등의 존댓말 사용
-- 교육 과정 정보가 없으면 "해당 정보는 현재 제공되지 않습니다"라고 답변
-- 가능하면 구체적인 과정명, 커리큘럼, 수강료, 기간 등을 포함
-- 추가 문의사항이 있으면 언제든 연락주시라고 안내
-
-**교육 과정 정보:**
-{context}
-
-**고객 질문:** {query}
-
-**답변:**"""
-
-            messages = [{"role": "system", "content": system_prompt}]
+            self._count('llm_calls')
+            messages = self._build_messages(query, context, history)
+            with self._timed('generation'):
+                return self.llm.generate(messages)
             
-            # 대화 히스토리 추가
-            for msg in history:
-                messages.append({"role": msg["role"], "content": msg["content"]})
+        except Exception as e:
+            logger.error(f"Error generating response with history: {e}")
+            return GENERATION_ERROR_MESSAGE
+    
+    def stream_chat_with_history(self, query: str, conversation_history: List[Dict[str, str]] = None,
+                                 filters: Optional[Dict[str, Any]] = None,
+                                 session_id: Optional[str] = None) -> Iterator[str]:
+        """대화 히스토리를 고려한 채팅 (응답을 토큰 단위로 스트리밍, 토큰 전송 중 실패하면 예외 전달)"""
+        if conversation_history is None:
+            conversation_history = []
+        
+        try:
+            similar_docs = self._retrieve_with_history(query, conversation_history, filters, session_id)
+        except Exception as e:
+            logger.error(f"Error in stream_chat_with_history: {e}")
+            yield ERROR_MESSAGE
+            return
+        
+        if not similar_docs:
+            yield NO_RESULTS_MESSAGE
+            return
+        
+        context = self._build_context(similar_docs)
+        yield from self._stream_or_error(self._build_messages(query, context, conversation_history))
+    
+    def _stream_or_error(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """토큰을 스트리밍하고, 첫 토큰 전에 실패하면 오류 안내 문구 반환
+        
+        일부 토큰을 보낸 뒤 실패하면 잘린 응답이 완성된 응답으로 저장되지 않도록 예외를 다시 발생시킨다.
+        """
+        started = False
+        self._count('llm_calls')
+        start = time.perf_counter()
+        try:
+            for token in self.llm.stream(messages):
+                started = True
+                yield token
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            if started:
+                raise
+            yield GENERATION_ERROR_MESSAGE
+        finally:
+            self._record_time('generation', time.perf_counter() - start)
+    
+    def run_in_executor(self, func: Callable, *args) -> "asyncio.Future":
+        """이벤트 루프를 막지 않도록 동기 함수를 스레드 풀에서 실행"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=RETRIEVAL_EXECUTOR_WORKERS,
+                                                thread_name_prefix='retrieval')
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, functools.partial(func, *args))
+    
+    async def asearch_and_respond(self, query: str, top_k: int = TOP_K_RESULTS,
+                                  filters: Optional[Dict[str, Any]] = None) -> str:
+        """search_and_respond의 비동기 버전 (검색은 스레드 풀, LLM 호출은 비동기 클라이언트)"""
+        try:
+            similar_docs = await self.run_in_executor(self._retrieve, query, top_k, filters)
+            
+            if not similar_docs:
+                return NO_RESULTS_MESSAGE
             
-            # 현재 질문 추가
-            messages.append({"role": "user", "content": query})
+            cached_response = await self.run_in_executor(self._lookup_cached_answer, query, similar_docs)
+            if cached_response is not None:
+                return cached_response
             
-            response = openai.ChatCompletion.create(
-                model=MODEL_NAME,
-                messages=messages,
-                max_tokens=MAX_TOKENS,
-                temperature=TEMPERATURE
-            )
+            context = self._build_context(similar_docs)
+            response = await self._agenerate_response(self._build_messages(query, context))
+            
+            if response != GENERATION_ERROR_MESSAGE:
+                await self.run_in_executor(self._store_answer, query, similar_docs, response)
             
-            return response.choices[0].message.content.strip()
+            return response
             
         except Exception as e:
-            logger.error(f"Error generating response with history: {e}")
-            return "죄송합니다. 응답 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요." 
\ No newline at end of file
+            logger.error(f"Error in asearch_and_respond: {e}")
+            return ERROR_MESSAGE
+    
+    async def astream_search_and_respond(self, query: str, top_k: int = TOP_K_RESULTS,
+                                         filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """stream_search_and_respond의 비동기 버전 (토큰 전송 중 실패하면 예외 전달)"""
+        try:
+            similar_docs = await self.run_in_executor(self._retrieve, query, top_k, filters)
+            
+            if not similar_docs:
+                yield NO_RESULTS_MESSAGE
+                return
+            
+            cached_response = await self.run_in_executor(self._lookup_cached_answer, query, similar_docs)
+            if cached_response is not None:
+                yield cached_response
+                return
+            
+            context = self._build_context(similar_docs)
+        except Exception as e:
+            logger.error(f"Error in astream_search_and_respond: {e}")
+            yield ERROR_MESSAGE
+            return
+        
+        tokens = []
+        started = False
+        self._count('llm_calls')
+        start = time.perf_counter()
+        try:
+            async for token in self.llm.astream(self._build_messages(query, context)):
+                started = True
+                tokens.append(token)
+                yield token
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            if started:
+                raise
+            yield GENERATION_ERROR_MESSAGE
+            return
+        finally:
+            self._record_time('generation', time.perf_counter() - start)
+        
+        response = "".join(tokens).strip()
+        if response:
+            await self.run_in_executor(self._store_answer, query, similar_docs, response)
+    
+    async def _agenerate_response(self, messages: List[Dict[str, str]]) -> str:
+        """LLM 백엔드의 비동기 API로 응답 생성"""
+        try:
+            self._count('llm_calls')
+            start = time.perf_counter()
+            try:
+                return await self.llm.agenerate(messages)
+            finally:
+                self._record_time('generation', time.perf_counter() - start)
+            
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return GENERATION_ERROR_MESSAGE
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+import logging
+from typing import List, Dict, Any, Optional
+
+from .config import (
+    SESSION_STORE_BACKEND, SESSION_DB_PATH, SESSION_MAX_SESSIONS, SESSION_TTL, SESSION_HISTORY_MAX_TOKENS
+)
+from .cache import TTLCache
+from .tokens import message_tokens, truncate_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 역할 이름 대신 한 글자 코드로 저장
+_ROLE_CODES = {'user': 'u', 'assistant': 'a', 'system': 's'}
+_ROLE_NAMES = {code: role for role, code in _ROLE_CODES.items()}
+# SQLite 저장소에서 만료/초과 세션을 정리하는 간격 (쓰기 횟수)
+_PRUNE_EVERY_WRITES = 500
+
+
+def encode_history(entries: List[list]) -> bytes:
+    """[역할 코드, 내용, 토큰 수] 목록을 압축된 바이트로 변환"""
+    return zlib.compress(json.dumps(entries, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_history(blob: Optional[bytes]) -> List[list]:
+    if not blob:
+        return []
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def trim_history(entries: List[list], new_messages: List[Dict[str, str]], max_tokens: int) -> List[list]:
+    """새 메시지를 추가하고 토큰 수가 max_tokens 이하가 되도록 오래된 메시지부터 제거"""
+    entries = entries + [
+        [_ROLE_CODES.get(message['role'], message['role']), message['content'], message_tokens(message)]
+        for message in new_messages
+    ]
+    total = sum(entry[2] for entry in entries)
+    while len(entries) > 1 and total > max_tokens:
+        total -= entries.pop(0)[2]
+    if entries and total > max_tokens:
+        # 마지막 메시지 하나가 예산을 넘으면 잘라서 저장
+        overhead = message_tokens({'content': ''})
+        content = truncate_tokens(entries[0][1], max(max_tokens - overhead, 0))
+        entries[0] = [entries[0][0], content, message_tokens({'content': content})]
+    return entries
+
+
+def _to_messages(entries: List[list]) -> List[Dict[str, str]]:
+    return [{'role': _ROLE_NAMES.get(code, code), 'content': content} for code, content, _ in entries]
+
+
+class MemorySessionStore:
+    """프로세스 메모리에 세션별 대화 히스토리를 저장 (LRU + TTL)
+    
+    히스토리는 토큰 수 상한으로 자른 뒤 압축해 저장하므로, 세션 수가 max_sessions에
+    이르면 메모리 사용량이 더 늘지 않는다.
+    """
+    
+    def __init__(self, max_sessions: int = SESSION_MAX_SESSIONS, ttl: float = SESSION_TTL,
+                 max_tokens: int = SESSION_HISTORY_MAX_TOKENS):
+        self.max_tokens = max_tokens
+        self._sessions = TTLCache(max_sessions, ttl)
+        # 같은 세션의 동시 요청이 서로의 메시지를 덮어쓰지 않도록 읽기-수정-쓰기를 직렬화
+        self._lock = threading.Lock()
+    
+    def get(self, session_id: str) -> List[Dict[str, str]]:
+        """세션의 대화 히스토리 (오래된 메시지부터)"""
+        return _to_messages(decode_history(self._sessions.get(session_id)))
+    
+    def append(self, session_id: str, messages: List[Dict[str, str]]) -> None:
+        """세션 히스토리에 메시지 추가"""
+        with self._lock:
+            entries = decode_history(self._sessions.get(session_id))
+            self._sessions.set(session_id, encode_history(trim_history(entries, messages, self.max_tokens)))
+    
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.delete(session_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self._sessions.stats()
+        return {'backend': 'memory', 'sessions': stats['size'], 'max_sessions': stats['max_size']}
+
+
+class SQLiteSessionStore:
+    """SQLite 파일에 세션별 대화 히스토리를 저장 (재시작 후에도 유지되고 워커 프로세스 간 공유)
+    
+    만료(TTL)와 최대 세션 수는 일정 횟수의 쓰기마다 한 번씩 정리한다.
+    """
+    
+    def __init__(self, db_path: str = SESSION_DB_PATH, max_sessions: int = SESSION_MAX_SESSIONS,
+                 ttl: float = SESSION_TTL, max_tokens: int = SESSION_HISTORY_MAX_TOKENS):
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._writes = 0
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 쓰기 트랜잭션은 직접 시작 (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                history BLOB,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at);
+        """)
+    
+    def get(self, session_id: str) -> List[Dict[str, str]]:
+        """세션의 대화 히스토리 (오래된 메시지부터)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT history FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.ttl)
+            ).fetchone()
+        return _to_messages(decode_history(row[0] if row else None))
+    
+    def append(self, session_id: str, messages: List[Dict[str, str]]) -> None:
+        """세션 히스토리에 메시지 추가 (다른 프로세스의 쓰기와 겹치지 않도록 잠금 후 갱신)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT history FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                    (session_id, now - self.ttl)
+                ).fetchone()
+                entries = trim_history(decode_history(row[0] if row else None), messages, self.max_tokens)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, history, updated_at) VALUES (?, ?, ?)",
+                    (session_id, encode_history(entries), now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY_WRITES == 0:
+                self._prune(now)
+    
+    def _prune(self, now: float) -> None:
+        """만료된 세션과 최대 수를 넘는 오래된 세션 삭제"""
+        self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM sessions WHERE session_id IN ("
+            "SELECT session_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,)
+        )
+    
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {'backend': 'sqlite', 'sessions': count, 'max_sessions': self.max_sessions}
+
+
+def create_session_store(name: str = SESSION_STORE_BACKEND):
+    """설정된 이름으로 세션 저장소 생성 ('memory' 또는 'sqlite')"""
+    if name == 'memory':
+        return MemorySessionStore()
+    if name == 'sqlite':
+        logger.info(f"Using SQLite session store at {SESSION_DB_PATH}")
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown session store: {name}")
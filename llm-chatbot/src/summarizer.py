@@ -0,0 +1,145 @@
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Optional
+
+from .config import (
+    HISTORY_SUMMARY_ENABLED, HISTORY_SUMMARY_TRIGGER_TOKENS, HISTORY_RECENT_TOKENS,
+    HISTORY_SUMMARY_MAX_TOKENS, HISTORY_MAX_TOKENS
+)
+from .llm import LLMBackend
+from .tokens import message_tokens, truncate_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "이전 대화 요약: "
+_ROLE_LABELS = {'user': '고객', 'assistant': '상담원'}
+
+
+class ConversationSummarizer:
+    """오래된 대화를 요약으로 접어 히스토리 토큰 수를 일정하게 유지하는 대화 메모리
+    
+    그대로 보관 중인 메시지가 trigger_tokens를 넘으면 최근 recent_tokens 분량만 남기고
+    앞부분을 이전 요약과 함께 LLM으로 다시 요약한다. 요약은 백그라운드 워커에서 실행되므로
+    응답 경로를 막지 않으며, 요약이 끝나기 전에는 모든 메시지를 그대로 반환한다.
+    enabled가 False이면 요약하지 않고 max_tokens를 넘는 오래된 메시지를 버린다.
+    """
+    
+    def __init__(self, llm: LLMBackend, enabled: bool = HISTORY_SUMMARY_ENABLED,
+                 trigger_tokens: int = HISTORY_SUMMARY_TRIGGER_TOKENS,
+                 recent_tokens: int = HISTORY_RECENT_TOKENS,
+                 summary_max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS,
+                 max_tokens: int = HISTORY_MAX_TOKENS,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.llm = llm
+        self.enabled = enabled
+        self.trigger_tokens = trigger_tokens
+        self.recent_tokens = recent_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.max_tokens = max_tokens
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+        self._lock = threading.Lock()
+        self._messages: List[Dict[str, str]] = []
+        self._tokens: List[int] = []
+        self._summary = ""
+        self._pending: Optional[Future] = None
+        self._stats = {'summaries': 0, 'summary_failures': 0, 'summary_ms_total': 0.0, 'dropped_messages': 0}
+    
+    def history(self) -> List[Dict[str, str]]:
+        """프롬프트에 넣을 히스토리 (요약 메시지 + 최근 메시지)"""
+        with self._lock:
+            messages = list(self._messages)
+            if self._summary:
+                messages.insert(0, {'role': 'system', 'content': SUMMARY_PREFIX + self._summary})
+            return messages
+    
+    def add(self, messages: List[Dict[str, str]]) -> None:
+        """대화 메시지를 추가하고 필요하면 백그라운드 요약 시작"""
+        with self._lock:
+            for message in messages:
+                self._messages.append({'role': message['role'], 'content': message['content']})
+                self._tokens.append(message_tokens(message))
+            total = sum(self._tokens)
+            
+            if not self.enabled:
+                self._drop_oldest()
+                return
+            
+            if total <= self.trigger_tokens or (self._pending is not None and not self._pending.done()):
+                return
+            # 최근 recent_tokens 분량을 제외한 앞부분을 요약 대상으로 함
+            fold_count, kept = len(self._messages), 0
+            while fold_count > 0 and kept + self._tokens[fold_count - 1] <= self.recent_tokens:
+                fold_count -= 1
+                kept += self._tokens[fold_count]
+            if fold_count == 0:
+                return
+            to_fold = self._messages[:fold_count]
+            self._pending = self._executor.submit(self._fold, self._summary, to_fold, fold_count)
+    
+    def _drop_oldest(self) -> None:
+        """max_tokens를 넘는 오래된 메시지 제거 (잠금을 가진 상태에서 호출)"""
+        total = sum(self._tokens)
+        while len(self._messages) > 1 and total > self.max_tokens:
+            self._messages.pop(0)
+            total -= self._tokens.pop(0)
+            self._stats['dropped_messages'] += 1
+    
+    def _fold(self, previous_summary: str, messages: List[Dict[str, str]], fold_count: int) -> None:
+        """이전 요약과 오래된 메시지를 새 요약으로 합침 (백그라운드 워커에서 실행)"""
+        start = time.perf_counter()
+        try:
+            summary = self.llm.generate(self._summary_messages(previous_summary, messages))
+            summary = truncate_tokens(summary.strip(), self.summary_max_tokens)
+        except Exception as e:
+            # 실패하면 다음 턴에 다시 시도하고, 그동안 히스토리가 max_tokens를 넘으면 오래된 메시지를 버림
+            logger.error(f"Error summarizing conversation: {e}")
+            with self._lock:
+                self._stats['summary_failures'] += 1
+                self._drop_oldest()
+            return
+        
+        with self._lock:
+            # 요약하는 동안 추가된 메시지는 fold_count 뒤에 있으므로 앞부분만 제거
+            self._summary = summary
+            del self._messages[:fold_count]
+            del self._tokens[:fold_count]
+            self._stats['summaries'] += 1
+            self._stats['summary_ms_total'] += (time.perf_counter() - start) * 1000
+        logger.info(f"Folded {fold_count} messages into conversation summary")
+    
+    def _summary_messages(self, previous_summary: str, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        transcript = "\n".join(
+            f"{_ROLE_LABELS.get(message['role'], message['role'])}: {message['content']}"
+            for message in messages
+        )
+        instruction = (
+            "다음은 교육 서비스 상담 대화입니다. 이전 요약과 새 대화 내용을 합쳐 하나의 요약으로 작성하세요.\n"
+            "고객이 관심을 보인 과정명, 고객의 조건(일정, 예산, 수준 등), 이미 안내한 정보(수강료, 기간 등)를 "
+            f"빠짐없이 포함하고 {self.summary_max_tokens}토큰 이내로 간결하게 작성하세요."
+        )
+        content = f"**이전 요약:**\n{previous_summary or '(없음)'}\n\n**새 대화:**\n{transcript}"
+        return [{'role': 'system', 'content': instruction}, {'role': 'user', 'content': content}]
+    
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """진행 중인 요약이 끝날 때까지 대기"""
+        pending = self._pending
+        if pending is not None:
+            pending.result(timeout)
+    
+    def clear(self) -> None:
+        self.wait()
+        with self._lock:
+            self._messages.clear()
+            self._tokens.clear()
+            self._summary = ""
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, history_tokens=sum(self._tokens), history_messages=len(self._messages),
+                         summary_chars=len(self._summary))
+        if stats['summaries']:
+            stats['summary_ms_avg'] = stats['summary_ms_total'] / stats['summaries']
+        return stats
@@ -0,0 +1,187 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import logging
+from typing import List, Dict, Any, Optional
+
+from .config import TABLE_LOOKUP_MAX_ROWS, TABLE_VALUE_MAX_CHARS
+from .cache import normalize_query
+from .text import strip_particle
+from .vector_store import where_to_sql
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 질문에서 셀 값 후보로 만들 연속 단어 수
+_MAX_NGRAM_WORDS = 4
+# 질문이 매우 길어도 SQLite 바인딩 변수 개수 제한을 넘지 않도록 앞부분 단어만 사용
+_MAX_QUERY_WORDS = 48
+_PUNCTUATION = "?!.,~:;\"'()[]"
+
+
+def _normalize_value(value: str) -> str:
+    return normalize_query(value).strip(_PUNCTUATION)
+
+
+def value_candidates(query: str, max_chars: int = TABLE_VALUE_MAX_CHARS) -> List[str]:
+    """질문에서 셀 값과 비교할 후보 문자열 (연속 단어 조합, 마지막 단어의 조사를 뗀 형태 포함)"""
+    words = [word.strip(_PUNCTUATION) for word in normalize_query(query).split()][:_MAX_QUERY_WORDS]
+    words = [word for word in words if word]
+    candidates = set()
+    for start in range(len(words)):
+        for end in range(start + 1, min(start + _MAX_NGRAM_WORDS, len(words)) + 1):
+            phrase = words[start:end]
+            for last in {phrase[-1], strip_particle(phrase[-1])}:
+                candidate = " ".join(phrase[:-1] + [last])
+                if 2 <= len(candidate) <= max_chars:
+                    candidates.add(candidate)
+    return sorted(candidates)
+
+
+class TableStore:
+    """Excel/CSV 행을 셀 값으로 바로 찾는 SQLite 색인
+    
+    행마다 "열 이름: 값" 레코드와 메타데이터를 저장하고, max_value_chars 이하의 셀 값은
+    정규화해 (값, 열 이름, 행) 색인에 넣는다. lookup()은 질문 속 단어 조합과 정확히 같은
+    셀 값을 가진 행 중에서, 질문이 그 행의 다른 열 이름(수강료, 일정 등)도 언급한 경우에만
+    행을 반환한다. 이런 질문은 벡터 검색 없이 해당 행만으로 답할 수 있다.
+    """
+    
+    def __init__(self, db_path: str, max_rows: int = TABLE_LOOKUP_MAX_ROWS,
+                 max_value_chars: int = TABLE_VALUE_MAX_CHARS):
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.max_value_chars = max_value_chars
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS table_rows (
+                id INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL UNIQUE,
+                file_path TEXT NOT NULL,
+                record TEXT NOT NULL,
+                columns TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS cells (
+                value TEXT NOT NULL,
+                column_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_table_rows_file ON table_rows(file_path);
+            CREATE INDEX IF NOT EXISTS idx_cells_value ON cells(value);
+            CREATE INDEX IF NOT EXISTS idx_cells_row ON cells(row_id);
+        """)
+        self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM table_rows").fetchone()[0]
+    
+    def add(self, file_path: str, metadata: Dict[str, Any], rows: List[tuple]) -> None:
+        """표의 행 저장 (rows는 (행 번호, 레코드, [(열 이름, 값)]) 목록)"""
+        with self._lock:
+            for index, record, cells in rows:
+                row_metadata = dict(metadata, row_start=index, row_end=index + 1)
+                doc_id = "table:" + hashlib.sha1(
+                    f"{file_path}\x00{metadata.get('sheet', '')}\x00{index}\x00{record}".encode('utf-8')
+                ).hexdigest()
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO table_rows (doc_id, file_path, record, columns, metadata) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (doc_id, file_path, record, json.dumps([name for name, _ in cells], ensure_ascii=False),
+                     json.dumps(row_metadata, ensure_ascii=False))
+                )
+                if not cursor.rowcount:
+                    # 이미 저장된 행
+                    continue
+                row_id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO cells (value, column_name, row_id) VALUES (?, ?, ?)",
+                    [(_normalize_value(value), name, row_id) for name, value in cells
+                     if len(value) <= self.max_value_chars]
+                )
+            self._conn.commit()
+    
+    def remove(self, file_path: str) -> List[str]:
+        """파일의 모든 행을 삭제하고 삭제된 행 ID 반환 (응답 캐시 무효화용)"""
+        with self._lock:
+            doc_ids = [row[0] for row in self._conn.execute(
+                "SELECT doc_id FROM table_rows WHERE file_path = ?", (file_path,))]
+            if doc_ids:
+                self._conn.execute(
+                    "DELETE FROM cells WHERE row_id IN (SELECT id FROM table_rows WHERE file_path = ?)",
+                    (file_path,)
+                )
+                self._conn.execute("DELETE FROM table_rows WHERE file_path = ?", (file_path,))
+                self._conn.commit()
+            return doc_ids
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cells")
+            self._conn.execute("DELETE FROM table_rows")
+            self._conn.commit()
+    
+    def lookup(self, query: str, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """셀 값과 열 이름이 질문에 함께 나오는 행을 검색 결과 형식으로 반환 (없으면 빈 목록)
+        
+        가장 많은 셀 값이 일치한 행이 max_rows개를 넘으면 질문이 모호한 것으로 보고 빈 목록을 반환한다.
+        """
+        candidates = value_candidates(query, self.max_value_chars)
+        if not candidates:
+            return []
+        where_sql, params = where_to_sql(where) if where else ('1', [])
+        placeholders = ', '.join('?' * len(candidates))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT r.doc_id, r.record, r.columns, r.metadata, "
+                f"GROUP_CONCAT(c.column_name, char(31)), COUNT(DISTINCT c.column_name) AS matched "
+                f"FROM cells c JOIN table_rows r ON r.id = c.row_id "
+                f"WHERE c.value IN ({placeholders}) AND {where_sql} "
+                f"GROUP BY r.id ORDER BY matched DESC, r.id LIMIT ?",
+                candidates + params + [self.max_rows + 1]
+            ).fetchall()
+        if not rows:
+            return []
+        best = [row for row in rows if row[5] == rows[0][5]]
+        if len(best) > self.max_rows:
+            return []
+        
+        normalized_query = normalize_query(query)
+        documents = []
+        for doc_id, record, columns, metadata, matched_columns, _ in best:
+            if not self._mentions_other_column(normalized_query, json.loads(columns),
+                                               set(matched_columns.split('\x1f'))):
+                continue
+            documents.append({
+                'id': doc_id,
+                'content': record,
+                'metadata': json.loads(metadata),
+                'distance': None,
+                'similarity': 1.0,
+                'table_match': True
+            })
+        return documents
+    
+    @staticmethod
+    def _mentions_other_column(normalized_query: str, columns: List[str], matched: set) -> bool:
+        """질문이 값이 일치한 열 외의 열 이름을 언급하는지 (예: 과정명이 일치하고 '수강료'를 물음)"""
+        for column in columns:
+            name = normalize_query(column)
+            if column not in matched and len(name) >= 2 and name in normalized_query:
+                return True
+        return False
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM table_rows").fetchone()[0]
+            cells = self._conn.execute("SELECT COUNT(*) FROM cells").fetchone()[0]
+        return {'rows': rows, 'indexed_cells': cells}
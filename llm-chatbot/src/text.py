@@ -0,0 +1,15 @@
+from typing import List
+
+# 단어 끝에서 떼어낼 조사/어미 (긴 것부터 비교)
+_SUFFIXES: List[str] = sorted([
+    '에서는', '으로는', '인가요', '이에요', '이요', '예요', '은요', '는요', '까지', '부터', '에서', '으로',
+    '에게', '한테', '하고', '이랑', '랑', '은', '는', '이', '가', '을', '를', '의', '에', '로', '와', '과', '도', '만', '요'
+], key=len, reverse=True)
+
+
+def strip_particle(word: str) -> str:
+    """단어 끝의 조사/어미 제거"""
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
@@ -0,0 +1,185 @@
+import logging
+import functools
+from typing import List, Dict, Any, Optional, Tuple
+
+import tiktoken
+
+from .config import MODEL_NAME, CONTEXT_MAX_TOKENS, HISTORY_MAX_TOKENS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Chat Completions 메시지 하나에 붙는 형식 토큰 수와 응답 시작 토큰 수
+_TOKENS_PER_MESSAGE = 3
+_REPLY_PRIMING_TOKENS = 3
+# 남은 예산이 이보다 적으면 문서를 잘라서 넣지 않음
+_MIN_TRUNCATED_TOKENS = 64
+# 같은 파일의 청크 사이 간격이 이 이하이면 이어 붙임 (공백/줄바꿈)
+_ADJACENT_GAP_CHARS = 2
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model: str = MODEL_NAME) -> Optional["tiktoken.Encoding"]:
+    """모델의 토크나이저 (인코딩 파일을 받을 수 없으면 None)"""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer for {model}, using approximate token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = MODEL_NAME) -> int:
+    """텍스트의 토큰 수"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        # 한글은 대략 글자당 1토큰, 영문은 4글자당 1토큰
+        return sum(1 if ord(char) > 127 else 0.25 for char in text).__ceil__()
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = MODEL_NAME) -> str:
+    """텍스트를 앞에서부터 max_tokens 토큰까지만 남김"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        while text and count_tokens(text, model) > max_tokens:
+            text = text[:int(len(text) * 0.9)]
+        return text
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    # 잘린 위치의 불완전한 바이트는 버림
+    return encoding.decode(tokens[:max_tokens], errors='ignore')
+
+
+def message_tokens(message: Dict[str, str], model: str = MODEL_NAME) -> int:
+    """대화 메시지 하나가 프롬프트에서 차지하는 토큰 수 (형식 토큰 포함)"""
+    return _TOKENS_PER_MESSAGE + count_tokens(message['content'], model)
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = MODEL_NAME) -> int:
+    """Chat Completions 요청의 프롬프트 토큰 수"""
+    total = _REPLY_PRIMING_TOKENS
+    for message in messages:
+        total += _TOKENS_PER_MESSAGE
+        for value in message.values():
+            total += count_tokens(value, model)
+    return total
+
+
+class ContextPacker:
+    """검색된 청크를 토큰 예산 안에서 프롬프트 컨텍스트로 구성
+    
+    같은 파일에서 겹치거나 이어지는 청크는 문서 내 위치(start_char/end_char)로
+    하나로 합쳐 중복을 없애고, 관련도 순서대로 예산이 찰 때까지 채운다.
+    대화 히스토리는 오래된 메시지부터 잘라 예산에 맞추되, 앞의 대화 요약은 남긴다.
+    """
+    
+    def __init__(self, model: str = MODEL_NAME,
+                 context_max_tokens: int = CONTEXT_MAX_TOKENS,
+                 history_max_tokens: int = HISTORY_MAX_TOKENS):
+        self.model = model
+        self.context_max_tokens = context_max_tokens
+        self.history_max_tokens = history_max_tokens
+    
+    def merge_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """겹치거나 이어지는 청크를 합치고 중복 제거 (관련도 순서 유지)
+        
+        합쳐진 문서의 관련도 순위는 포함된 청크 중 가장 높은 순위를 따른다.
+        """
+        groups: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        passages = []
+        seen_contents = set()
+        for rank, doc in enumerate(documents):
+            metadata = doc.get('metadata') or {}
+            if 'start_char' in metadata and 'end_char' in metadata:
+                groups.setdefault(metadata.get('file_path', ''), []).append((rank, doc))
+            elif doc['content'] not in seen_contents:
+                # 위치 정보가 없는 청크 (이전 버전에서 인덱싱)는 내용이 같은 경우만 제거
+                seen_contents.add(doc['content'])
+                passages.append((rank, doc))
+        
+        for file_docs in groups.values():
+            file_docs.sort(key=lambda item: item[1]['metadata']['start_char'])
+            rank, doc = file_docs[0]
+            current = dict(doc, metadata=dict(doc['metadata']))
+            current_rank = rank
+            for rank, doc in file_docs[1:]:
+                start, end = doc['metadata']['start_char'], doc['metadata']['end_char']
+                current_end = current['metadata']['end_char']
+                if start > current_end + _ADJACENT_GAP_CHARS:
+                    passages.append((current_rank, current))
+                    current = dict(doc, metadata=dict(doc['metadata']))
+                    current_rank = rank
+                    continue
+                if end > current_end:
+                    # 겹치는 부분을 제외한 뒷부분만 이어 붙임
+                    overlap = current_end - start
+                    tail = doc['content'][overlap:] if overlap >= 0 else doc['content']
+                    separator = "" if overlap >= 0 else "\n"
+                    current['content'] = current['content'] + separator + tail
+                    current['metadata']['end_char'] = end
+                current_rank = min(current_rank, rank)
+            passages.append((current_rank, current))
+        
+        passages.sort(key=lambda item: item[0])
+        return [doc for _, doc in passages]
+    
+    def pack(self, documents: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """예산 안에 들어가는 컨텍스트 문자열과 사용된 문서 목록 반환"""
+        context_parts = []
+        used = []
+        remaining = self.context_max_tokens
+        for doc in self.merge_documents(documents):
+            header = f"[교육 자료 {len(used) + 1} - {doc['metadata'].get('file_path', 'Unknown')}]\n"
+            content = doc['content']
+            tokens = count_tokens(header + content + "\n", self.model)
+            if tokens > remaining:
+                # 가장 관련도가 높은 문서는 잘라서라도 넣고, 나머지는 남은 예산이 충분할 때만 넣음
+                available = remaining - count_tokens(header + "\n", self.model)
+                if available < _MIN_TRUNCATED_TOKENS and used:
+                    break
+                content = truncate_tokens(content, max(available, 0), self.model)
+                if not content:
+                    break
+                tokens = remaining
+            context_parts.append(f"{header}{content}\n")
+            used.append(doc)
+            remaining -= tokens
+            if remaining <= 0:
+                break
+        return "\n".join(context_parts), used
+    
+    def truncate_history(self, history: List[Dict[str, str]],
+                         max_tokens: Optional[int] = None) -> List[Dict[str, str]]:
+        """최근 메시지부터 예산 안에 들어가는 만큼만 남김
+        
+        히스토리 앞의 system 메시지(ConversationSummarizer의 이전 대화 요약)는 오래된 메시지지만
+        먼저 예산을 배정해 항상 남기고, 예산보다 길면 잘라서 넣는다.
+        """
+        budget = self.history_max_tokens if max_tokens is None else min(max_tokens, self.history_max_tokens)
+        pinned = []
+        while len(pinned) < len(history) and history[len(pinned)]['role'] == 'system':
+            pinned.append(history[len(pinned)])
+        history = history[len(pinned):]
+        
+        for index, message in enumerate(pinned):
+            tokens = message_tokens(message, self.model)
+            if tokens > budget:
+                content = truncate_tokens(message['content'], max(budget - _TOKENS_PER_MESSAGE, 0), self.model)
+                pinned[index] = dict(message, content=content)
+                tokens = message_tokens(pinned[index], self.model)
+            budget -= tokens
+        pinned = [message for message in pinned if message['content']]
+        
+        kept = []
+        for message in reversed(history):
+            tokens = message_tokens(message, self.model)
+            if tokens > budget:
+                break
+            kept.append(message)
+            budget -= tokens
+        kept.reverse()
+        return pinned + kept
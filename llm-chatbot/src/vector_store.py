@@ -0,0 +1,562 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+import logging
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import (
+    VECTOR_STORE_DTYPE, VECTOR_STORE_BLOCK_ROWS, VECTOR_STORE_IVF_LISTS, VECTOR_STORE_IVF_NPROBE
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_DB_FILENAME = "store.sqlite3"
+_VECTORS_FILENAME = "vectors.bin"
+_SCALES_FILENAME = "scales.bin"
+_ALIVE_FILENAME = "alive.bin"
+_IVF_CENTROIDS_FILENAME = "ivf_centroids.npy"
+_IVF_OFFSETS_FILENAME = "ivf_offsets.npy"
+_IVF_ORDER_FILENAME = "ivf_order.bin"
+
+_INITIAL_CAPACITY = 1024
+# SQLite 한 쿼리에 넣는 파라미터 수
+_SQL_BATCH = 900
+# 삭제된 행 비율이 이를 넘으면 파일을 다시 써서 공간 회수
+_COMPACT_DEAD_RATIO = 0.3
+# IVF 생성 이후 추가된 행 비율이 이를 넘으면 IVF를 다시 생성
+_IVF_STALE_RATIO = 0.2
+# IVF 목록당 최소 학습 벡터 수 (이보다 적으면 IVF 없이 전체 검색)
+_IVF_MIN_ROWS_PER_LIST = 39
+_IVF_TRAIN_SAMPLE = 65536
+_IVF_ITERATIONS = 10
+
+_METADATA_KEY_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+_COMPARISON_OPERATORS = {'$eq': '=', '$ne': '!=', '$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}
+
+
+def where_to_sql(where: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Chroma where 조건을 SQLite 조건식으로 변환 ($and, $or, $in, $nin, 비교 연산자 지원)"""
+    clauses = []
+    params: List[Any] = []
+    for key, condition in where.items():
+        if key in ('$and', '$or'):
+            parts = [where_to_sql(sub) for sub in condition]
+            joiner = ' AND ' if key == '$and' else ' OR '
+            clauses.append('(' + joiner.join(sql for sql, _ in parts) + ')')
+            for _, sub_params in parts:
+                params.extend(sub_params)
+            continue
+        
+        if not _METADATA_KEY_RE.match(key):
+            raise ValueError(f"Invalid metadata key: {key}")
+        column = f"json_extract(metadata, '$.{key}')"
+        if not isinstance(condition, dict):
+            clauses.append(f"{column} = ?")
+            params.append(condition)
+            continue
+        
+        for operator, value in condition.items():
+            if operator in ('$in', '$nin'):
+                placeholders = ', '.join('?' * len(value))
+                negation = 'NOT ' if operator == '$nin' else ''
+                clauses.append(f"{column} {negation}IN ({placeholders})")
+                params.extend(value)
+            elif operator in _COMPARISON_OPERATORS:
+                clauses.append(f"{column} {_COMPARISON_OPERATORS[operator]} ?")
+                params.append(value)
+            else:
+                raise ValueError(f"Unsupported where operator: {operator}")
+    return ' AND '.join(clauses) or '1', params
+
+
+class MmapVectorStore:
+    """메모리 매핑 파일 기반 벡터 저장소 (Chroma 컬렉션과 같은 API의 일부를 제공)
+    
+    정규화된 벡터를 float16 또는 int8(행별 스케일)로 양자화하거나 float32 그대로 고정 크기
+    행 배열 파일에 저장하고, 문서/메타데이터는 SQLite에 저장한다. 벡터 파일은 np.memmap으로 열기 때문에
+    여러 워커 프로세스가 OS 페이지 캐시를 공유하며, 시작 시 전체를 읽어 들이지 않는다.
+    
+    검색은 NumPy 블록 행렬 곱으로 정확한 top-k를 구한다. ivf_lists가 0보다 크고 데이터가
+    충분하면 k-means로 만든 IVF 색인에서 가까운 nprobe개 목록만 검색한다 (IVF 생성 이후에
+    추가된 행은 항상 전체 검색 대상).
+    
+    다른 프로세스의 변경은 SQLite의 version 값으로 감지해 다음 조회 때 다시 매핑한다.
+    거리는 코사인 거리(1 - 코사인 유사도)만 지원한다.
+    """
+    
+    def __init__(self, directory: str, dtype: str = VECTOR_STORE_DTYPE,
+                 block_rows: int = VECTOR_STORE_BLOCK_ROWS,
+                 ivf_lists: int = VECTOR_STORE_IVF_LISTS,
+                 nprobe: int = VECTOR_STORE_IVF_NPROBE):
+        if dtype not in ('float32', 'float16', 'int8'):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.block_rows = block_rows
+        self.ivf_lists = ivf_lists
+        self.nprobe = nprobe
+        # Chroma 컬렉션과 같은 형식의 컬렉션 메타데이터
+        self.metadata = {'hnsw:space': 'cosine'}
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(directory, _DB_FILENAME), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chunks "
+                           "(idx INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE NOT NULL, document TEXT, metadata TEXT)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        
+        # 저장소를 처음 만들 때만 dtype을 기록하고, 이후에는 저장된 값을 사용
+        if self._read_settings().get('dtype') is None:
+            self._write_settings(dtype=dtype, dim=0, rows=0, capacity=0, ivf_rows=0, version=0)
+            self._conn.commit()
+        
+        self._version = None
+        self._writable = False
+        self._vectors = None
+        self._scales = None
+        self._alive = None
+        self._ivf = None
+        self._refresh()
+    
+    def _read_settings(self) -> Dict[str, Any]:
+        return {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM settings")}
+    
+    def _write_settings(self, **values) -> None:
+        self._conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                               [(key, json.dumps(value)) for key, value in values.items()])
+    
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+    
+    def _refresh(self) -> None:
+        """다른 프로세스(또는 압축)로 저장소가 바뀌었으면 파일을 다시 매핑"""
+        row = self._conn.execute("SELECT value FROM settings WHERE key = 'version'").fetchone()
+        version = json.loads(row[0]) if row else 0
+        if version == self._version:
+            return
+        
+        settings = self._read_settings()
+        self.dtype = settings['dtype']
+        self.dim = settings['dim']
+        self.rows = settings['rows']
+        self.capacity = settings['capacity']
+        self.ivf_rows = settings['ivf_rows']
+        self._map_files()
+        self._load_ivf()
+        self._version = version
+    
+    def _map_files(self) -> None:
+        self._vectors = self._scales = self._alive = None
+        if not self.capacity:
+            return
+        mode = 'r+' if self._writable else 'r'
+        self._vectors = np.memmap(self._path(_VECTORS_FILENAME), dtype=self.dtype, mode=mode,
+                                  shape=(self.capacity, self.dim))
+        if self.dtype == 'int8':
+            self._scales = np.memmap(self._path(_SCALES_FILENAME), dtype=np.float32, mode=mode,
+                                     shape=(self.capacity,))
+        self._alive = np.memmap(self._path(_ALIVE_FILENAME), dtype=np.uint8, mode=mode, shape=(self.capacity,))
+    
+    def _load_ivf(self) -> None:
+        self._ivf = None
+        if not self.ivf_rows:
+            return
+        try:
+            centroids = np.load(self._path(_IVF_CENTROIDS_FILENAME))
+            offsets = np.load(self._path(_IVF_OFFSETS_FILENAME))
+            order = np.memmap(self._path(_IVF_ORDER_FILENAME), dtype=np.int64, mode='r', shape=(int(offsets[-1]),))
+            self._ivf = (centroids, offsets, order)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load IVF index, using exact search: {e}")
+    
+    def _ensure_writable(self) -> None:
+        if not self._writable:
+            self._writable = True
+            self._map_files()
+    
+    def _commit(self, **settings) -> None:
+        """파일 변경을 디스크에 반영하고 설정과 version을 함께 커밋"""
+        for array in (self._vectors, self._scales, self._alive):
+            if array is not None:
+                array.flush()
+        self._version = (self._version or 0) + 1
+        settings.update(rows=self.rows, capacity=self.capacity, dim=self.dim,
+                        ivf_rows=self.ivf_rows, version=self._version)
+        self._write_settings(**settings)
+        self._conn.commit()
+    
+    def _grow(self, needed: int) -> None:
+        """행 수가 용량을 넘으면 파일 크기를 늘림 (기존 매핑을 가진 다른 프로세스는 다음 조회 때 다시 매핑)"""
+        if needed <= self.capacity:
+            return
+        capacity = max(_INITIAL_CAPACITY, self.capacity * 2, needed)
+        self._vectors = self._scales = self._alive = None
+        files = [(_VECTORS_FILENAME, np.dtype(self.dtype).itemsize * self.dim), (_ALIVE_FILENAME, 1)]
+        if self.dtype == 'int8':
+            files.append((_SCALES_FILENAME, 4))
+        for filename, row_bytes in files:
+            with open(self._path(filename), 'ab') as f:
+                f.truncate(capacity * row_bytes)
+        self.capacity = capacity
+        self._map_files()
+    
+    def _quantize(self, vectors: np.ndarray, idxs: np.ndarray) -> None:
+        if self.dtype == 'int8':
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._vectors[idxs] = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            self._scales[idxs] = scales
+        else:
+            self._vectors[idxs] = vectors.astype(self.dtype)
+    
+    def _dequantize(self, selector, snapshot: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        state = snapshot or self._snapshot()
+        vectors = np.asarray(state['vectors'][selector], dtype=np.float32)
+        if state['scales'] is not None:
+            vectors *= state['scales'][selector][:, None]
+        return vectors
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """검색 중 다른 스레드가 파일을 다시 매핑해도 일관되게 읽도록 현재 매핑을 묶음"""
+        return {'vectors': self._vectors, 'scales': self._scales, 'alive': self._alive,
+                'rows': self.rows, 'ivf': self._ivf, 'ivf_rows': self.ivf_rows}
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def _select(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None,
+                columns: str = "idx, chunk_id, document, metadata",
+                limit: Optional[int] = None, offset: Optional[int] = None) -> List[tuple]:
+        """ID 목록과 where 조건에 맞는 행 조회 (idx 순)"""
+        conditions, params = [], []
+        if where:
+            sql, params = where_to_sql(where)
+            conditions.append(sql)
+        if ids is None:
+            query = f"SELECT {columns} FROM chunks"
+            if conditions:
+                query += " WHERE " + conditions[0]
+            query += " ORDER BY idx"
+            if limit is not None or offset:
+                query += " LIMIT ? OFFSET ?"
+                params = params + [limit if limit is not None else -1, offset or 0]
+            return self._conn.execute(query, params).fetchall()
+        
+        rows = []
+        ids = list(ids)
+        for start in range(0, len(ids), _SQL_BATCH):
+            batch = ids[start:start + _SQL_BATCH]
+            query = (f"SELECT {columns} FROM chunks WHERE chunk_id IN ({', '.join('?' * len(batch))})"
+                     + (" AND " + conditions[0] if conditions else ""))
+            rows.extend(self._conn.execute(query, batch + params).fetchall())
+        rows.sort(key=lambda row: row[0])
+        return rows[offset or 0:None if limit is None else (offset or 0) + limit]
+    
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+    
+    def add(self, ids: List[str], embeddings: List[List[float]], documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.upsert(ids, embeddings, documents, metadatas)
+    
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None) -> None:
+        """청크 저장 (이미 있는 ID는 같은 행을 덮어씀)"""
+        if not ids:
+            return
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [None] * len(ids)
+        
+        with self._lock:
+            self._refresh()
+            self._ensure_writable()
+            if not self.dim:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+            
+            existing = {chunk_id: idx for idx, chunk_id in self._select(ids, columns="idx, chunk_id")}
+            idxs = np.empty(len(ids), dtype=np.int64)
+            next_idx = self.rows
+            for i, chunk_id in enumerate(ids):
+                idx = existing.get(chunk_id)
+                if idx is None:
+                    idx = existing[chunk_id] = next_idx
+                    next_idx += 1
+                idxs[i] = idx
+            self._grow(next_idx)
+            self.rows = next_idx
+            
+            self._quantize(vectors, idxs)
+            self._alive[idxs] = 1
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (idx, chunk_id, document, metadata) VALUES (?, ?, ?, ?)",
+                [(int(idx), chunk_id, document, json.dumps(metadata, ensure_ascii=False) if metadata else None)
+                 for idx, chunk_id, document, metadata in zip(idxs, ids, documents, metadatas)]
+            )
+            self._commit()
+    
+    def update(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """저장된 청크의 메타데이터만 교체 (벡터와 문서는 그대로, 없는 ID는 무시)"""
+        if not ids:
+            return
+        with self._lock:
+            self._refresh()
+            self._ensure_writable()
+            self._conn.executemany(
+                "UPDATE chunks SET metadata = ? WHERE chunk_id = ?",
+                [(json.dumps(metadata, ensure_ascii=False) if metadata else None, chunk_id)
+                 for chunk_id, metadata in zip(ids, metadatas)]
+            )
+            self._commit()
+    
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        """청크 삭제 (행은 비워 두고 compact()에서 회수)"""
+        with self._lock:
+            self._refresh()
+            idxs = [idx for (idx,) in self._select(ids, where, columns="idx")]
+            if not idxs:
+                return
+            self._ensure_writable()
+            self._alive[np.asarray(idxs, dtype=np.int64)] = 0
+            for start in range(0, len(idxs), _SQL_BATCH):
+                batch = idxs[start:start + _SQL_BATCH]
+                self._conn.execute(f"DELETE FROM chunks WHERE idx IN ({', '.join('?' * len(batch))})", batch)
+            self._commit()
+    
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Sequence[str] = ('metadatas', 'documents')) -> Dict[str, Any]:
+        """ID/조건으로 청크 조회 (Chroma Collection.get과 같은 형식)"""
+        with self._lock:
+            self._refresh()
+            rows = self._select(ids, where, limit=limit, offset=offset)
+            result: Dict[str, Any] = {'ids': [row[1] for row in rows]}
+            if 'documents' in include:
+                result['documents'] = [row[2] for row in rows]
+            if 'metadatas' in include:
+                result['metadatas'] = [json.loads(row[3]) if row[3] else None for row in rows]
+            if 'embeddings' in include:
+                idxs = np.asarray([row[0] for row in rows], dtype=np.int64)
+                result['embeddings'] = self._dequantize(idxs) if len(idxs) else np.empty((0, self.dim), np.float32)
+            return result
+    
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = ('metadatas', 'documents', 'distances')) -> Dict[str, Any]:
+        """쿼리별 코사인 거리 상위 n_results개 청크 (Chroma Collection.query와 같은 형식)"""
+        queries = self._normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        with self._lock:
+            self._refresh()
+            snapshot = self._snapshot()
+            candidates = None
+            if where:
+                candidates = np.asarray([idx for (idx,) in self._select(where=where, columns="idx")], dtype=np.int64)
+        
+        # 행렬 곱은 잠금 없이 실행 (NumPy가 GIL을 놓으므로 여러 스레드의 검색이 동시에 진행됨)
+        if not snapshot['rows']:
+            top = [(np.empty(0, np.int64), np.empty(0, np.float32))] * len(queries)
+        elif snapshot['ivf'] is not None:
+            # 쿼리마다 검색할 IVF 목록이 다르므로 하나씩 처리
+            top = [self._top_k(query[np.newaxis, :], n_results, snapshot,
+                               self._ivf_candidates(query, candidates, snapshot))[0]
+                   for query in queries]
+        else:
+            top = self._top_k(queries, n_results, snapshot, candidates)
+        
+        with self._lock:
+            rows = {row[0]: row for row in self._select_idxs(np.concatenate([idxs for idxs, _ in top]))}
+        
+        result: Dict[str, Any] = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for idxs, scores in top:
+            found = [(rows[idx], score) for idx, score in zip(idxs.tolist(), scores.tolist()) if idx in rows]
+            result['ids'].append([row[1] for row, _ in found])
+            result['documents'].append([row[2] for row, _ in found])
+            result['metadatas'].append([json.loads(row[3]) if row[3] else None for row, _ in found])
+            result['distances'].append([1.0 - score for _, score in found])
+        return {key: value for key, value in result.items() if key == 'ids' or key in include}
+    
+    def _select_idxs(self, idxs: np.ndarray) -> List[tuple]:
+        rows = []
+        idxs = np.unique(idxs).tolist()
+        for start in range(0, len(idxs), _SQL_BATCH):
+            batch = idxs[start:start + _SQL_BATCH]
+            rows.extend(self._conn.execute(
+                f"SELECT idx, chunk_id, document, metadata FROM chunks WHERE idx IN ({', '.join('?' * len(batch))})",
+                batch
+            ).fetchall())
+        return rows
+    
+    def _top_k(self, queries: np.ndarray, k: int, snapshot: Dict[str, Any],
+               candidates: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """블록 단위 행렬 곱으로 쿼리별 정확한 top-k (행 번호, 코사인 유사도) 계산"""
+        n_queries = len(queries)
+        best_idx = np.empty((n_queries, 0), dtype=np.int64)
+        best_scores = np.empty((n_queries, 0), dtype=np.float32)
+        total = snapshot['rows'] if candidates is None else len(candidates)
+        # 블록마다 새로 할당하지 않도록 변환 버퍼 재사용
+        buffer = None if self.dtype == 'float32' else np.empty((min(self.block_rows, total), self.dim), np.float32)
+        
+        for start in range(0, total, self.block_rows):
+            if candidates is None:
+                block_idx = np.arange(start, min(start + self.block_rows, total), dtype=np.int64)
+                selector = slice(start, start + len(block_idx))
+            else:
+                block_idx = selector = candidates[start:start + self.block_rows]
+            if self.dtype == 'float32':
+                block = snapshot['vectors'][selector]
+            else:
+                block = buffer[:len(block_idx)]
+                np.copyto(block, snapshot['vectors'][selector])
+            scores = queries @ block.T
+            if snapshot['scales'] is not None:
+                # int8 행별 스케일은 벡터 대신 점수에 곱함
+                scores *= snapshot['scales'][selector]
+            scores[:, snapshot['alive'][selector] == 0] = -np.inf
+            
+            # 이전 블록까지의 상위 k개와 합쳐 다시 상위 k개 선택
+            merged_idx = np.concatenate([best_idx, np.broadcast_to(block_idx, scores.shape)], axis=1)
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            if merged_scores.shape[1] > k:
+                keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+                merged_idx = np.take_along_axis(merged_idx, keep, axis=1)
+                merged_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_idx, best_scores = merged_idx, merged_scores
+        
+        results = []
+        for idxs, scores in zip(best_idx, best_scores):
+            order = np.argsort(-scores)
+            idxs, scores = idxs[order], scores[order]
+            valid = np.isfinite(scores)
+            results.append((idxs[valid], scores[valid]))
+        return results
+    
+    def _ivf_candidates(self, query: np.ndarray, candidates: Optional[np.ndarray],
+                        snapshot: Dict[str, Any]) -> np.ndarray:
+        """쿼리와 가까운 IVF 목록의 행과 IVF 생성 이후 추가된 행"""
+        centroids, offsets, order = snapshot['ivf']
+        nprobe = min(self.nprobe, len(centroids))
+        probe = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+        parts = [order[offsets[l]:offsets[l + 1]] for l in probe]
+        parts.append(np.arange(snapshot['ivf_rows'], snapshot['rows'], dtype=np.int64))
+        rows = np.sort(np.concatenate(parts))
+        if candidates is not None:
+            rows = np.intersect1d(rows, candidates, assume_unique=True)
+        return rows
+    
+    def maintain(self) -> None:
+        """삭제된 행이 많으면 압축하고, IVF가 오래되었으면 다시 생성"""
+        with self._lock:
+            self._refresh()
+            alive = self.count()
+            if self.rows and (self.rows - alive) / self.rows > _COMPACT_DEAD_RATIO:
+                self.compact()
+            if self.ivf_lists <= 0 or alive < self.ivf_lists * _IVF_MIN_ROWS_PER_LIST:
+                return
+            if not self.ivf_rows or (self.rows - self.ivf_rows) > self.ivf_rows * _IVF_STALE_RATIO:
+                self.build_ivf()
+    
+    def compact(self) -> None:
+        """삭제된 행을 제거하고 남은 행을 앞으로 당겨 파일을 다시 씀"""
+        with self._lock:
+            self._refresh()
+            old_idxs = np.asarray([idx for (idx,) in self._select(columns="idx")], dtype=np.int64)
+            logger.info(f"Compacting vector store: {self.rows} rows -> {len(old_idxs)} rows")
+            
+            capacity = max(_INITIAL_CAPACITY, len(old_idxs))
+            files = [(_VECTORS_FILENAME, self._vectors, self.dtype, (capacity, self.dim)),
+                     (_ALIVE_FILENAME, self._alive, np.uint8, (capacity,))]
+            if self.dtype == 'int8':
+                files.append((_SCALES_FILENAME, self._scales, np.float32, (capacity,)))
+            # 새 파일에 쓴 뒤 교체 (기존 파일을 매핑한 프로세스는 다음 조회 때 다시 매핑)
+            for filename, array, dtype, shape in files:
+                tmp_path = self._path(filename + ".tmp")
+                compacted = np.memmap(tmp_path, dtype=dtype, mode='w+', shape=shape)
+                for start in range(0, len(old_idxs), self.block_rows):
+                    block = old_idxs[start:start + self.block_rows]
+                    compacted[start:start + len(block)] = array[block]
+                compacted.flush()
+                del compacted
+            
+            self._vectors = self._scales = self._alive = None
+            for filename, _, _, _ in files:
+                os.replace(self._path(filename + ".tmp"), self._path(filename))
+            # idx 오름차순으로 옮기므로 새 idx는 항상 비어 있음
+            self._conn.executemany("UPDATE chunks SET idx = ? WHERE idx = ?",
+                                   [(new, int(old)) for new, old in enumerate(old_idxs) if new != old])
+            self.rows = len(old_idxs)
+            self.capacity = capacity
+            self.ivf_rows = 0
+            self._ivf = None
+            self._map_files()
+            self._commit()
+    
+    def build_ivf(self, n_lists: Optional[int] = None, seed: int = 0) -> None:
+        """k-means로 IVF 색인 생성 (구형 k-means, 코사인 유사도 기준)"""
+        with self._lock:
+            self._refresh()
+            n_lists = n_lists or self.ivf_lists
+            alive_idxs = np.flatnonzero(np.asarray(self._alive[:self.rows]))
+            if len(alive_idxs) < n_lists:
+                raise ValueError(f"Not enough vectors ({len(alive_idxs)}) for {n_lists} IVF lists")
+            
+            rng = np.random.default_rng(seed)
+            sample = np.sort(rng.choice(alive_idxs, min(len(alive_idxs), _IVF_TRAIN_SAMPLE), replace=False))
+            train = self._dequantize(sample)
+            centroids = train[rng.choice(len(train), n_lists, replace=False)]
+            for _ in range(_IVF_ITERATIONS):
+                assignment = np.argmax(train @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, train)
+                # 빈 목록은 이전 중심을 유지
+                empty = np.bincount(assignment, minlength=n_lists) == 0
+                sums[empty] = centroids[empty]
+                centroids = self._normalize(sums)
+            
+            assignment = np.empty(len(alive_idxs), dtype=np.int64)
+            for start in range(0, len(alive_idxs), self.block_rows):
+                block = alive_idxs[start:start + self.block_rows]
+                assignment[start:start + len(block)] = np.argmax(self._dequantize(block) @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind='stable')
+            offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+            
+            for filename, save in ((_IVF_CENTROIDS_FILENAME, lambda f: np.save(f, centroids.astype(np.float32))),
+                                   (_IVF_OFFSETS_FILENAME, lambda f: np.save(f, offsets.astype(np.int64))),
+                                   (_IVF_ORDER_FILENAME, lambda f: alive_idxs[order].astype(np.int64).tofile(f))):
+                tmp_path = self._path(filename + ".tmp")
+                with open(tmp_path, 'wb') as f:
+                    save(f)
+                os.replace(tmp_path, self._path(filename))
+            
+            self.ivf_rows = self.rows
+            self._load_ivf()
+            self._commit()
+            logger.info(f"Built IVF index with {n_lists} lists over {len(alive_idxs)} vectors")
+    
+    def clear(self) -> None:
+        """모든 청크와 파일 삭제"""
+        with self._lock:
+            self._vectors = self._scales = self._alive = None
+            self._ivf = None
+            for filename in (_VECTORS_FILENAME, _SCALES_FILENAME, _ALIVE_FILENAME, _IVF_CENTROIDS_FILENAME,
+                             _IVF_OFFSETS_FILENAME, _IVF_ORDER_FILENAME):
+                if os.path.exists(self._path(filename)):
+                    os.remove(self._path(filename))
+            self._conn.execute("DELETE FROM chunks")
+            self.rows = self.capacity = self.dim = self.ivf_rows = 0
+            self._commit()
+    
+    def storage_bytes(self) -> int:
+        """벡터/메타데이터 파일의 총 크기"""
+        return sum(os.path.getsize(self._path(name)) for name in os.listdir(self.directory))
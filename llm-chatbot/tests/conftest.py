@@ -0,0 +1,8 @@
+import pytest
+
+from fake_drive import FakeDriveService
+
+
+@pytest.fixture
+def drive():
+    return FakeDriveService()
@@ -0,0 +1,187 @@
+import re
+import time
+import hashlib
+import threading
+
+import httplib2
+
+FOLDER_ID = 'folder-1'
+
+
+class DriveInterrupted(RuntimeError):
+    """가짜 Drive가 다운로드 도중 연결을 끊을 때 발생"""
+
+
+class _Request:
+    def __init__(self, func):
+        self._func = func
+    
+    def execute(self, num_retries=0):
+        return self._func()
+
+
+class _MediaRequest:
+    """get_media가 돌려주는 HttpRequest의 최소 구현 (http, uri, headers)"""
+    
+    def __init__(self, http, uri):
+        self.http = http
+        self.uri = uri
+        self.headers = {}
+
+
+class _FakeHttp:
+    """Range 요청에 맞춰 파일 내용의 일부를 돌려주는 가짜 HTTP 연결"""
+    
+    def __init__(self, drive, file_id):
+        self.drive = drive
+        self.file_id = file_id
+    
+    def request(self, uri, method='GET', headers=None, **kwargs):
+        start, end = (int(value) for value in re.match(r'bytes=(\d+)-(\d+)', headers['range']).groups())
+        return self.drive._serve(self.file_id, start, end)
+
+
+class _Files:
+    def __init__(self, drive):
+        self.drive = drive
+    
+    def list(self, q='', pageSize=None, pageToken=None, fields=None):
+        return _Request(lambda: self.drive._list(q, pageToken))
+    
+    def get(self, fileId, fields=None):
+        return _Request(lambda: dict(self.drive.metadata[fileId]))
+    
+    def get_media(self, fileId):
+        return _MediaRequest(_FakeHttp(self.drive, fileId), f"fake://drive/{fileId}")
+
+
+class _Changes:
+    def __init__(self, drive):
+        self.drive = drive
+    
+    def getStartPageToken(self):
+        return _Request(lambda: {'startPageToken': str(len(self.drive.change_log))})
+    
+    def list(self, pageToken, pageSize=None, spaces=None, includeRemoved=None, fields=None):
+        return _Request(lambda: self.drive._list_changes(pageToken))
+
+
+class FakeDriveService:
+    """테스트용 로컬 Drive API (files.list/get/get_media, changes.getStartPageToken/list)
+    
+    page_size개씩 나누어 목록을 돌려주고, 다운로드마다 요청한 범위와 동시 요청 수를 기록한다.
+    fail_after[file_id]에 숫자를 넣으면 그만큼 범위 요청에 응답한 뒤 DriveInterrupted를 발생시킨다.
+    파일을 바꿀 때마다 변경 사항 피드에 기록하며, 피드는 change_page_size개씩 nextPageToken으로
+    나누어 돌려주고 마지막 페이지에 newStartPageToken을 넣는다.
+    """
+    
+    def __init__(self, page_size=2, delay=0.0, change_page_size=2):
+        self.page_size = page_size
+        self.delay = delay
+        self.change_page_size = change_page_size
+        self.change_log = []
+        self.change_requests = []
+        self.metadata = {}
+        self.contents = {}
+        self.fail_after = {}
+        self.media_requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._modified = 0
+    
+    def files(self):
+        return _Files(self)
+    
+    def changes(self):
+        return _Changes(self)
+    
+    def put_file(self, file_id, name, content, folder_id=FOLDER_ID, md5=True):
+        """파일 추가 또는 수정 (수정할 때마다 modifiedTime이 바뀜)"""
+        self._modified += 1
+        self.metadata[file_id] = {
+            'id': file_id,
+            'name': name,
+            'mimeType': 'text/plain',
+            'size': str(len(content)),
+            'modifiedTime': f"2026-01-01T00:00:{self._modified:02d}.000Z",
+            'md5Checksum': hashlib.md5(content).hexdigest() if md5 else None,
+            'parents': [folder_id],
+            'trashed': False
+        }
+        self.contents[file_id] = content
+        self._record_change(file_id)
+        return self.metadata[file_id]
+    
+    def rename_file(self, file_id, name):
+        self._modified += 1
+        self.metadata[file_id].update(name=name, modifiedTime=f"2026-01-01T00:00:{self._modified:02d}.000Z")
+        self._record_change(file_id)
+    
+    def move_file(self, file_id, folder_id):
+        self.metadata[file_id]['parents'] = [folder_id]
+        self._record_change(file_id)
+    
+    def trash_file(self, file_id):
+        self.metadata[file_id]['trashed'] = True
+        self._record_change(file_id)
+    
+    def delete_file(self, file_id):
+        self.metadata.pop(file_id)
+        self.contents.pop(file_id)
+        self.change_log.append({'fileId': file_id, 'removed': True})
+    
+    def _record_change(self, file_id):
+        self.change_log.append({'fileId': file_id, 'removed': False, 'file': dict(self.metadata[file_id])})
+    
+    def _list(self, query, page_token):
+        folder = re.search(r"'([^']+)' in parents", query)
+        files = [dict(file) for file in self.metadata.values()
+                 if not file['trashed'] and (folder is None or folder.group(1) in file['parents'])]
+        offset = int(page_token or 0)
+        response = {'files': files[offset:offset + self.page_size]}
+        if offset + self.page_size < len(files):
+            response['nextPageToken'] = str(offset + self.page_size)
+        return response
+    
+    def _list_changes(self, page_token):
+        self.change_requests.append(page_token)
+        offset = int(page_token)
+        end = offset + self.change_page_size
+        response = {'changes': [dict(change) for change in self.change_log[offset:end]]}
+        if end < len(self.change_log):
+            response['nextPageToken'] = str(end)
+        else:
+            response['newStartPageToken'] = str(len(self.change_log))
+        return response
+    
+    def _serve(self, file_id, start, end):
+        with self._lock:
+            self.media_requests.append((file_id, start))
+            remaining = self.fail_after.get(file_id)
+            if remaining is not None:
+                if remaining <= 0:
+                    del self.fail_after[file_id]
+                    raise DriveInterrupted(f"connection lost while downloading {file_id}")
+                self.fail_after[file_id] = remaining - 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            content = self.contents[file_id]
+            chunk = content[start:end + 1]
+            response = httplib2.Response({
+                'status': '206',
+                'content-range': f"bytes {start}-{start + len(chunk) - 1}/{len(content)}"
+            })
+            return response, chunk
+        finally:
+            with self._lock:
+                self.active -= 1
+    
+    def downloads_started(self, file_id=None):
+        """처음부터 시작한 다운로드 수"""
+        return sum(1 for requested_id, start in self.media_requests
+                   if start == 0 and (file_id is None or requested_id == file_id))
+
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+
+from src import embedding
+from src.embedding import DocumentEmbedder
+
+TEXT = ("파이썬 기초 과정은 주말반으로 운영됩니다.\n\n수강료는 삼십만원이며 교재가 포함됩니다.\n\n"
+        "강사는 김철수 선생님입니다 문의 환영합니다.")
+
+
+class FakeSentenceTransformer:
+    """글자 빈도를 임베딩으로 쓰는 모델 (모델 파일 없이 테스트, 인코딩한 텍스트를 기록)"""
+    
+    max_seq_length = 128
+    tokenizer = None
+    
+    def __init__(self, model_name):
+        self.encoded = []
+    
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for char in text:
+                vectors[i, ord(char) % 64] += 1.0
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+@pytest.fixture(params=['chroma', 'mmap'])
+def embedder(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding, 'SentenceTransformer', FakeSentenceTransformer)
+    return DocumentEmbedder(persist_directory=str(tmp_path / "db"), num_processes=1,
+                            chunk_max_tokens=8, chunk_overlap_tokens=0, vector_store_backend=request.param)
+
+
+def _index(embedder, path, text):
+    path.write_text(text, encoding='utf-8')
+    embedder.embed_documents([{'file_path': str(path), 'content': text, 'file_type': 'txt'}])
+
+
+def _stored_chunks(embedder, path):
+    stored = embedder.collection.get(where={'file_path': str(path)}, include=['documents', 'metadatas'])
+    return sorted(zip(stored['documents'], stored['metadatas']), key=lambda item: item[1]['chunk_index'])
+
+
+def test_reused_chunks_get_positions_of_edited_file(embedder, tmp_path):
+    path = tmp_path / "course.txt"
+    _index(embedder, path, TEXT)
+    embedder.embedding_model.encoded.clear()
+    
+    edited = "새 공지 추가\n\n" + TEXT
+    _index(embedder, path, edited)
+    
+    # 앞에 추가된 청크만 임베딩하고 나머지는 재사용
+    assert embedder.embedding_model.encoded == ["새 공지 추가"]
+    chunks = _stored_chunks(embedder, path)
+    assert [metadata['chunk_index'] for _, metadata in chunks] == list(range(len(chunks)))
+    for document, metadata in chunks:
+        assert edited[metadata['start_char']:metadata['end_char']] == document
+    
+    reused = dict(chunks)["강사는 김철수 선생"]
+    assert (reused['start_char'], reused['end_char']) == (58, 68)
+
+
+def test_file_without_text_loses_its_chunks(embedder, tmp_path):
+    path = tmp_path / "course.txt"
+    _index(embedder, path, TEXT)
+    old_ids = embedder.manifest.get_chunk_ids(str(path))
+    removed = []
+    embedder.add_change_listener(removed.append)
+    
+    _index(embedder, path, "  \n")
+    
+    assert _stored_chunks(embedder, path) == []
+    assert embedder.lexical_index.search("김철수", 5) == []
+    assert sorted(removed[0]) == sorted(old_ids)
+    # 빈 청크 목록으로 기록되어 파일이 다시 바뀔 때까지 건너뜀
+    assert embedder.manifest.get_chunk_ids(str(path)) == []
+    assert embedder.get_changed_files([str(path)]) == []
+
+
+def test_file_that_failed_to_load_keeps_its_chunks(embedder, tmp_path):
+    path = tmp_path / "course.txt"
+    _index(embedder, path, TEXT)
+    chunks = _stored_chunks(embedder, path)
+    
+    path.write_text("", encoding='utf-8')
+    embedder.embed_documents([{'file_path': str(path), 'content': "", 'file_type': 'txt',
+                               'error': "PDF parse failed"}])
+    
+    assert _stored_chunks(embedder, path) == chunks
+    assert embedder.get_changed_files([str(path)]) == [str(path)]
+
+
+# Chroma는 한 프로세스 안에서 같은 경로의 클라이언트가 메모리 색인을 공유하므로 mmap 저장소로만 확인
+@pytest.mark.parametrize('embedder', ['mmap'], indirect=True)
+def test_serving_process_reloads_index_written_by_another(embedder, tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding, 'INDEX_REFRESH_INTERVAL', 0)
+    _index(embedder, tmp_path / "course.txt", TEXT)
+    server = DocumentEmbedder(persist_directory=embedder.persist_directory, num_processes=1,
+                              chunk_max_tokens=8, chunk_overlap_tokens=0, vector_store_backend='mmap')
+    assert server.search_similar("평일반 개설", top_k=3, mode='hybrid')[0]['lexical_score'] == 0.0
+    
+    # Drive 감시 프로세스가 새 파일을 인덱싱
+    notice = tmp_path / "notice.txt"
+    _index(embedder, notice, "평일반 개설 안내")
+    top = server.search_similar("평일반 개설", top_k=3, mode='hybrid')[0]
+    assert top['metadata']['file_path'] == str(notice) and top['lexical_score'] > 0
+    
+    embedder.remove_documents([str(notice)])
+    paths = {doc['metadata']['file_path'] for doc in server.search_similar("평일반 개설", top_k=3, mode='hybrid')}
+    assert str(notice) not in paths
@@ -0,0 +1,146 @@
+from pathlib import Path
+
+import src.gdrive_sync as gdrive_sync
+from src.gdrive_sync import GoogleDriveSync
+
+from fake_drive import FOLDER_ID, FakeDriveService
+
+
+def _sync(drive, tmp_path, **kwargs):
+    return GoogleDriveSync(service=drive, download_folder=str(tmp_path / "gdrive"),
+                           state_path=str(tmp_path / "gdrive" / ".sync_state.json"), **kwargs)
+
+
+def test_sync_downloads_all_pages(drive, tmp_path):
+    for i in range(5):
+        drive.put_file(f"id-{i}", f"course-{i}.txt", f"과정 {i}".encode('utf-8'))
+    
+    downloaded = _sync(drive, tmp_path).sync_folder(FOLDER_ID)
+    
+    assert sorted(downloaded) == [f"course-{i}.txt" for i in range(5)]
+    for i in range(5):
+        assert (tmp_path / "gdrive" / f"course-{i}.txt").read_text(encoding='utf-8') == f"과정 {i}"
+
+
+def test_unchanged_files_are_skipped_by_md5(drive, tmp_path):
+    drive.put_file("a", "a.txt", b"alpha")
+    drive.put_file("b", "b.txt", b"beta")
+    _sync(drive, tmp_path).sync_folder(FOLDER_ID)
+    
+    # 상태 파일을 읽는 새 인스턴스에서도 바뀐 파일만 받음
+    drive.put_file("b", "b.txt", b"beta v2")
+    sync = _sync(drive, tmp_path)
+    assert sync.sync_folder(FOLDER_ID) == ["b.txt"]
+    assert (tmp_path / "gdrive" / "b.txt").read_bytes() == b"beta v2"
+    assert drive.downloads_started("a") == 1
+    assert sync.sync_folder(FOLDER_ID) == []
+
+
+def test_same_md5_with_new_modified_time_is_skipped(drive, tmp_path):
+    drive.put_file("a", "a.txt", b"alpha")
+    _sync(drive, tmp_path).sync_folder(FOLDER_ID)
+    
+    # 내용은 같고 modifiedTime만 바뀜
+    drive.put_file("a", "a.txt", b"alpha")
+    assert _sync(drive, tmp_path).sync_folder(FOLDER_ID) == []
+    assert drive.downloads_started("a") == 1
+
+
+def test_files_without_md5_are_compared_by_modified_time(drive, tmp_path):
+    drive.put_file("a", "a.txt", b"alpha", md5=False)
+    sync = _sync(drive, tmp_path)
+    sync.sync_folder(FOLDER_ID)
+    assert sync.sync_folder(FOLDER_ID) == []
+    
+    drive.put_file("a", "a.txt", b"alpha v2", md5=False)
+    assert sync.sync_folder(FOLDER_ID) == ["a.txt"]
+    assert (tmp_path / "gdrive" / "a.txt").read_bytes() == b"alpha v2"
+
+
+def test_deleted_local_copy_is_downloaded_again(drive, tmp_path):
+    drive.put_file("a", "a.txt", b"alpha")
+    sync = _sync(drive, tmp_path)
+    sync.sync_folder(FOLDER_ID)
+    
+    (tmp_path / "gdrive" / "a.txt").unlink()
+    assert sync.sync_folder(FOLDER_ID) == ["a.txt"]
+
+
+def test_files_removed_from_folder_are_deleted_locally(drive, tmp_path):
+    drive.put_file("a", "a.txt", b"alpha")
+    drive.put_file("b", "b.txt", b"beta")
+    sync = _sync(drive, tmp_path)
+    sync.sync_folder(FOLDER_ID)
+    
+    drive.delete_file("b")
+    sync.sync_folder(FOLDER_ID)
+    assert not (tmp_path / "gdrive" / "b.txt").exists()
+    assert sync.local_path("b") is None
+    assert sync.folder_files(FOLDER_ID) == [str(tmp_path / "gdrive" / "a.txt")]
+
+
+def test_files_with_the_same_name_get_separate_local_copies(tmp_path):
+    drive = FakeDriveService(delay=0.05)
+    drive.put_file("a", "안내.txt", b"alpha")
+    drive.put_file("b", "안내.txt", b"beta")
+    sync = _sync(drive, tmp_path, max_workers=2)
+    
+    assert sync.sync_folder(FOLDER_ID) == ["안내.txt", "안내.txt"]
+    assert drive.max_active == 2
+    paths = {file_id: sync.local_path(file_id) for file_id in ("a", "b")}
+    assert paths["a"] != paths["b"]
+    assert {Path(path).read_bytes() for path in paths.values()} == {b"alpha", b"beta"}
+    # 다음 동기화에서도 같은 경로를 쓰고 MD5가 맞으므로 다시 받지 않음
+    assert sync.sync_folder(FOLDER_ID) == []
+    assert {file_id: sync.local_path(file_id) for file_id in ("a", "b")} == paths
+    
+    drive.delete_file("a")
+    sync.sync_folder(FOLDER_ID)
+    assert not Path(paths["a"]).exists()
+    assert Path(paths["b"]).read_bytes() == b"beta"
+
+
+def test_downloads_run_concurrently(tmp_path):
+    drive = FakeDriveService(page_size=10, delay=0.05)
+    for i in range(8):
+        drive.put_file(f"id-{i}", f"course-{i}.txt", b"x" * 10)
+    
+    downloaded = _sync(drive, tmp_path, max_workers=4).sync_folder(FOLDER_ID)
+    
+    assert len(downloaded) == 8
+    assert 1 < drive.max_active <= 4
+
+
+def test_interrupted_download_resumes_from_partial_file(drive, tmp_path, monkeypatch):
+    monkeypatch.setattr(gdrive_sync, 'GDRIVE_CHUNK_SIZE', 4)
+    content = b"0123456789abcdef!"
+    drive.put_file("a", "a.txt", content)
+    drive.fail_after["a"] = 2
+    
+    sync = _sync(drive, tmp_path)
+    assert sync.sync_folder(FOLDER_ID) == []
+    part_path = tmp_path / "gdrive" / "a.txt.part"
+    assert part_path.read_bytes() == content[:8]
+    assert not (tmp_path / "gdrive" / "a.txt").exists()
+    
+    # 다음 동기화(재시작 후)는 받은 부분 이후부터 이어 받음
+    drive.media_requests.clear()
+    assert _sync(drive, tmp_path).sync_folder(FOLDER_ID) == ["a.txt"]
+    assert [start for _, start in drive.media_requests] == [8, 12, 16]
+    assert (tmp_path / "gdrive" / "a.txt").read_bytes() == content
+    assert not part_path.exists()
+
+
+def test_corrupt_partial_file_is_downloaded_again(drive, tmp_path, monkeypatch):
+    monkeypatch.setattr(gdrive_sync, 'GDRIVE_CHUNK_SIZE', 4)
+    drive.put_file("a", "a.txt", b"0123456789")
+    part_path = tmp_path / "gdrive" / "a.txt.part"
+    part_path.parent.mkdir(parents=True)
+    part_path.write_bytes(b"XXXX")
+    
+    sync = _sync(drive, tmp_path)
+    # 이어 받은 내용의 MD5가 맞지 않으면 임시 파일을 지우고 실패 처리
+    assert sync.sync_folder(FOLDER_ID) == []
+    assert not part_path.exists()
+    assert sync.sync_folder(FOLDER_ID) == ["a.txt"]
+    assert (tmp_path / "gdrive" / "a.txt").read_bytes() == b"0123456789"
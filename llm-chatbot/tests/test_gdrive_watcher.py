@@ -0,0 +1,257 @@
+import time
+import queue
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.gdrive_sync import GoogleDriveSync
+from src.gdrive_watcher import DriveChangeWatcher
+from src.manifest import normalize_path
+
+from fake_drive import FOLDER_ID
+
+
+class FakeLoader:
+    def __init__(self):
+        self.errors = []
+    
+    def iter_documents(self, paths):
+        for path in paths:
+            yield {'file_path': path, 'content': Path(path).read_text(encoding='utf-8')}
+
+
+class FakeEmbedder:
+    """인덱싱/삭제된 파일을 기록하는 임베더 (fail이 True이면 인덱싱 실패)"""
+    
+    def __init__(self):
+        self.indexed = []
+        self.removed = []
+        self.paths = set()
+        self.fail = False
+    
+    def get_changed_files(self, paths):
+        return list(paths)
+    
+    def get_deleted_files(self, paths):
+        current = {normalize_path(path) for path in paths}
+        return sorted(self.paths - current)
+    
+    def embed_documents(self, documents):
+        if self.fail:
+            raise RuntimeError("index unavailable")
+        for document in documents:
+            self.indexed.append((Path(document['file_path']).name, document['content']))
+            self.paths.add(normalize_path(document['file_path']))
+    
+    def remove_documents(self, paths):
+        self.removed.extend(Path(path).name for path in paths)
+        self.paths.difference_update(normalize_path(path) for path in paths)
+
+
+@pytest.fixture
+def embedder():
+    return FakeEmbedder()
+
+
+@pytest.fixture
+def make_watcher(drive, embedder, tmp_path):
+    def make(**kwargs):
+        sync = GoogleDriveSync(service=drive, download_folder=str(tmp_path / "gdrive"),
+                               state_path=str(tmp_path / "gdrive" / ".sync_state.json"))
+        watcher = DriveChangeWatcher(sync, FOLDER_ID, FakeLoader(), embedder, poll_interval=0.05,
+                                     token_path=str(tmp_path / "gdrive" / ".changes_token"), **kwargs)
+        watcher.catch_up()
+        watcher._page_token = drive.changes().getStartPageToken().execute()['startPageToken']
+        watcher._save_token(watcher._page_token)
+        return watcher
+    return make
+
+
+def _drain(watcher):
+    items = []
+    while not watcher.queue.empty():
+        items.append(watcher.queue.get_nowait())
+    return items
+
+
+def _saved_token(watcher):
+    return watcher.token_path.read_text(encoding='utf-8')
+
+
+def test_poll_pages_through_feed(drive, make_watcher):
+    watcher = make_watcher()
+    for i in range(5):
+        drive.put_file(f"id-{i}", f"course-{i}.txt", f"과정 {i}".encode('utf-8'))
+    
+    assert watcher.poll() == 5
+    assert drive.change_requests == ['0', '2', '4']
+    items = _drain(watcher)
+    assert [item[0] for item in items] == ['upsert'] * 5 + ['checkpoint']
+    assert items[-1][1] == '5'
+    
+    # 새 변경이 없으면 마지막 위치에서 한 번만 조회
+    drive.change_requests.clear()
+    assert watcher.poll() == 0
+    assert drive.change_requests == ['5']
+    assert watcher.queue.empty()
+
+
+def test_upsert_rename_and_delete(drive, embedder, make_watcher, tmp_path):
+    drive.put_file("a", "a.txt", "원래 내용".encode('utf-8'))
+    drive.put_file("b", "b.txt", b"beta")
+    watcher = make_watcher()
+    assert sorted(embedder.indexed) == [("a.txt", "원래 내용"), ("b.txt", "beta")]
+    embedder.indexed.clear()
+    
+    drive.put_file("a", "a.txt", "바뀐 내용".encode('utf-8'))
+    drive.put_file("c", "c.txt", b"new")
+    drive.rename_file("b", "b2.txt")
+    watcher.poll()
+    watcher.process(_drain(watcher))
+    
+    assert sorted(embedder.indexed) == [("a.txt", "바뀐 내용"), ("b2.txt", "beta"), ("c.txt", "new")]
+    assert embedder.removed == ["b.txt"]
+    assert not (tmp_path / "gdrive" / "b.txt").exists()
+    assert (tmp_path / "gdrive" / "b2.txt").exists()
+    
+    embedder.indexed.clear()
+    drive.delete_file("a")
+    drive.trash_file("b")
+    drive.move_file("c", "other-folder")
+    watcher.poll()
+    watcher.process(_drain(watcher))
+    
+    assert embedder.indexed == []
+    assert sorted(embedder.removed) == ["a.txt", "b.txt", "b2.txt", "c.txt"]
+    assert watcher.sync.folder_files(FOLDER_ID) == []
+    assert list((tmp_path / "gdrive").glob("*.txt")) == []
+
+
+def test_files_deleted_while_not_watching_are_removed_on_restart(drive, embedder, make_watcher, tmp_path):
+    drive.put_file("a", "a.txt", b"alpha")
+    drive.put_file("b", "b.txt", b"beta")
+    make_watcher().stop()
+    # 인덱스에는 있지만 Drive 폴더와 관계없는 파일
+    embedder.paths.add(normalize_path(tmp_path / "uploads" / "manual.txt"))
+    embedder.indexed.clear()
+    
+    # 감시가 꺼져 있는 동안 삭제/이름 변경
+    drive.delete_file("b")
+    drive.rename_file("a", "a2.txt")
+    watcher = make_watcher()
+    
+    assert sorted(embedder.removed) == ["a.txt", "b.txt"]
+    assert embedder.indexed == [("a2.txt", "alpha")]
+    assert embedder.get_deleted_files(watcher.sync.folder_files()) == [
+        normalize_path(tmp_path / "uploads" / "manual.txt")]
+    assert watcher.get_stats()['removed_files'] == 2
+
+
+def test_changes_outside_folder_are_ignored(drive, embedder, make_watcher):
+    watcher = make_watcher()
+    drive.put_file("x", "x.txt", b"other", folder_id="other-folder")
+    drive.delete_file("x")
+    
+    assert watcher.poll() == 0
+    assert [item[0] for item in _drain(watcher)] == ['checkpoint']
+
+
+def test_repeated_changes_to_one_file_are_merged(drive, embedder, make_watcher):
+    watcher = make_watcher()
+    for version in range(3):
+        drive.put_file("a", "a.txt", f"v{version}".encode('utf-8'))
+    watcher.poll()
+    watcher.process(_drain(watcher))
+    
+    assert embedder.indexed == [("a.txt", "v2")]
+    assert drive.downloads_started("a") == 1
+
+
+def test_failed_download_is_retried(drive, embedder, make_watcher):
+    watcher = make_watcher()
+    drive.put_file("a", "a.txt", b"alpha")
+    drive.fail_after["a"] = 0
+    watcher.poll()
+    watcher.process(_drain(watcher))
+    
+    assert embedder.indexed == []
+    assert watcher.get_stats()['pending_retries'] == 1
+    assert watcher.get_stats()['failed_downloads'] == 1
+    
+    # 새 변경 사항이 없어도 다음 배치에서 다시 받음
+    watcher.process([])
+    assert embedder.indexed == [("a.txt", "alpha")]
+    assert watcher.get_stats()['pending_retries'] == 0
+
+
+def test_token_is_saved_only_after_batch_is_processed(drive, embedder, make_watcher):
+    watcher = make_watcher()
+    start_token = _saved_token(watcher)
+    drive.put_file("a", "a.txt", b"alpha")
+    drive.put_file("b", "b.txt", b"beta")
+    drive.put_file("c", "c.txt", b"gamma")
+    
+    watcher.poll()
+    assert _saved_token(watcher) == start_token
+    
+    # 인덱싱에 실패한 배치의 위치는 저장하지 않음 (재시작하면 같은 변경부터 다시 읽음)
+    items = _drain(watcher)
+    embedder.fail = True
+    with pytest.raises(RuntimeError):
+        watcher.process(items)
+    assert _saved_token(watcher) == start_token
+    
+    embedder.fail = False
+    watcher.process(items)
+    assert _saved_token(watcher) == '3'
+    
+    # 위치 저장 표시 앞의 변경만 처리한 배치는 위치를 저장하지 않음
+    drive.put_file("d", "d.txt", b"delta")
+    watcher.poll()
+    items = _drain(watcher)
+    watcher.process(items[:-1])
+    assert _saved_token(watcher) == '3'
+    watcher.process(items[-1:])
+    assert _saved_token(watcher) == '4'
+
+
+def test_full_queue_pauses_polling(drive, make_watcher):
+    watcher = make_watcher(queue_size=2)
+    for i in range(5):
+        drive.put_file(f"id-{i}", f"course-{i}.txt", b"x")
+    
+    poller = threading.Thread(target=watcher.poll)
+    poller.start()
+    deadline = time.monotonic() + 5
+    while watcher.get_stats()['backpressure_waits'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    
+    # 큐가 가득 찬 동안에는 조회가 진행되지 않음
+    assert watcher.get_stats()['backpressure_waits'] >= 1
+    assert poller.is_alive()
+    assert watcher.queue.full()
+    
+    items = []
+    while poller.is_alive() or not watcher.queue.empty():
+        try:
+            items.append(watcher.queue.get(timeout=0.1))
+        except queue.Empty:
+            pass
+    poller.join()
+    assert [item[1] for item in items[:-1]] == [f"id-{i}" for i in range(5)]
+    assert items[-1] == ('checkpoint', '5')
+
+
+def test_watcher_threads_index_changes(drive, embedder, make_watcher):
+    watcher = make_watcher()
+    watcher.start()
+    try:
+        drive.put_file("a", "a.txt", b"alpha")
+        deadline = time.monotonic() + 5
+        while not embedder.indexed and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        watcher.stop(timeout=5)
+    
+    assert embedder.indexed == [("a.txt", "alpha")]
@@ -0,0 +1,55 @@
+from src.lexical import BM25Index
+
+
+def _index(tmp_path):
+    return BM25Index(str(tmp_path / "lexical.sqlite3"))
+
+
+def test_search_after_removing_last_chunk_and_reopening(tmp_path):
+    index = _index(tmp_path)
+    index.add(["a", "b", "c"], ["python basics course", "java course", "python advanced"])
+    index.remove(["c"])
+    index.save()
+    
+    reopened = _index(tmp_path)
+    assert len(reopened) == 2
+    assert [chunk_id for chunk_id, _ in reopened.search("python")] == ["a"]
+
+
+def test_new_chunk_does_not_inherit_removed_postings(tmp_path):
+    index = _index(tmp_path)
+    index.add(["a", "b", "c"], ["python basics course", "java course", "python advanced"])
+    index.remove(["c"])
+    index.save()
+    
+    reopened = _index(tmp_path)
+    reopened.add(["d"], ["excel course"])
+    reopened.save()
+    assert "d" not in [chunk_id for chunk_id, _ in reopened.search("python")]
+    assert [chunk_id for chunk_id, _ in reopened.search("excel")] == ["d"]
+
+
+def test_reopen_compacts_mostly_removed_index(tmp_path):
+    index = _index(tmp_path)
+    index.add(["a", "b", "c"], ["python basics course", "java course", "python advanced"])
+    index.remove(["b", "c"])
+    index.save()
+    
+    reopened = _index(tmp_path)
+    assert [chunk_id for chunk_id, _ in reopened.search("python")] == ["a"]
+    reopened.add(["d"], ["python data analysis"])
+    reopened.save()
+    assert sorted(chunk_id for chunk_id, _ in _index(tmp_path).search("python")) == ["a", "d"]
+
+
+def test_reopen_after_removing_every_chunk(tmp_path):
+    index = _index(tmp_path)
+    index.add(["a"], ["python basics course"])
+    index.remove(["a"])
+    index.save()
+    
+    reopened = _index(tmp_path)
+    assert reopened.search("python") == []
+    reopened.add(["b"], ["java course"])
+    reopened.save()
+    assert reopened.search("python") == []
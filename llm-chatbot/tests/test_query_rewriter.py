@@ -0,0 +1,52 @@
+import pytest
+
+from src.query_rewriter import QueryRewriter, is_followup
+
+HISTORY = [
+    {'role': 'user', 'content': "파이썬 기초 과정 일정 알려주세요"},
+    {'role': 'assistant', 'content': "파이썬 기초 과정은 매주 토요일 오전 10시에 진행됩니다."}
+]
+
+
+@pytest.fixture
+def rewriter():
+    return QueryRewriter(mode='rule')
+
+
+def test_docstring_example(rewriter):
+    assert rewriter.rewrite("그럼 수강료는요?", HISTORY) == "파이썬 기초 과정 수강료는요?"
+
+
+@pytest.mark.parametrize('query', ["hi", "감사합니다", "네", "hello there"])
+def test_small_talk_is_not_rewritten(rewriter, query):
+    assert not is_followup(query)
+    assert rewriter.rewrite(query, HISTORY) == query
+
+
+@pytest.mark.parametrize('query', ["자바 과정 수강료 알려주세요", "데이터 분석 과정 추천해주세요"])
+def test_standalone_question_is_not_rewritten(rewriter, query):
+    assert rewriter.rewrite(query, HISTORY) == query
+
+
+def test_missing_subject_is_carried_over(rewriter):
+    assert rewriter.rewrite("얼마예요?", HISTORY) == "파이썬 기초 과정 얼마예요?"
+
+
+def test_missing_attribute_is_carried_over(rewriter):
+    assert rewriter.rewrite("자바는요?", HISTORY) == "자바는요? 일정"
+    assert rewriter.rewrite("그럼 엑셀 과정은?", HISTORY) == "엑셀 과정은? 일정"
+
+
+def test_consecutive_followups_use_previous_rewrite(rewriter):
+    first = rewriter.rewrite("그럼 수강료는요?", HISTORY, session_id='s1')
+    history = HISTORY + [
+        {'role': 'user', 'content': "그럼 수강료는요?"},
+        {'role': 'assistant', 'content': "수강료는 30만원입니다."}
+    ]
+    assert first == "파이썬 기초 과정 수강료는요?"
+    assert rewriter.rewrite("환불은요?", history, session_id='s1') == "파이썬 기초 과정 환불은요?"
+
+
+def test_without_history_or_when_off():
+    assert QueryRewriter(mode='rule').rewrite("그럼 수강료는요?", []) == "그럼 수강료는요?"
+    assert QueryRewriter(mode='off').rewrite("그럼 수강료는요?", HISTORY) == "그럼 수강료는요?"
@@ -0,0 +1,33 @@
+import time
+
+from src.rerank import CrossEncoderReranker
+
+DOCUMENTS = [{'content': "파이썬 기초 과정"}, {'content': "수강료 안내"}, {'content': "강사 소개"}]
+
+
+class SlowModel:
+    def predict(self, pairs, **kwargs):
+        time.sleep(0.02)
+        return [len(text) for _, text in pairs]
+
+
+class FailingModel:
+    def predict(self, pairs, **kwargs):
+        raise RuntimeError("out of memory")
+
+
+def test_failed_rerank_does_not_lower_latency_estimate():
+    reranker = CrossEncoderReranker(latency_budget_ms=1000)
+    reranker._model = SlowModel()
+    ranked, reranked = reranker.rerank("수강료", [dict(doc) for doc in DOCUMENTS], top_k=2)
+    assert reranked and [doc['content'] for doc in ranked] == ["파이썬 기초 과정", "수강료 안내"]
+    latency = reranker.stats()['latency_ms_avg']
+    assert latency >= 20
+    
+    reranker._model = FailingModel()
+    for _ in range(5):
+        ranked, reranked = reranker.rerank("수강료", [dict(doc) for doc in DOCUMENTS], top_k=2)
+        assert not reranked and ranked == DOCUMENTS[:2]
+    
+    assert reranker.stats()['latency_ms_avg'] == latency
+    assert reranker.stats()['in_flight'] == 0
@@ -0,0 +1,94 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.answer_cache import SemanticAnswerCache
+from src.llm import StubLLMBackend
+from src.search import ChatbotSearch
+
+DOCS = [{
+    'id': 'chunk-1',
+    'content': '파이썬 기초 과정 수강료: 300000원',
+    'metadata': {'file_path': 'courses.txt', 'file_name': 'courses.txt'},
+    'distance': 0.1,
+    'similarity': 0.9
+}]
+
+
+class FakeEmbedder:
+    """검색할 때마다 같은 문서를 돌려주는 임베더"""
+    
+    def add_change_listener(self, listener):
+        pass
+    
+    def lookup_table(self, query, filters=None):
+        return []
+    
+    def search_similar_batch(self, queries, top_k, min_similarity=None, filters=None):
+        return [list(DOCS) for _ in queries]
+    
+    def embed_query(self, query):
+        return np.ones(4, dtype=np.float32)
+
+
+class FailingStreamLLM(StubLLMBackend):
+    """토큰 두 개를 보낸 뒤 실패하는 스트리밍 백엔드"""
+    
+    def __init__(self):
+        super().__init__(first_token_latency=0, tokens_per_second=0)
+        self.fail = True
+    
+    def stream(self, messages):
+        if not self.fail:
+            yield from super().stream(messages)
+            return
+        yield "파이썬 기초 과정의"
+        yield " 수강료는"
+        raise ConnectionError("stream dropped")
+    
+    async def astream(self, messages):
+        yield "파이썬 기초 과정의"
+        raise ConnectionError("stream dropped")
+
+
+@pytest.fixture
+def chatbot(tmp_path):
+    cache = SemanticAnswerCache(str(tmp_path / "answers.sqlite3"))
+    return ChatbotSearch(FakeEmbedder(), llm=FailingStreamLLM(), answer_cache=cache)
+
+
+def test_interrupted_stream_raises_and_is_not_cached(chatbot):
+    tokens = []
+    with pytest.raises(ConnectionError):
+        for token in chatbot.stream_search_and_respond("파이썬 기초 과정 수강료는?"):
+            tokens.append(token)
+    assert tokens == ["파이썬 기초 과정의", " 수강료는"]
+    assert chatbot.answer_cache.stats()['size'] == 0
+    
+    chatbot.llm.fail = False
+    response = chatbot.search_and_respond("파이썬 기초 과정 수강료는?")
+    assert response in chatbot.llm.responses
+
+
+def test_interrupted_history_stream_raises(chatbot):
+    history = [{'role': 'user', 'content': '파이썬 기초 과정 일정 알려주세요'},
+               {'role': 'assistant', 'content': '매주 토요일입니다.'}]
+    with pytest.raises(ConnectionError):
+        list(chatbot.stream_chat_with_history("그럼 수강료는요?", history))
+
+
+def test_interrupted_async_stream_raises_and_is_not_cached(chatbot):
+    async def consume():
+        return [token async for token in chatbot.astream_search_and_respond("파이썬 기초 과정 수강료는?")]
+    
+    with pytest.raises(ConnectionError):
+        asyncio.run(consume())
+    assert chatbot.answer_cache.stats()['size'] == 0
+
+
+def test_complete_stream_is_cached(chatbot):
+    chatbot.llm.fail = False
+    response = "".join(chatbot.stream_search_and_respond("파이썬 기초 과정 수강료는?"))
+    assert response in chatbot.llm.responses
+    assert chatbot.answer_cache.stats()['size'] == 1
@@ -0,0 +1,103 @@
+import numpy as np
+
+from src.answer_cache import SemanticAnswerCache
+from src.llm import StubLLMBackend
+from src.search import ChatbotSearch
+from src.summarizer import ConversationSummarizer, SUMMARY_PREFIX
+from src.tokens import ContextPacker, message_tokens
+
+SUMMARY = "고객은 파이썬 기초 과정의 주말반 일정과 수강료 30만원을 안내받음"
+
+
+class FakeEmbedder:
+    def add_change_listener(self, listener):
+        pass
+    
+    def lookup_table(self, query, filters=None):
+        return []
+    
+    def search_similar_batch(self, queries, top_k, min_similarity=None, filters=None):
+        return [[{'id': 'chunk-1', 'content': '파이썬 기초 과정: 주말반, 수강료 300000원',
+                  'metadata': {'file_path': 'courses.txt'}, 'distance': 0.1, 'similarity': 0.9}]
+                for _ in queries]
+    
+    def embed_query(self, query):
+        return np.ones(4, dtype=np.float32)
+
+
+class RecordingStubLLM(StubLLMBackend):
+    """요약 요청을 모두 기록하는 스텁"""
+    
+    def __init__(self):
+        super().__init__(responses=[SUMMARY], first_token_latency=0, tokens_per_second=0)
+        self.requests = []
+    
+    def generate(self, messages):
+        self.requests.append(messages[-1]['content'])
+        return super().generate(messages)
+
+
+def _turns(count):
+    messages = []
+    for i in range(count):
+        messages.append({'role': 'user', 'content': f"{i}번째 질문입니다. 파이썬 기초 과정에 대해 알려주세요."})
+        messages.append({'role': 'assistant', 'content': f"{i}번째 답변입니다. 주말반으로 운영되며 수강료는 30만원입니다."})
+    return messages
+
+
+def _memory(llm):
+    return ConversationSummarizer(llm, trigger_tokens=150, recent_tokens=60, summary_max_tokens=80, max_tokens=400)
+
+
+def _summarized_history(llm, turns=6):
+    memory = _memory(llm)
+    messages = _turns(turns)
+    for i in range(0, len(messages), 2):
+        memory.add(messages[i:i + 2])
+        memory.wait(5)
+    return memory, messages
+
+
+def test_older_turns_are_folded_into_summary():
+    llm = RecordingStubLLM()
+    memory, messages = _summarized_history(llm)
+    
+    history = memory.history()
+    assert history[0] == {'role': 'system', 'content': SUMMARY_PREFIX + SUMMARY}
+    # 최근 메시지는 그대로 남고 오래된 메시지는 요약으로 대체됨
+    recent = history[1:]
+    assert recent == messages[-len(recent):]
+    assert messages[0] not in recent
+    assert memory.stats()['summaries'] == len(llm.requests) >= 1
+    # 첫 요약에는 처음 대화가, 다음 요약에는 이전 요약이 들어감
+    assert messages[0]['content'] in llm.requests[0]
+    if len(llm.requests) > 1:
+        assert SUMMARY in llm.requests[1]
+
+
+def test_summary_reaches_prompt_when_history_budget_is_tight(tmp_path):
+    memory, _ = _summarized_history(RecordingStubLLM())
+    history = memory.history()
+    assert len(history) > 2
+    
+    chat_llm = StubLLMBackend(first_token_latency=0, tokens_per_second=0)
+    # 요약과 최근 메시지 하나만 들어가는 예산
+    packer = ContextPacker(history_max_tokens=message_tokens(history[0]) + message_tokens(history[-1]))
+    cache = SemanticAnswerCache(str(tmp_path / "answers.sqlite3"))
+    chatbot = ChatbotSearch(FakeEmbedder(), llm=chat_llm, answer_cache=cache, packer=packer)
+    chatbot.chat_with_history("그럼 평일반도 있나요?", history)
+    
+    prompt = chat_llm.last_messages
+    assert prompt[1] == history[0]
+    assert prompt[-2] == history[-1]
+    assert history[-2] not in prompt
+    assert prompt[-1] == {'role': 'user', 'content': "그럼 평일반도 있나요?"}
+
+
+def test_long_summary_is_truncated_to_budget():
+    packer = ContextPacker(history_max_tokens=20)
+    summary = {'role': 'system', 'content': SUMMARY_PREFIX + SUMMARY * 10}
+    kept = packer.truncate_history([summary, {'role': 'user', 'content': "질문"}])
+    assert kept[0]['role'] == 'system'
+    assert kept[0]['content'].startswith(SUMMARY_PREFIX)
+    assert len(kept[0]['content']) < len(summary['content'])
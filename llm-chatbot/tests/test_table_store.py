@@ -0,0 +1,34 @@
+from src.loader import DocumentLoader
+from src.table_store import TableStore, value_candidates
+
+CSV_TEXT = "과정명,수강료,일정\n파이썬 기초,300000,주말반\n엑셀 실무,200000,평일 저녁\n"
+
+
+def _rows(path):
+    loader = DocumentLoader(upload_folder=str(path.parent), max_workers=1)
+    return [row for segment in loader.iter_segments(str(path)) for row in segment['table_rows']]
+
+
+def test_csv_with_bom_keeps_first_header(tmp_path):
+    path = tmp_path / "courses.csv"
+    path.write_text(CSV_TEXT, encoding='utf-8-sig')
+    
+    rows = _rows(path)
+    assert rows[0][1] == "과정명: 파이썬 기초 | 수강료: 300000 | 일정: 주말반"
+    assert rows[0][2][0] == ("과정명", "파이썬 기초")
+
+
+def test_lookup_finds_row_by_first_column_value(tmp_path):
+    path = tmp_path / "courses.csv"
+    path.write_text(CSV_TEXT, encoding='utf-8-sig')
+    store = TableStore(str(tmp_path / "tables.sqlite3"))
+    store.add(str(path), {'file_path': str(path)}, _rows(path))
+    
+    results = store.lookup("파이썬 기초 수강료는?")
+    assert [result['content'] for result in results] == ["과정명: 파이썬 기초 | 수강료: 300000 | 일정: 주말반"]
+    # 다른 열 이름을 묻지 않으면 벡터 검색에 맡김
+    assert store.lookup("파이썬 기초") == []
+
+
+def test_value_candidates_strip_trailing_particle():
+    assert "파이썬 기초" in value_candidates("파이썬 기초는 수강료가 얼마인가요?")
@@ -4,20 +4,24 @@ LLM Chatbot Web Application
 교육 서비스 챗봇 웹 인터페이스
 """
 
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, Response, stream_with_context
 import os
+import json
 import sys
+import uuid
 from pathlib import Path
 import logging
 
 # src 모듈 import를 위한 경로 추가
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from src.search import ChatbotSearch
-from src.embedding import DocumentEmbedder
+from src.search import ChatbotSearch, ERROR_MESSAGE, GENERATION_ERROR_MESSAGE
+from src.embedding import DocumentEmbedder, build_where
+from src.session_store import create_session_store
 
 app = Flask(__name__)
-app.secret_key = 'your-secret-key-here'  # 실제 운영시에는 환경변수로 설정
+# 세션 쿠키 서명 키 (여러 워커 프로세스가 같은 값을 사용해야 함)
+app.secret_key = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-here')
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +30,23 @@ logger = logging.getLogger(__name__)
 # 챗봇 초기화
 embedder = DocumentEmbedder()
 chatbot = ChatbotSearch(embedder)
+# 세션별 대화 히스토리 (SESSION_STORE_BACKEND=sqlite이면 재시작/워커 간 공유)
+session_store = create_session_store()
+
+def _session_id() -> str:
+    """요청의 대화 세션 ID (없으면 새로 만들어 세션 쿠키에 저장)"""
+    if 'session_id' not in session:
+        session['session_id'] = uuid.uuid4().hex
+    return session['session_id']
+
+def _remember(session_id: str, user_message: str, response: str) -> None:
+    """오류 안내가 아닌 응답만 대화 히스토리에 저장"""
+    if response in (ERROR_MESSAGE, GENERATION_ERROR_MESSAGE):
+        return
+    session_store.append(session_id, [
+        {'role': 'user', 'content': user_message},
+        {'role': 'assistant', 'content': response}
+    ])
 
 @app.route('/')
 def index():
@@ -45,8 +66,22 @@ def chat():
                 'message': '메시지를 입력해주세요.'
             })
         
-        # 챗봇 응답 생성
-        response = chatbot.search_and_respond(user_message)
+        # 검색 범위 필터 (예: {"course": "파이썬 기초", "source": "gdrive"})
+        filters = data.get('filters') or None
+        try:
+            build_where(filters)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        # 챗봇 응답 생성 (이전 대화가 있으면 히스토리를 함께 전달)
+        session_id = _session_id()
+        history = session_store.get(session_id)
+        if history:
+            response = chatbot.chat_with_history(user_message, history, filters=filters, session_id=session_id)
+        else:
+            # 첫 질문은 응답 캐시를 사용하는 단일 질문 경로로 처리
+            response = chatbot.search_and_respond(user_message, filters=filters)
+        _remember(session_id, user_message, response)
         
         return jsonify({
             'success': True,
@@ -61,6 +96,65 @@ def chat():
             'message': '죄송합니다. 일시적인 오류가 발생했습니다.'
         })
 
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """챗봇 대화 스트리밍 API (Server-Sent Events)
+    
+    응답 토큰을 생성되는 대로 `data: {"token": ...}` 이벤트로 전송하고,
+    마지막에 `event: done` 이벤트를 보낸다. 응답 도중 실패하면 `event: error`를 보내고
+    잘린 응답은 대화 히스토리에 저장하지 않는다.
+    """
+    data = request.get_json(silent=True) or {}
+    user_message = data.get('message', '').strip()
+    
+    if not user_message:
+        return jsonify({
+            'success': False,
+            'message': '메시지를 입력해주세요.'
+        })
+    
+    filters = data.get('filters') or None
+    try:
+        build_where(filters)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    session_id = _session_id()
+    history = session_store.get(session_id)
+    
+    def generate():
+        tokens = []
+        try:
+            if history:
+                stream = chatbot.stream_chat_with_history(user_message, history, filters=filters,
+                                                         session_id=session_id)
+            else:
+                stream = chatbot.stream_search_and_respond(user_message, filters=filters)
+            for token in stream:
+                tokens.append(token)
+                yield f"data: {json.dumps({'token': token}, ensure_ascii=False)}\n\n"
+            # 응답 도중 실패하면 예외가 발생하므로 잘린 응답은 히스토리에 남기지 않음
+            _remember(session_id, user_message, "".join(tokens))
+        except Exception as e:
+            logger.error(f"Chat stream API error: {e}")
+            yield f"event: error\ndata: {json.dumps({'message': '죄송합니다. 일시적인 오류가 발생했습니다.'}, ensure_ascii=False)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # 프록시 버퍼링 비활성화
+        }
+    )
+
+@app.route('/chat/reset', methods=['POST'])
+def chat_reset():
+    """현재 세션의 대화 히스토리 삭제"""
+    session_store.clear(_session_id())
+    return jsonify({'success': True})
+
 @app.route('/health')
 def health_check():
     """헬스 체크 API"""
@@ -69,7 +163,13 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'document_count': info['document_count'],
-            'collection_name': info['collection_name']
+            'collection_name': info['collection_name'],
+            'cache': dict(
+                embedder.get_cache_stats(),
+                answers=chatbot.answer_cache.stats() if chatbot.answer_cache else None
+            ),
+            'retrieval': chatbot.get_stats(),
+            'sessions': session_store.stats()
         })
     except Exception as e:
         return jsonify({
@@ -77,24 +177,6 @@ def health_check():
             'error': str(e)
         }), 500
 
-if __name__ == '__main__':
-    # 템플릿 디렉토리 생성
-    templates_dir = Path(__file__).parent / 'templates'
-    templates_dir.mkdir(exist_ok=True)
-    
-    # 기본 HTML 템플릿 생성
-    create_basic_template()
-    
-    print("=" * 50)
-    print("LLM Chatbot Web Application")
-    print("=" * 50)
-    print("웹 서버를 시작합니다...")
-    print("브라우저에서 http://localhost:5000 으로 접속하세요.")
-    print("종료하려면 Ctrl+C를 누르세요.")
-    print("=" * 50)
-    
-    app.run(debug=True, host='0.0.0.0', port=5000)
-
 def create_basic_template():
     """기본 HTML 템플릿 생성"""
     template_content = """
@@ -308,7 +390,7 @@ def create_basic_template():
             chatMessages.scrollTop = chatMessages.scrollHeight;
 
             try {
-                const response = await fetch('/chat', {
+                const response = await fetch('/chat/stream', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
@@ -316,16 +398,57 @@ def create_basic_template():
                     body: JSON.stringify({ message: message })
                 });
 
-                const data = await response.json();
-                
-                // 타이핑 인디케이터 숨기기
-                typingIndicator.style.display = 'none';
+                if (!response.ok || !response.body) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+
+                // 토큰이 도착하는 대로 봇 응답에 이어 붙이기
+                let botContent = null;
+                const appendToken = (token) => {
+                    if (!botContent) {
+                        // 첫 토큰이 도착하면 타이핑 인디케이터 숨기기
+                        typingIndicator.style.display = 'none';
+                        botContent = addMessage('', 'bot');
+                    }
+                    botContent.textContent += token;
+                    chatMessages.scrollTop = chatMessages.scrollHeight;
+                };
+
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder('utf-8');
+                let buffer = '';
+                let finished = false;
+
+                while (!finished) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
 
-                if (data.success) {
-                    // 봇 응답 표시
-                    addMessage(data.message, 'bot');
-                } else {
-                    // 오류 메시지 표시
+                    // SSE 이벤트는 빈 줄로 구분됨
+                    let boundary;
+                    while ((boundary = buffer.indexOf('\\n\\n')) !== -1) {
+                        const rawEvent = buffer.slice(0, boundary);
+                        buffer = buffer.slice(boundary + 2);
+
+                        let eventName = 'message';
+                        let dataLine = '';
+                        for (const line of rawEvent.split('\\n')) {
+                            if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                            else if (line.startsWith('data:')) dataLine += line.slice(5).trim();
+                        }
+
+                        if (eventName === 'done') {
+                            finished = true;
+                        } else if (eventName === 'error') {
+                            appendToken(JSON.parse(dataLine).message);
+                        } else if (dataLine) {
+                            appendToken(JSON.parse(dataLine).token);
+                        }
+                    }
+                }
+
+                typingIndicator.style.display = 'none';
+                if (!botContent) {
                     addMessage('죄송합니다. 일시적인 오류가 발생했습니다.', 'bot');
                 }
             } catch (error) {
@@ -352,6 +475,7 @@ def create_basic_template():
             
             // 스크롤을 맨 아래로
             chatMessages.scrollTop = chatMessages.scrollHeight;
+            return messageContent;
         }
 
         // 페이지 로드 시 입력 필드에 포커스
@@ -363,8 +487,26 @@ def create_basic_template():
 </html>
 """
     
+    # 템플릿 디렉토리 생성
+    templates_dir = Path(__file__).parent / 'templates'
+    templates_dir.mkdir(exist_ok=True)
+    
     template_file = templates_dir / 'index.html'
     with open(template_file, 'w', encoding='utf-8') as f:
         f.write(template_content)
     
-    print(f"✅ HTML 템플릿이 생성되었습니다: {template_file}") 
\ No newline at end of file
+    print(f"✅ HTML 템플릿이 생성되었습니다: {template_file}")
+
+if __name__ == '__main__':
+    # 기본 HTML 템플릿 생성
+    create_basic_template()
+    
+    print("=" * 50)
+    print("LLM Chatbot Web Application")
+    print("=" * 50)
+    print("웹 서버를 시작합니다...")
+    print("브라우저에서 http://localhost:5000 으로 접속하세요.")
+    print("종료하려면 Ctrl+C를 누르세요.")
+    print("=" * 50)
+    
+    app.run(debug=True, host='0.0.0.0', port=5000)